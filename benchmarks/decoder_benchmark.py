@@ -0,0 +1,93 @@
+import argparse
+import glob
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# Run from any folder, using the config of the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utility.decoders import decode_json, decode_history_items, JSON_DECODER
+
+# Compare the decoder layer against the former decoding of coin balance history pages
+PAGE_COUNT = 2000
+ITEMS_PER_PAGE = 50
+REPEATS = 5
+SEED = 42
+
+def legacy_decode_page(body):
+    # Former decoding of the scan: full JSON decoding, then strptime and int for every item
+    data = json.loads(body)
+    return [
+        (item['block_number'], datetime.strptime(item['block_timestamp'], '%Y-%m-%dT%H:%M:%SZ').date(), int(item['delta']))
+        for item in data['items']
+    ]
+
+def decode_page(body, loads=decode_json):
+    data = loads(body)
+    return [(block_number, transaction_date, delta) for block_number, transaction_date, timestamp, delta in decode_history_items(data['items'])]
+
+def load_recorded_pages(folder):
+    # Reads recorded coin balance history responses, one JSON file per page
+    pages = []
+    for path in sorted(glob.glob(os.path.join(folder, '*.json'))):
+        with open(path, 'rb') as f:
+            body = f.read()
+        if b'"items"' in body and b'"block_timestamp"' in body:
+            pages.append(body)
+    return pages
+
+def generate_pages(rng):
+    # Coin balance history pages with all fields of the Blockscout API, from the latest to the oldest block
+    pages = []
+    block_number = 5_000_000
+    block_time = datetime(2025, 12, 31, 23, 59, 59)
+    for page in range(PAGE_COUNT):
+        items = []
+        for item in range(ITEMS_PER_PAGE):
+            step = rng.randrange(1, 900)
+            block_number -= step
+            block_time -= timedelta(seconds=12 * step)
+            items.append({
+                'block_number': block_number,
+                'block_timestamp': block_time.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'delta': str(rng.randrange(10**15, 10**17)),
+                'transaction_hash': None,
+                'value': str(rng.randrange(10**20, 10**22)),
+            })
+        next_page_params = {'block_number': block_number, 'items_count': (page + 1) * ITEMS_PER_PAGE}
+        pages.append(json.dumps({'items': items, 'next_page_params': next_page_params}).encode())
+    return pages
+
+def measure(function, pages):
+    # Best time of all repeats, as nanoseconds per page
+    best = None
+    for repeat in range(REPEATS):
+        start = time.perf_counter_ns()
+        results = [function(body) for body in pages]
+        elapsed = time.perf_counter_ns() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return results, best / len(pages)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the decoding of coin balance history pages")
+    parser.add_argument('--pages', type=str, help='Folder of recorded coin balance history responses')
+    args = parser.parse_args()
+
+    pages = load_recorded_pages(args.pages) if args.pages else generate_pages(random.Random(SEED))
+    if not pages:
+        sys.exit("No coin balance history pages found.")
+
+    legacy_results, legacy_time = measure(legacy_decode_page, pages)
+    json_results, json_time = measure(lambda body: decode_page(body, json.loads), pages)
+    results, decoder_time = measure(decode_page, pages)
+
+    print(f"Pages: {len(pages)}, JSON decoder: {JSON_DECODER}")
+    print(f"{'Former decoding':<28} {legacy_time / 1000:>8.1f} us/page")
+    print(f"{'Decoder layer with json':<28} {json_time / 1000:>8.1f} us/page {legacy_time / json_time:>6.1f}x")
+    print(f"{'Decoder layer with ' + JSON_DECODER:<28} {decoder_time / 1000:>8.1f} us/page {legacy_time / decoder_time:>6.1f}x")
+    print(f"Equal results: {results == legacy_results and json_results == legacy_results}")
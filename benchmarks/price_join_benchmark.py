@@ -0,0 +1,82 @@
+import os
+import random
+import sys
+import time
+from datetime import date
+
+# Run from any folder, using the config of the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utility.price_calculation import join_daily_prices
+from utility.report_model import calculate_total_income
+
+# Compare the vectorized price join against the former row loop
+ROW_COUNTS = [10**5, 3 * 10**5, 10**6]
+MISSING_PRICE_SHARE = 0.02
+SEED = 42
+
+def legacy_join_daily_prices(daily_deltas, price_map):
+    # Former loop of create_daily_data_with_prices, without terminal outputs
+    daily_data = []
+    for date_string, delta_coin in sorted(daily_deltas.items()):
+        coin_price = price_map.get(date_string)
+        if not coin_price is None:
+            income = delta_coin * coin_price
+            income = round(income, 2)
+            coin_price = round(coin_price, 10)
+        else:
+            income = None
+            coin_price = None
+        delta_coin = round(delta_coin, 10)
+        daily_data.append([date_string, delta_coin, coin_price, income])
+    return daily_data
+
+def legacy_calculate_total_income(daily_data):
+    # Former loop of calculate_total_income
+    total_income = 0.0
+    total_coins = 0.0
+    missing_data_count = 0
+    for row in daily_data:
+        coins = row[1]
+        income = row[3]
+        if income is not None:
+            total_income += income
+        else:
+            missing_data_count += 1
+        total_coins += coins
+    total_income = round(total_income, 2)
+    return total_income, total_coins, missing_data_count
+
+def generate_rows(row_count, rng):
+    # Daily deltas of consecutive days with validator sized payouts and median prices
+    daily_deltas = {}
+    price_map = {}
+    for ordinal in range(1, row_count + 1):
+        date_string = date.fromordinal(ordinal).isoformat()
+        daily_deltas[date_string] = rng.uniform(0.001, 5.0)
+        if rng.random() >= MISSING_PRICE_SHARE:
+            price_map[date_string] = rng.uniform(0.5, 40.0)
+    return daily_deltas, price_map
+
+def measure(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    rng = random.Random(SEED)
+    print(f"{'Rows':>10} {'Loop':>10} {'Vectorized':>12} {'Speedup':>9}  Equal")
+
+    for row_count in ROW_COUNTS:
+        daily_deltas, price_map = generate_rows(row_count, rng)
+
+        legacy_rows, legacy_join_time = measure(legacy_join_daily_prices, daily_deltas, price_map)
+        legacy_totals, legacy_total_time = measure(legacy_calculate_total_income, legacy_rows)
+        (dates, coins, prices, incomes), join_time = measure(join_daily_prices, daily_deltas, price_map)
+        totals, total_time = measure(calculate_total_income, coins, incomes)
+
+        legacy_time = legacy_join_time + legacy_total_time
+        vectorized_time = join_time + total_time
+        equal = [list(row) for row in zip(dates, coins, prices, incomes)] == legacy_rows and totals == legacy_totals
+        print(f"{row_count:>10} {legacy_time:>9.3f}s {vectorized_time:>11.3f}s {legacy_time / vectorized_time:>8.1f}x  {equal}")
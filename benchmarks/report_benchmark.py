@@ -0,0 +1,119 @@
+import argparse
+import contextlib
+import glob
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+# Run from any folder, using the config of the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import config
+from standin_servers import SyntheticChain, StandinServer
+
+# Run full income reports against local stand-ins of Blockscout and CoinMarketCap
+README_CALLS_PER_MINUTE = 75
+CACHE_SETTINGS = {
+    'BLOCK_CACHE_FILE': 'cache/block_cache.json',
+    'BLOCK_INDEX_FILE': 'cache/block_index.json',
+    'EVENT_STORE_FOLDER': 'cache/events',
+    'CHECKPOINT_FOLDER': 'cache/checkpoints',
+    'REPORT_STATE_FOLDER': 'cache/reports',
+    'PRICE_STORE_FILE': 'cache/prices.sqlite3',
+    'PREFLIGHT_CACHE_FILE': 'cache/preflight.json',
+}
+
+def parse_years(value):
+    first, _, last = value.partition('-')
+    return list(range(int(first), int(last or first) + 1))
+
+def configure(blockscout, coinmarketcap, node, calls_per_minute, folder, block_lookups=False):
+    """
+    Points the configuration at the stand-ins and an empty cache folder.
+    Must run before the reporter imports its API modules, as they read the configuration on import.
+    """
+    config.BLOCKSCOUT_API_URL = f"{blockscout.url}/api"
+    config.COINMARKETCAP_API_URL = coinmarketcap.url
+    config.RPC_URL = node.url
+    config.BLOCKSCOUT_CALLS_PER_MINUTE = calls_per_minute
+    config.COINMARKETCAP_CALLS_PER_MINUTE = calls_per_minute
+    config.RPC_CALLS_PER_MINUTE = calls_per_minute
+    config.BLOCKSCOUT_ADDRESS_WITHDRAWALS = not block_lookups
+    config.BLOCKSCOUT_VALIDATED_BLOCKS = not block_lookups
+    for name, path in CACHE_SETTINGS.items():
+        setattr(config, name, os.path.join(folder, path))
+
+def run_report(addresses, years, use_async, use_rpc, verbose):
+    """
+    Generates the reports of all addresses and years.
+
+    :return (float): Wall time in seconds.
+    :return (float): Time slept by the rate limiters in seconds, summed over concurrent calls.
+    """
+    import income_reporter
+    from utility.rate_limiter import limiters
+
+    # Reports of earlier runs would ask before being overwritten
+    for path in glob.glob('income_report_*'):
+        os.remove(path)
+    for limiter in limiters.values():
+        limiter.waited = 0.0
+
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(open(os.devnull, 'w'))
+    start = time.perf_counter()
+    with output:
+        income_reporter.generate_income_report(use_async=use_async, addresses=addresses, years=years, use_rpc=use_rpc)
+    wall_time = time.perf_counter() - start
+    return wall_time, sum(limiter.waited for limiter in limiters.values())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark income reports against local API stand-ins")
+    parser.add_argument('--validators', type=int, default=1, help='Validators of every address')
+    parser.add_argument('--addresses', type=int, default=1, help='Number of withdrawal addresses')
+    parser.add_argument('--years', type=str, default=str(datetime.now(timezone.utc).year - 1), help='Report years, e.g. 2024-2025')
+    parser.add_argument('--latency', type=float, default=0.0, help='Response latency of the stand-ins in milliseconds')
+    parser.add_argument('--server-rate', type=int, default=None, help='Calls per minute accepted by every stand-in')
+    parser.add_argument('--calls-per-minute', type=int, default=60000, help='Call rate of the reporter')
+    parser.add_argument('--runs', type=int, default=1, help='Runs within the same cache folder, later runs use the caches')
+    parser.add_argument('--async', dest='use_async', action='store_true', help='Use the async engine')
+    parser.add_argument('--rpc', dest='use_rpc', action='store_true', help='Scan the blocks of the execution node stand-in')
+    parser.add_argument('--block-lookups', action='store_true', help='Look up the withdrawals and miner of every block instead of the address')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic chain')
+    parser.add_argument('--verbose', action='store_true', help='Show the terminal outputs of the reporter')
+    args = parser.parse_args()
+
+    years = parse_years(args.years)
+    addresses = ['0x' + format(0xca0 + index, '040x') for index in range(args.addresses)]
+
+    # Chain from the month before the first report year until now
+    start = time.perf_counter()
+    chain = SyntheticChain(addresses, args.validators, datetime(min(years) - 1, 12, 1, tzinfo=timezone.utc), seed=args.seed)
+    events = sum(chain.event_count(address) for address in addresses)
+    print(f"Synthetic chain: {chain.head} blocks, {events} balance events, built in {time.perf_counter() - start:.1f}s")
+
+    blockscout = StandinServer(chain, args.latency / 1000, args.server_rate).start()
+    coinmarketcap = StandinServer(chain, args.latency / 1000, args.server_rate).start()
+    node = StandinServer(chain, args.latency / 1000, args.server_rate).start()
+
+    with tempfile.TemporaryDirectory() as folder:
+        configure(blockscout, coinmarketcap, node, args.calls_per_minute, folder, args.block_lookups)
+        os.chdir(folder)
+
+        for run in range(1, args.runs + 1):
+            for server in (blockscout, coinmarketcap, node):
+                server.calls.clear()
+            wall_time, slept = run_report(addresses, years, args.use_async, args.use_rpc, args.verbose)
+
+            blockscout_calls = sum(calls for endpoint, calls in blockscout.calls.items() if endpoint != 'rate_limited')
+            validator_years = args.validators * args.addresses * len(years)
+            print()
+            print(f"Run {run}: {wall_time:.2f}s wall time, {slept:.2f}s slept by rate limiters over all calls")
+            for server_name, server in (('Blockscout', blockscout), ('CoinMarketCap', coinmarketcap), ('Node', node)):
+                for endpoint, calls in sorted(server.calls.items()):
+                    print(f"  {server_name:<14} {endpoint:<22} {calls:>7} calls")
+            if not args.use_rpc:
+                print(f"  Projected at {README_CALLS_PER_MINUTE} calls per minute: "
+                      f"{blockscout_calls * 60 / README_CALLS_PER_MINUTE / validator_years:.0f}s per validator and year")
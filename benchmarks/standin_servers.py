@@ -0,0 +1,394 @@
+import json
+import random
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, deque
+from datetime import datetime, timedelta, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+# Local stand-ins for the Blockscout and CoinMarketCap endpoints used by the income reporter
+
+"""
+Defaults of the synthetic chain.
+
+- BLOCK_TIME: seconds between blocks
+- WITHDRAWAL_INTERVAL: blocks between two withdrawals of a validator
+- NETWORK_VALIDATORS: validators of the whole network, every validator proposes one of that many blocks
+- TRANSFERS_PER_YEAR: incoming and outgoing transfers of every address
+- PAGE_SIZE: items of a coin balance history page
+- WITHDRAWALS_PER_BLOCK: withdrawals of every block, filled up with withdrawals of other validators
+- BASE_FEE: base fee of every block, in wei
+- FEE_GAS: gas used by the transactions of a block, paying the priority fee of its miner
+"""
+BLOCK_TIME = 12 # seconds
+WITHDRAWAL_INTERVAL = 25000 # blocks (~3.5 days)
+NETWORK_VALIDATORS = 150000 # validators
+TRANSFERS_PER_YEAR = 4 # transfers
+PAGE_SIZE = 50 # items
+WITHDRAWALS_PER_BLOCK = 16 # withdrawals
+BASE_FEE = 7 * 10**9 # wei
+FEE_GAS = 21000 # gas
+BLOCKS_PER_YEAR = 365 * 24 * 3600 // BLOCK_TIME
+ETH_DECIMAL_FACTOR = 10**18
+
+class SyntheticChain:
+    """
+    Deterministic chain with the balance events of validator withdrawal addresses.
+
+    - Every validator receives a withdrawal every WITHDRAWAL_INTERVAL blocks
+    - Every validator proposes blocks at random, receiving their fees as miner
+    - Addresses also receive and send a few transfers per year
+    - Balance events of the same block are combined, like in the coin balance history
+    - Withdrawals are whole Gwei and miner fees whole priority fees, like on an execution node
+    - Withdrawals are numbered across the chain, so every block starts at a known withdrawal index
+    """
+
+    def __init__(self, addresses, validators, genesis, head=None, withdrawal_interval=WITHDRAWAL_INTERVAL,
+                 network_validators=NETWORK_VALIDATORS, transfers_per_year=TRANSFERS_PER_YEAR, seed=42):
+        rng = random.Random(seed)
+        self.genesis = int(genesis.timestamp())
+        self.head = ((int((head or datetime.now(timezone.utc)).timestamp()) - self.genesis) // BLOCK_TIME)
+        self.withdrawals = {}
+        self.withdrawal_items = {}
+        self.address_withdrawals = {}
+        self.miners = {}
+        self.fees = {}
+        self.deltas = {}
+        self.blocks = {}
+        self.validated_blocks = {}
+
+        for address in addresses:
+            address = address.lower()
+            deltas = self.deltas[address] = {}
+            self.address_withdrawals[address] = []
+
+            for validator in range(validators):
+                # Withdrawals of the validator sweep
+                block_number = rng.randrange(1, withdrawal_interval + 1)
+                while block_number <= self.head:
+                    amount = (rng.randrange(30, 60) * 10**15 + rng.randrange(10**15)) // 10**9 * 10**9
+                    receivers = self.withdrawals.setdefault(block_number, {})
+                    receivers[address] = receivers.get(address, 0) + amount
+                    deltas[block_number] = deltas.get(block_number, 0) + amount
+                    self.withdrawal_items.setdefault(block_number, []).append((address, validator, amount))
+                    block_number += withdrawal_interval
+
+                # Block proposals with their fees
+                block_number = 0
+                while True:
+                    block_number += int(rng.expovariate(1 / network_validators)) + 1
+                    if block_number > self.head:
+                        break
+                    fee = rng.randrange(10**14, 5 * 10**16) // FEE_GAS * FEE_GAS
+                    self.miners[block_number] = address
+                    self.fees[block_number] = fee
+                    deltas[block_number] = deltas.get(block_number, 0) + fee
+
+            # Transfers from and to other addresses
+            for sign in (1, -1):
+                block_number = 0
+                while True:
+                    block_number += int(rng.expovariate(transfers_per_year / BLOCKS_PER_YEAR)) + 1
+                    if block_number > self.head:
+                        break
+                    deltas[block_number] = deltas.get(block_number, 0) + sign * rng.randrange(1, 100) * ETH_DECIMAL_FACTOR
+
+            self.blocks[address] = sorted(block_number for block_number, delta in deltas.items() if delta != 0)
+
+        # Withdrawals of the addresses come first within their block
+        for block_number, items in self.withdrawal_items.items():
+            for position, (address, validator, amount) in enumerate(items):
+                self.address_withdrawals[address].append((self.withdrawal_index(block_number, position), block_number, validator, amount))
+        for address_withdrawals in self.address_withdrawals.values():
+            address_withdrawals.sort()
+
+        # Later proposals of other addresses can replace a miner
+        for block_number, miner in sorted(self.miners.items()):
+            self.validated_blocks.setdefault(miner, []).append(block_number)
+
+    def event_count(self, address):
+        return len(self.blocks.get(address.lower(), []))
+
+    def timestamp(self, block_number):
+        # Block time in the format of the Blockscout API
+        block_time = datetime.fromtimestamp(self.genesis + block_number * BLOCK_TIME, timezone.utc)
+        return block_time.strftime('%Y-%m-%dT%H:%M:%S.000000Z')
+
+    def history_page(self, address, below=None, items_count=0):
+        """
+        :return (dict): A coin balance history page, newest events first, starting below a block.
+        """
+        blocks = self.blocks.get(address.lower(), [])
+        deltas = self.deltas.get(address.lower(), {})
+        end = bisect_left(blocks, below) if below is not None else len(blocks)
+        page_blocks = blocks[max(end - PAGE_SIZE, 0):end][::-1]
+
+        items = [{
+            'block_number': block_number,
+            'block_timestamp': self.timestamp(block_number),
+            'delta': str(deltas[block_number]),
+            'transaction_hash': None,
+            'value': '0',
+        } for block_number in page_blocks]
+
+        next_page_params = None
+        if end - PAGE_SIZE > 0:
+            next_page_params = {'block_number': page_blocks[-1], 'items_count': items_count + PAGE_SIZE}
+        return {'items': items, 'next_page_params': next_page_params}
+
+    def withdrawal_index(self, block_number, position):
+        # Index of a withdrawal across the whole chain
+        return block_number * WITHDRAWALS_PER_BLOCK + position
+
+    def withdrawals_page(self, address, below=None, items_count=0):
+        """
+        :return (dict): A withdrawal list page of an address, newest withdrawals first, starting below an index.
+        """
+        withdrawals = self.address_withdrawals.get(address.lower(), [])
+        end = bisect_left(withdrawals, (below,)) if below is not None else len(withdrawals)
+        page_withdrawals = withdrawals[max(end - PAGE_SIZE, 0):end][::-1]
+
+        items = [{
+            'index': index,
+            'amount': str(amount),
+            'validator_index': validator,
+            'block_number': block_number,
+            'timestamp': self.timestamp(block_number),
+        } for index, block_number, validator, amount in page_withdrawals]
+
+        next_page_params = None
+        if end - PAGE_SIZE > 0:
+            next_page_params = {'index': page_withdrawals[-1][0], 'items_count': items_count + PAGE_SIZE}
+        return {'items': items, 'next_page_params': next_page_params}
+
+    def validated_blocks_page(self, address, below=None, items_count=0):
+        """
+        :return (dict): A validated blocks page of an address, newest blocks first, starting below a block.
+        """
+        blocks = self.validated_blocks.get(address.lower(), [])
+        end = bisect_left(blocks, below) if below is not None else len(blocks)
+        page_blocks = blocks[max(end - PAGE_SIZE, 0):end][::-1]
+
+        next_page_params = None
+        if end - PAGE_SIZE > 0:
+            next_page_params = {'block_number': page_blocks[-1], 'items_count': items_count + PAGE_SIZE}
+        return {'items': [self.block(block_number) for block_number in page_blocks], 'next_page_params': next_page_params}
+
+    def block(self, block_number):
+        miner = self.miners.get(block_number, '0x' + format(block_number % 16**40, '040x'))
+        return {'height': block_number, 'timestamp': self.timestamp(block_number), 'miner': {'hash': miner}}
+
+    def block_withdrawals(self, block_number):
+        # Withdrawals of the addresses, followed by withdrawals of other validators
+        items = [{'receiver': {'hash': address}, 'amount': str(amount), 'validator_index': validator}
+                 for address, validator, amount in self.withdrawal_items.get(block_number, [])]
+        while len(items) < WITHDRAWALS_PER_BLOCK:
+            items.append({'receiver': {'hash': '0x' + format(len(items) + 1, '040x')}, 'amount': str(32 * 10**9), 'validator_index': len(items)})
+        for position, item in enumerate(items):
+            item['index'] = self.withdrawal_index(block_number, position)
+        return {'items': items[::-1], 'next_page_params': None}
+
+    def rpc_block(self, block_number):
+        # Block header of eth_getBlockByNumber without transactions
+        receivers = self.withdrawals.get(block_number, {})
+        return {
+            'number': hex(block_number),
+            'timestamp': hex(self.genesis + block_number * BLOCK_TIME),
+            'miner': self.miners.get(block_number, '0x' + format(block_number % 16**40, '040x')),
+            'baseFeePerGas': hex(BASE_FEE),
+            'transactions': [],
+            'withdrawals': [
+                {'index': hex(block_number), 'validatorIndex': hex(index), 'address': address, 'amount': hex(amount // 10**9)}
+                for index, (address, amount) in enumerate(receivers.items())
+            ],
+        }
+
+    def rpc_receipts(self, block_number):
+        # Receipts of eth_getBlockReceipts, paying the miner fee of the block as priority fee
+        if block_number not in self.fees:
+            return []
+        return [{'gasUsed': hex(FEE_GAS), 'effectiveGasPrice': hex(BASE_FEE + self.fees[block_number] // FEE_GAS)}]
+
+    def price(self, day):
+        # Deterministic daily open and close prices
+        value = 1 + (day.toordinal() * 7919 % 1000) / 100
+        return value, value * 1.02
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlsplit(self.path)
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+
+        # Reject calls above the rate limit of the stand-in
+        retry_after = server.reserve_call()
+        if retry_after is not None:
+            server.count('rate_limited')
+            return self.send_json({'message': 'Too Many Requests'}, 429, {'Retry-After': f"{retry_after:.2f}"})
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        for pattern, endpoint in ROUTES:
+            match = re.match(pattern, url.path)
+            if match:
+                server.count(endpoint.__name__)
+                data, status = endpoint(server.chain, params, *match.groups())
+                return self.send_json(data, status)
+
+        server.count('unknown')
+        self.send_json({'message': 'Not found'}, 404)
+
+    def do_POST(self):
+        # JSON-RPC calls, as single call or batch
+        server = self.server
+        calls = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+
+        retry_after = server.reserve_call()
+        if retry_after is not None:
+            server.count('rate_limited')
+            return self.send_json({'message': 'Too Many Requests'}, 429, {'Retry-After': f"{retry_after:.2f}"})
+
+        if server.latency:
+            time.sleep(server.latency)
+
+        server.count('rpc_batch' if isinstance(calls, list) else 'rpc_call')
+        responses = [rpc_call(server, call) for call in (calls if isinstance(calls, list) else [calls])]
+        self.send_json(responses if isinstance(calls, list) else responses[0])
+
+def coin_balance_history(chain, params, address):
+    below = int(params['block_number']) if 'block_number' in params else None
+    return chain.history_page(address, below, int(params.get('items_count', 0))), 200
+
+def address_withdrawals(chain, params, address):
+    below = int(params['index']) if 'index' in params else None
+    return chain.withdrawals_page(address, below, int(params.get('items_count', 0))), 200
+
+def validated_blocks(chain, params, address):
+    below = int(params['block_number']) if 'block_number' in params else None
+    return chain.validated_blocks_page(address, below, int(params.get('items_count', 0))), 200
+
+def block_withdrawals(chain, params, block_number):
+    block_number = int(block_number)
+    if block_number > chain.head:
+        return {'message': 'Not found'}, 404
+    return chain.block_withdrawals(block_number), 200
+
+def block(chain, params, block_number):
+    block_number = int(block_number)
+    if block_number > chain.head:
+        return {'message': 'Not found'}, 404
+    return chain.block(block_number), 200
+
+def latest_blocks(chain, params):
+    return {'items': [chain.block(chain.head)], 'next_page_params': None}, 200
+
+def blockscout_probe(chain, params):
+    return {'status': '1', 'message': 'OK', 'result': {}}, 200
+
+def coinmarketcap_probe(chain, params):
+    return {'data': {'plan': {}, 'usage': {}}, 'status': {'error_code': 0}}, 200
+
+def ohlcv_historical(chain, params):
+    day = datetime.strptime(params['time_start'][:10], '%Y-%m-%d').date()
+    end = datetime.strptime(params['time_end'][:10], '%Y-%m-%d').date()
+    quotes = []
+    while day <= end:
+        open_price, close_price = chain.price(day)
+        quotes.append({
+            'time_open': f"{day}T00:00:00.000Z",
+            'quote': {params['convert_id']: {'open': open_price, 'close': close_price, 'timestamp': f"{day}T23:59:59.999Z"}},
+        })
+        day += timedelta(days=1)
+    return {'data': {'id': int(params['id']), 'quotes': quotes}}, 200
+
+def rpc_call(server, call):
+    # Answers a single JSON-RPC call from the synthetic chain
+    chain = server.chain
+    method, params = call['method'], call.get('params', [])
+    server.count(method)
+    result = None
+    if method == 'eth_chainId':
+        result = hex(42)
+    elif method in ('eth_getBlockByNumber', 'eth_getBlockReceipts'):
+        block_number = chain.head if params[0] == 'latest' else int(params[0], 16)
+        if block_number <= chain.head:
+            result = chain.rpc_block(block_number) if method == 'eth_getBlockByNumber' else chain.rpc_receipts(block_number)
+    else:
+        return {'jsonrpc': '2.0', 'id': call.get('id'), 'error': {'code': -32601, 'message': 'Method not found'}}
+    return {'jsonrpc': '2.0', 'id': call.get('id'), 'result': result}
+
+ROUTES = [
+    (r'^/api/v2/addresses/(0x[0-9a-fA-F]{40})/coin-balance-history$', coin_balance_history),
+    (r'^/api/v2/addresses/(0x[0-9a-fA-F]{40})/withdrawals$', address_withdrawals),
+    (r'^/api/v2/addresses/(0x[0-9a-fA-F]{40})/blocks-validated$', validated_blocks),
+    (r'^/api/v2/blocks/(\d+)/withdrawals$', block_withdrawals),
+    (r'^/api/v2/blocks/(\d+)$', block),
+    (r'^/api/v2/blocks$', latest_blocks),
+    (r'^/api$', blockscout_probe),
+    (r'^/v1/key/info$', coinmarketcap_probe),
+    (r'^/v2/cryptocurrency/ohlcv/historical$', ohlcv_historical),
+]
+
+class StandinServer(ThreadingHTTPServer):
+    """
+    Local HTTP server answering like Blockscout, CoinMarketCap,
+    or the JSON-RPC API of an execution node from a synthetic chain.
+
+    - Every call waits for the configured latency
+    - Calls above the configured rate are rejected with HTTP 429 and Retry-After
+    - Calls are counted by endpoint
+    """
+    daemon_threads = True
+
+    def __init__(self, chain, latency=0.0, calls_per_minute=None):
+        super().__init__(('127.0.0.1', 0), StandinHandler)
+        self.chain = chain
+        self.latency = latency
+        self.calls_per_minute = calls_per_minute
+        self.calls = Counter()
+        self.call_times = deque()
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, endpoint):
+        with self.lock:
+            self.calls[endpoint] += 1
+
+    def reserve_call(self):
+        # Returns the seconds until the next call is allowed, None if the call is accepted
+        if not self.calls_per_minute:
+            return None
+        with self.lock:
+            now = time.monotonic()
+            while self.call_times and self.call_times[0] <= now - 60:
+                self.call_times.popleft()
+            if len(self.call_times) >= self.calls_per_minute:
+                return self.call_times[0] + 60 - now
+            self.call_times.append(now)
+            return None
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
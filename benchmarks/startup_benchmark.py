@@ -0,0 +1,87 @@
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+# Measure the startup of the income reporter on code paths that do not need all libraries
+REPOSITORY = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORTER = os.path.join(REPOSITORY, 'income_reporter.py')
+REPEATS = 7
+
+# Libraries with a slow import, only loaded by report runs
+HEAVY_MODULES = ['numpy', 'pandas', 'requests', 'aiohttp', 'fpdf']
+
+# Startup paths with their import time budget in milliseconds and libraries they must not load
+SCENARIOS = [
+    ('Import', ['-c', 'import income_reporter'], 40, HEAVY_MODULES),
+    ('Help', [REPORTER, '--help'], 40, HEAVY_MODULES),
+    ('Argument error', [REPORTER, '--years', '2025-2023'], 40, HEAVY_MODULES),
+    ('PDF only', [REPORTER, '--pdf-only', '{csv_file}'], 150, ['numpy', 'pandas', 'requests', 'aiohttp']),
+]
+
+def write_report_csv(path):
+    # Daily income of a full year, as exported by a report run
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('Date,Received LYX,Former LYX Price,Income in EUR\n')
+        for day in range(366):
+            f.write(f"{date(2024, 1, 1) + timedelta(days=day)},0.0{day % 90 + 10},1.5,{(day % 90 + 10) * 0.0015:.2f}\n")
+
+def run(arguments, cwd, startup_modules=frozenset()):
+    """
+    Starts the interpreter with import timing.
+
+    :param arguments (list): Arguments of the interpreter.
+    :param cwd (str): Working directory of the process.
+    :param startup_modules (set, optional): Modules of the interpreter startup, excluded from the import time.
+    :return (float): Wall time of the process in milliseconds.
+    :return (float): Import time in milliseconds.
+    :return (set): Names of all imported modules.
+    """
+    # The config of the repository root is found from any working directory
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [env.get('PYTHONPATH'), REPOSITORY]))
+
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', *arguments], cwd=cwd, env=env, capture_output=True, text=True)
+    wall_time = (time.perf_counter() - start) * 1000
+
+    import_time = 0
+    modules = set()
+    for line in process.stderr.splitlines():
+        match = re.match(r'import time:\s+(\d+) \|\s+\d+ \|\s*(\S+)', line)
+        if match and match.group(2) not in startup_modules:
+            import_time += int(match.group(1))
+            modules.add(match.group(2))
+    return wall_time, import_time / 1000, modules
+
+
+if __name__ == "__main__":
+    print(f"{'Scenario':<16} {'Wall':>9} {'Imports':>9} {'Budget':>8}  Result")
+    failed = False
+
+    with tempfile.TemporaryDirectory() as folder:
+        csv_file = os.path.join(folder, 'income_report.csv')
+        write_report_csv(csv_file)
+        startup_wall_time, startup_import_time, startup_modules = run(['-c', 'pass'], folder)
+        print(f"{'Interpreter':<16} {startup_wall_time:>7.1f}ms {0:>7.1f}ms {'':>8}")
+
+        for name, arguments, budget, forbidden in SCENARIOS:
+            arguments = [argument.format(csv_file=csv_file) for argument in arguments]
+            results = [run(arguments, folder, startup_modules) for repeat in range(REPEATS)]
+            wall_time = statistics.median(result[0] for result in results)
+            import_time = statistics.median(result[1] for result in results)
+            loaded = sorted({module.split('.')[0] for module in results[0][2]} & set(forbidden))
+
+            result = 'OK'
+            if import_time > budget:
+                result = 'Over budget'
+            if loaded:
+                result = f"Loaded {', '.join(loaded)}"
+            failed = failed or result != 'OK'
+            print(f"{name:<16} {wall_time:>7.1f}ms {import_time:>7.1f}ms {budget:>6}ms  {result}")
+
+    sys.exit(1 if failed else 0)
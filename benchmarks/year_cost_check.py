@@ -0,0 +1,59 @@
+import os
+import sys
+import tempfile
+from datetime import datetime, timezone
+
+# Run from any folder, using the config of the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from standin_servers import SyntheticChain, StandinServer
+from report_benchmark import configure, run_report
+
+# Check that reports of older years do not page through the listings of the years after them
+VALIDATORS = 4
+PAST_YEARS = 3
+TOLERANCE = 1.25
+
+# Listings that are paged from the end of the report year
+LISTING_ENDPOINTS = ['coin_balance_history', 'address_withdrawals', 'validated_blocks']
+
+def listing_calls(server, address, year):
+    """
+    Generates the report of a single year within the shared cache folder.
+
+    :return (dict): Listing endpoints mapped to their number of calls.
+    """
+    server.calls.clear()
+    run_report([address], [year], False, False, False)
+    return {endpoint: server.calls.get(endpoint, 0) for endpoint in LISTING_ENDPOINTS}
+
+
+if __name__ == "__main__":
+    current_year = datetime.now(timezone.utc).year
+    oldest_year, newest_year = current_year - PAST_YEARS, current_year - 1
+    address = '0x' + format(0xca0, '040x')
+
+    # Chain from the month before the oldest year until now
+    chain = SyntheticChain([address], VALIDATORS, datetime(oldest_year - 1, 12, 1, tzinfo=timezone.utc))
+    blockscout = StandinServer(chain).start()
+    coinmarketcap = StandinServer(chain).start()
+    node = StandinServer(chain).start()
+
+    with tempfile.TemporaryDirectory() as folder:
+        configure(blockscout, coinmarketcap, node, 60000, folder)
+        os.chdir(folder)
+
+        # Years do not share listing pages, so the shared caches do not change their calls
+        newest_calls = listing_calls(blockscout, address, newest_year)
+        oldest_calls = listing_calls(blockscout, address, oldest_year)
+
+    print(f"{'Listing':<22} {newest_year:>6} {oldest_year:>6}  Result")
+    failed = False
+    for endpoint in LISTING_ENDPOINTS:
+        result = 'OK'
+        if oldest_calls[endpoint] > newest_calls[endpoint] * TOLERANCE + 1:
+            result = 'FAILED, calls grow with the age of the year'
+            failed = True
+        print(f"{endpoint:<22} {newest_calls[endpoint]:>6} {oldest_calls[endpoint]:>6}  {result}")
+
+    sys.exit(1 if failed else 0)
@@ -7,13 +7,154 @@ data from the Blockscout explorer of a given blockchain.
 - always use HTTPS for data transport protocol
 
 - API_KEY not always available, but can increase speed
-- CALL_WAIT_TIME is set to 50 calls per minute
-- Increase CALL_WAIT_TIME if you get issues retrieving data
+- CALLS_PER_MINUTE is the maximum call rate of the explorer
+- calls slow down automatically if the explorer rejects them
+- decrease CALLS_PER_MINUTE if you get issues retrieving data
 
 """
 BLOCKSCOUT_API_URL = 'https://explorer.execution.mainnet.lukso.network/api'
 BLOCKSCOUT_API_KEY = None
-BLOCKSCOUT_CALL_WAIT_TIME = 1.2 # seconds (max 75 calls per minute ~0.8)
+BLOCKSCOUT_CALLS_PER_MINUTE = 75 # calls (~500 with API_KEY)
+
+"""
+BLOCKSCOUT_VERIFY_WORKERS is the number of blocks verified at once,
+while further balance history pages are being fetched.
+
+- set to 1 to verify every block before fetching the next page
+- all workers share the call rate of BLOCKSCOUT_CALLS_PER_MINUTE
+- more workers mainly help with an API_KEY and a high call rate
+"""
+BLOCKSCOUT_VERIFY_WORKERS = 4 # workers
+
+"""
+BLOCKSCOUT_ADDRESS_WITHDRAWALS is used to classify balance events with the
+withdrawal list of the address, instead of the withdrawals of every block.
+
+- every call lists up to 50 withdrawals of the address
+- the list is paged once for the whole report timeframe
+- other balance events still fetch their block details
+- falls back to the withdrawals of every block if the list is unavailable
+- set to False for explorers without the address withdrawals endpoint
+"""
+BLOCKSCOUT_ADDRESS_WITHDRAWALS = True
+
+"""
+BLOCKSCOUT_VALIDATED_BLOCKS is used to classify miner rewards with the
+validated blocks of the address, instead of the details of every block.
+
+- every call lists up to 50 validated blocks of the address
+- the list is paged once for the whole report timeframe
+- falls back to the details of every block if the list is unavailable
+- set to False for explorers without the validated blocks endpoint
+"""
+BLOCKSCOUT_VALIDATED_BLOCKS = True
+
+"""
+ASYNC_MAX_IN_FLIGHT is the maximum number of concurrent API calls
+when the report is generated with the --async flag.
+
+- all calls still share the configured CALLS_PER_MINUTE limits
+- requires the aiohttp library
+"""
+ASYNC_MAX_IN_FLIGHT = 16 # calls
+
+"""
+RPC_URL is used to scan every block of the report years on an execution
+node with JSON-RPC batch requests, when the report is generated with the
+--rpc flag, instead of paging the balance history of the Blockscout API.
+
+- prefer a local node, as every block of the years is fetched
+- requires a node with eth_getBlockReceipts, e.g. Geth 1.13 or newer
+- RPC_BATCH_SIZE is the number of blocks fetched within a single call
+- RPC_WORKERS is the number of batches fetched at once
+- RPC_CALLS_PER_MINUTE is the maximum rate of batch calls
+- miner rewards are the priority fees paid to the fee recipient
+- direct payments to the fee recipient, e.g. by block builders, are not included
+"""
+RPC_URL = 'http://127.0.0.1:8545'
+RPC_BATCH_SIZE = 500 # blocks
+RPC_WORKERS = 4 # batches
+RPC_CALLS_PER_MINUTE = 6000 # calls
+
+"""
+BLOCK_CACHE_FILE and BLOCK_CACHE_MAX_ENTRIES are used to store the
+withdrawal receivers and miners of already verified blocks on disk.
+
+- finalized blocks never change, so reruns skip their API calls
+- the cache is shared across runs, years, and addresses
+- the least recently used blocks are evicted once the limit is reached
+- the whole file is loaded at startup and written at the end of a scan
+- set BLOCK_CACHE_FILE to None to disable the cache
+"""
+BLOCK_CACHE_FILE = 'cache/block_cache.json'
+BLOCK_CACHE_MAX_ENTRIES = 25000 # blocks (~800 bytes each with 16 withdrawals)
+
+"""
+BLOCK_INDEX_FILE is used to store block heights and their timestamps,
+found while seeking the end of past report years.
+
+- reports of past years start paging at the end of the year
+- later seeks for nearby dates only need a few API calls
+- blocks of the execution node are stored separately, with an _rpc suffix
+- set BLOCK_INDEX_FILE to None to disable the index
+"""
+BLOCK_INDEX_FILE = 'cache/block_index.json'
+
+"""
+EVENT_STORE_FOLDER is used to store every scanned balance event of an
+address, including its block, time, exact wei delta, and classification.
+
+- events are stored within a memory-mapped column file per address
+- past years that were fully scanned can be reported with --from-events
+- set EVENT_STORE_FOLDER to None to disable the event store
+"""
+EVENT_STORE_FOLDER = 'cache/events'
+
+"""
+CHECKPOINT_FOLDER and CHECKPOINT_INTERVAL are used to store the progress
+of balance history scans, so interrupted runs can be continued.
+
+- progress is stored every CHECKPOINT_INTERVAL history pages
+- progress is also stored when a scan stops early
+- continue a scan by running the report with the --resume flag
+- set CHECKPOINT_FOLDER to None to disable checkpoints
+"""
+CHECKPOINT_FOLDER = 'cache/checkpoints'
+CHECKPOINT_INTERVAL = 10 # pages
+
+"""
+REPORT_STATE_FOLDER is used to store the newest processed block, the
+daily deltas, and the prices of every address and year, when reports
+are generated with the --incremental flag.
+
+- following updates only scan blocks newer than the stored block
+- only prices of new days with income are fetched
+- set REPORT_STATE_FOLDER to None to disable incremental updates
+"""
+REPORT_STATE_FOLDER = 'cache/reports'
+
+"""
+PRICE_STORE_FILE is used to store daily median prices within a local
+SQLite database, indexed by crypto ID, fiat ID, and date.
+
+- prices are only fetched from CoinMarketCap if they are not stored yet
+- local price lists of dry runs are imported once and then looked up
+- manage the store with price_store_manager.py
+- set PRICE_STORE_FILE to None to only keep prices during a run
+"""
+PRICE_STORE_FILE = 'cache/prices.sqlite3'
+
+"""
+PREFLIGHT_CACHE_FILE and PREFLIGHT_TTL are used to remember APIs that
+were reachable, so batch runs do not probe them again for every address.
+
+- all APIs are probed at once, with a short timeout
+- successful probes are skipped for PREFLIGHT_TTL seconds
+- changed API keys or URLs are always probed again
+- set PREFLIGHT_CACHE_FILE to None to only skip probes within a run
+"""
+PREFLIGHT_CACHE_FILE = 'cache/preflight.json'
+PREFLIGHT_TTL = 300 # seconds
 
 """
 COINMARKETCAP_API_URL, COINMARKETCAP_API_KEY, COINMARKETCAP_HEADERS,
@@ -26,12 +167,14 @@ the data cetrieved from Blockscout to calculate FIAT income.
 
 - ensure that your API_KEY is valid
 - ensure that your API_KEY has enough credits left
-- credits used for a full yearly report: 9125
+- credits used for a full yearly report: around 5
 
 - keep HEADER as is
 - ensure FIAT_ID is valid
 - ensure that CRYPTO_ID is valid and matches the blockchain
-- CALL_WAIT_TIME is set to 30 calls per minute
+- CALLS_PER_MINUTE is the maximum call rate of your API plan
+- calls slow down automatically if the API rejects them
+- RANGE_DAYS is the maximum number of days fetched within a single call
 
 - API KEY PRICING: https://coinmarketcap.com/api/pricing
 - FIAT ID CODES: - https://coinmarketcap.com/api/documentation/v1/#section/Standards-and-Conventions
@@ -48,7 +191,8 @@ COINMARKETCAP_API_URL = 'https://pro-api.coinmarketcap.com'
 COINMARKETCAP_API_KEY = '1a1a1a1a-1234-1234-1a1a-1a1a1a1a1a1a'
 COINMARKETCAP_FIAT_ID = '2790' # EUR = '2790', USD = '2781'
 COINMARKETCAP_CRYPTO_ID = '27622' # LYXe = '5625', LYX = '27622'
-COINMARKETCAP_CALL_WAIT_TIME = 3 # seconds (max 30 calls per minute ~2)
+COINMARKETCAP_CALLS_PER_MINUTE = 30 # calls
+COINMARKETCAP_RANGE_DAYS = 366 # days
 COINMARKETCAP_HEADERS = {
     'Accepts': 'application/json',
     'X-CMC_PRO_API_KEY': COINMARKETCAP_API_KEY,
@@ -2,69 +2,275 @@
 from datetime import datetime
 import sys
 import argparse
+import importlib.util
 import os
+import re
 
-# Internal library imports
-from utility.api_calls import get_coin_balance_history
-from utility.input_checks import check_blockscout_api, check_coinmarketcap_api
-from utility.input_checks import is_valid_eth_address, is_valid_year, check_file
+# Internal library imports, libraries with a slow import are loaded by the code paths using them
 from utility.terminal_outputs import printLine, printHead, printFoot, printIntro
-from utility.price_calculation import create_daily_data_with_prices, calculate_total_income
-from utility.pdf_generation import csv_to_pdf
 from utility.csv_exports import export_to_csv
 
 # Internal config data
 from config import BLOCKSCOUT_API_URL, COINMARKETCAP_HEADERS, COINMARKETCAP_API_URL
 from config import ETH1_ADDRESS, YEAR, COIN_NAME, FIAT_CURRENCY
+from utility.settings import RPC_URL
 
-def generate_income_report(dry_run_file=None):
-    # Generates the income report.
+def generate_income_report(dry_run_file=None, *, use_async=False, addresses=None, years=None, resume=False, incremental=False,
+                           from_events=False, record_file=None, replay_file=None, metrics_file=None, profile_folder=None,
+                           use_rpc=False):
+    # Generates the income reports for one or multiple addresses and years, options match the command line flags.
+    from utility.profiling import profiler
+    if profile_folder:
+        profiler.start(profile_folder)
 
-    # Start terminal outputs
-    printHead()
-    printIntro()
+    # Runs that stop early still write their profiles
+    try:
+        with profiler.phase('imports'):
+            from utility.api_calls import get_coin_balance_history_by_year
+            from utility.input_checks import probe_blockscout_api, probe_coinmarketcap_api, probe_rpc_node
+            from utility.preflight import run_preflight
+            from utility.input_checks import is_valid_eth_address, is_valid_year, check_file
+            from utility.price_calculation import create_income_report, fetch_daily_prices
+            from utility.report_states import load_report_state, save_report_state, merge_report_state, is_final_state
+            from utility.event_store import event_store, get_history_by_year
+            from utility.http_archive import http_archive
+            from utility.run_metrics import run_metrics
 
-    """"
-    Check if config data is valid.
+        run_metrics.start()
+        addresses = addresses or [ETH1_ADDRESS]
+        years = years or [YEAR]
+        is_portfolio = len(addresses) > 1
 
-    - Blockscout API must be reachable
-    - CoinMarketCap API must be accessible with API KEY
-    - Address must be valid ETH1 address
-    - Year must be a valid number
-    """
-    if not (check_blockscout_api(BLOCKSCOUT_API_URL) and
-            check_coinmarketcap_api(COINMARKETCAP_API_URL, COINMARKETCAP_HEADERS) and
-            is_valid_eth_address(ETH1_ADDRESS) and
-            is_valid_year(YEAR)):
-        printLine()
-        printLine("❌ Input validation failed. Exiting program.", True)
+        # Start terminal outputs
+        printHead()
+        printIntro()
+
+        # Record or replay every API response
+        if record_file:
+            http_archive.start_recording(record_file)
+            printLine(f"📼 Recording API responses into {os.path.basename(record_file)}", True)
+        elif replay_file:
+            if not http_archive.start_replay(replay_file):
+                printLine(f"❌ The archive {os.path.basename(replay_file)} could not be read.", True)
+                printFoot()
+                return
+            printLine(f"📼 Replaying API responses from {os.path.basename(replay_file)}", True)
+
+        """"
+        Check if config data is valid.
+
+        - Blockscout API must be reachable, or the execution node for block scans
+        - CoinMarketCap API must be accessible with API KEY
+        - APIs are probed concurrently, and skipped if they were reachable shortly before
+        - Addresses must be valid ETH1 addresses
+        - Years must be valid numbers
+        """
+        with profiler.phase('input_checks'):
+            probes = [
+                ('rpc', RPC_URL, lambda: probe_rpc_node(RPC_URL)) if use_rpc else
+                ('blockscout', BLOCKSCOUT_API_URL, lambda: probe_blockscout_api(BLOCKSCOUT_API_URL)),
+                ('coinmarketcap', COINMARKETCAP_API_URL, lambda: probe_coinmarketcap_api(COINMARKETCAP_API_URL, COINMARKETCAP_HEADERS)),
+            ]
+            inputs_valid = (run_preflight(probes) and
+                            all([is_valid_eth_address(address) for address in addresses]) and
+                            all([is_valid_year(year) for year in years]))
+        if not inputs_valid:
+            printLine()
+            printLine("❌ Input validation failed. Exiting program.", True)
+            printFoot()
+            return
         printFoot()
-        return
-    printFoot()
 
-    """
-    Check for existing CSV and PDF files
-    in the current folder and with the same name
-    """
-    file_name = f"income_report_{YEAR}_{ETH1_ADDRESS}"
-    if not check_file(file_name):
-        sys.exit("++ Aborted. File was not overwritten.\n")
+        """
+        Check for existing CSV and PDF files
+        in the current folder and with the same name.
+        Incremental updates always overwrite their reports.
+        """
+        report_names = addresses + (['portfolio'] if is_portfolio else [])
+        for year in years:
+            for report_name in report_names:
+                if not incremental and not check_file(f"income_report_{year}_{report_name}"):
+                    sys.exit("++ Aborted. File was not overwritten.\n")
 
 
-    start_time = datetime.now()
+        start_time = datetime.now()
 
-    print(f"Starting income report at {start_time.strftime('%Y-%m-%d %H:%M')}")
-    # Fetch income + withdrawal data from Blockscout
-    printHead()
+        print(f"Starting income report at {start_time.strftime('%Y-%m-%d %H:%M')}")
+        # Fetch income + withdrawal data from Blockscout
+        printHead()
 
-    daily_deltas, miner_count, withdrawal_count = get_coin_balance_history()
-    validator_earnings = miner_count + withdrawal_count
+        """
+        Scan the balance history of every address.
+
+        - All report years are collected within a single pass through the history
+        - Blocks verified for one address are shared with all following
+          addresses through the block cache, so every block is only fetched once
+        - Incremental updates only scan blocks newer than the last update
+          and add them to the stored daily deltas and counts
+        - Years that were updated after they ended are not scanned again
+        - Stored balance events replace the scan, if all years are complete
+        - Block scans of an execution node replace the balance history, if enabled
+        """
+        with profiler.phase('history_scan'):
+            histories = {}
+            states = {}
+            for address in addresses:
+                if is_portfolio:
+                    printLine(f"👛 Scanning address {address}", True)
+
+                known_blocks = None
+                scan_years = years
+                if incremental:
+                    states[address] = {year: load_report_state(address, year) for year in years}
+                    scan_years = [year for year in years if not is_final_state(states[address][year])]
+                    known_blocks = {year: states[address][year]['newest_block'] for year in scan_years if states[address][year] is not None}
+
+                if from_events:
+                    if set(years) <= event_store.load_years(address):
+                        printLine("📦 Using stored balance events instead of scanning.", True)
+                        histories[address] = get_history_by_year(event_store.load(address), years)
+                        continue
+                    printLine("🟠 Stored balance events are incomplete, scanning the balance history.", True)
+
+                if not scan_years:
+                    printLine("📦 All years were updated after they ended, skipping the scan.", True)
+                    histories[address] = {}
+                elif use_rpc:
+                    from utility.rpc_calls import get_coin_balance_history_by_year_rpc
+                    histories[address] = get_coin_balance_history_by_year_rpc(min(scan_years), max(scan_years), address, known_blocks=known_blocks)
+                elif use_async:
+                    from utility.async_api_calls import get_coin_balance_history_by_year_async
+                    histories[address] = get_coin_balance_history_by_year_async(min(scan_years), max(scan_years), address, resume, known_blocks)
+                else:
+                    histories[address] = get_coin_balance_history_by_year(min(scan_years), max(scan_years), address, resume, known_blocks)
+
+                # Final years keep their stored state without new blocks
+                if incremental:
+                    for year in years:
+                        state = states[address][year]
+                        history = histories[address][year] if year in histories[address] else ({}, 0, 0, state['newest_block'])
+                        histories[address][year] = merge_report_state(state, history)
+
+        """
+        Get price history from CoinMarketCap or local CSV file
+        for every day with income, e.g. positive deltas.
+        Multiple addresses and years share the prices of their income days.
+        Incremental updates only fetch prices of days that are not yet stored.
+        """
+        with profiler.phase('pricing'):
+            prices = None
+            if not dry_run_file and (use_async or is_portfolio or len(years) > 1 or incremental):
+                stored_prices = {}
+                for yearly_states in states.values():
+                    for state in yearly_states.values():
+                        if state is not None:
+                            stored_prices.update(state.get('prices', {}))
+
+                income_dates = set()
+                for yearly_histories in histories.values():
+                    for daily_deltas, miner_count, withdrawal_count, newest_block in yearly_histories.values():
+                        income_dates.update(date.strftime('%Y-%m-%d') for date in daily_deltas.keys())
+                income_dates.difference_update(stored_prices)
+
+                if use_async:
+                    from utility.async_api_calls import get_coin_prices_async
+                    prices = get_coin_prices_async(income_dates)
+                else:
+                    prices = fetch_daily_prices(income_dates)
+                prices.update(stored_prices)
+
+        for year in years:
+
+            # Write the report of every address
+            for address in addresses:
+                daily_deltas, miner_count, withdrawal_count, newest_block = histories[address][year]
+                with profiler.phase('pricing'):
+                    report = create_income_report(daily_deltas, address, miner_count, withdrawal_count, year, dry_run_file, prices)
+                write_report(f"income_report_{year}_{address}", report)
+
+                # Store the update, keeping earlier prices of dry runs
+                if incremental:
+                    state = states[address][year]
+                    save_report_state(address, year, histories[address][year],
+                                      prices if prices is not None else (state or {}).get('prices'))
+
+            # Write the consolidated report of all addresses
+            if is_portfolio:
+                portfolio_deltas = {}
+                portfolio_miner_count = 0
+                portfolio_withdrawal_count = 0
+                for yearly_histories in histories.values():
+                    daily_deltas, miner_count, withdrawal_count, newest_block = yearly_histories[year]
+                    for date, delta_coin in daily_deltas.items():
+                        portfolio_deltas[date] = portfolio_deltas.get(date, 0) + delta_coin
+                    portfolio_miner_count += miner_count
+                    portfolio_withdrawal_count += withdrawal_count
+
+                printLine()
+                printLine(f"👛 Consolidated report of {len(addresses)} addresses", True)
+                with profiler.phase('pricing'):
+                    report = create_income_report(portfolio_deltas, f"Portfolio of {len(addresses)} addresses",
+                                                  portfolio_miner_count, portfolio_withdrawal_count, year, dry_run_file, prices)
+                write_report(f"income_report_{year}_portfolio", report)
+
+        end_time = datetime.now()
+    
+         # Calculate the duration
+        duration = end_time - start_time
 
+        # Format the duration as hours, minutes, and seconds
+        duration_seconds = duration.total_seconds()
+        hours, minutes = divmod(duration_seconds // 60, 60)
+
+
+        # Write the index of recorded responses
+        if http_archive.recording:
+            printLine()
+            printLine(f"📼 Recorded {len(http_archive.index)} API responses.", True)
+        elif http_archive.replaying and http_archive.missing:
+            printLine()
+            printLine(f"🟠 {http_archive.missing} API calls were not recorded within the archive.", True)
+        http_archive.close()
+
+        # Show and export the API metrics of the run
+        run_metrics.finish()
+        printLine()
+        run_metrics.print_summary()
+        if metrics_file:
+            run_metrics.write(metrics_file)
+            printLine()
+            printLine(f"📊 Metrics have been written to {os.path.basename(metrics_file)}", True)
+
+        # Show the wall and CPU time of every phase
+        if profiler.enabled:
+            printLine()
+            profiler.print_summary()
+
+        # End terminal outputs, years of interrupted scans have no newest block
+        printLine()
+        if all(history[3] is not None for yearly_histories in histories.values() for history in yearly_histories.values()):
+            printLine("🏁 Income report finished successfully", True)
+        else:
+            printLine("❌ Income report incomplete. Continue with the --resume flag.", True)
+        printFoot()
+        print(f"Stopping income report at {end_time.strftime('%Y-%m-%d %H:%M')} after {int(hours):02}:{int(minutes):02}h \n\n")
+    finally:
+        profiler.finish()
+
+def write_report(file_name, report):
     """
-    Get price history from CoinMarketCap or local CSV file
-    for every day with income, e.g. positive deltas
+    Writes the CSV and PDF files of a report and shows its metrics in the terminal.
+
+    :param file_name (str): The base name of the report files.
+    :param report (IncomeReport): The daily income data and metadata of the report.
     """
-    daily_data = create_daily_data_with_prices(daily_deltas, dry_run_file)
+    from utility.pdf_generation import report_to_pdf
+    from utility.profiling import profiler
+
+    miner_count = report.miner_count
+    withdrawal_count = report.withdrawal_count
+    year = report.year
+    validator_earnings = miner_count + withdrawal_count
 
     """
     Export income data into a CSV file including
@@ -73,7 +279,8 @@ def generate_income_report(dry_run_file=None):
     - daily price and income
     """
     csv_file_name = f"{file_name}.csv"
-    export_to_csv(csv_file_name, daily_data, ['Date', 'Received ' + COIN_NAME, 'Former ' + COIN_NAME + ' Price', 'Income in ' + FIAT_CURRENCY])
+    with profiler.phase('csv_export'):
+        export_to_csv(csv_file_name, report.rows(), report.headers)
     printLine()
 
     """
@@ -83,14 +290,14 @@ def generate_income_report(dry_run_file=None):
     - Measure failure tolerance of days without price
     - Show total withdrawal listings and miner records
     """
-    total_income, total_coins, missing_data_count = calculate_total_income(daily_data)
-    total_rows = len(daily_data)
+    total_income, total_coins, missing_data_count = report.summary
+    total_rows = len(report.dates)
     total_coins_formatted = f"{total_coins:.8f}"
 
     printLine(f"⏩ The address received a total of {validator_earnings} validator payments from:", True)
     printLine(f"⏩ {withdrawal_count} withdrawal listings and {miner_count} miner records.", True)
     printLine()
-    printLine(f"⏩ Received {total_coins_formatted} {COIN_NAME} in {YEAR} worth", True)
+    printLine(f"⏩ Received {total_coins_formatted} {COIN_NAME} in {year} worth", True)
     printLine(f"⏩ {total_income} {FIAT_CURRENCY} in price-adjusted income.", True)
     printLine()
     printLine(f"🔎 {missing_data_count} of {total_rows} days with income are missing price data", True)
@@ -104,23 +311,8 @@ def generate_income_report(dry_run_file=None):
     - Detailed pages for every month, showing daily income 
     """
     pdf_file_name = f"{file_name}.pdf"
-    csv_to_pdf(csv_file_name, pdf_file_name, miner_count, withdrawal_count)
-
-    end_time = datetime.now()
-    
-     # Calculate the duration
-    duration = end_time - start_time
-
-    # Format the duration as hours, minutes, and seconds
-    duration_seconds = duration.total_seconds()
-    hours, minutes = divmod(duration_seconds // 60, 60)
-
-
-    # End terminal outputs
-    printLine()
-    printLine("🏁 Income report finished successfully", True)
-    printFoot()
-    print(f"Stopping income report at {end_time.strftime('%Y-%m-%d %H:%M')} after {int(hours):02}:{int(minutes):02}h \n\n")
+    with profiler.phase('pdf'):
+        report_to_pdf(report, pdf_file_name)
 
 # Execute report when script is called
 if __name__ == '__main__':
@@ -129,6 +321,18 @@ if __name__ == '__main__':
         parser = argparse.ArgumentParser(description="Generate LYX income report")
         parser.add_argument('--dry-run', type=str, help='Use a local CSV file with daily prices instead of API')
         parser.add_argument('--pdf-only', type=str, help='Use an existing CSV file to generate PDF only')
+        parser.add_argument('--async', dest='use_async', action='store_true', help='Fetch API data concurrently on an event loop')
+        parser.add_argument('--rpc', dest='use_rpc', action='store_true', help='Scan the blocks of an execution node with JSON-RPC batches instead of the Blockscout API')
+        parser.add_argument('--addresses', type=str, nargs='+', help='Generate reports for multiple addresses and a consolidated portfolio report')
+        parser.add_argument('--years', type=str, help='Generate reports for a range of years, e.g. 2023-2025, within a single pass')
+        parser.add_argument('--resume', action='store_true', help='Continue interrupted balance history scans from their last checkpoint')
+        parser.add_argument('--incremental', action='store_true', help='Only add blocks since the last update to the stored reports')
+        parser.add_argument('--from-events', action='store_true', help='Build reports of past years from stored balance events without scanning')
+        parser.add_argument('--profile', type=str, nargs='?', const='profiles', help='Profile every phase, writing pstats and collapsed stack files into a folder (default: profiles)')
+        parser.add_argument('--metrics', type=str, help='Write the API metrics of the run as JSON, or as Prometheus textfile if ending with .prom')
+        archive_group = parser.add_mutually_exclusive_group()
+        archive_group.add_argument('--record', type=str, help='Record all API responses into a compressed archive')
+        archive_group.add_argument('--replay', type=str, help='Replay all API responses from a recorded archive without network calls')
         args = parser.parse_args()
 
         # Validate optional file paths
@@ -139,6 +343,9 @@ if __name__ == '__main__':
             if not args.dry_run.lower().endswith('.csv'):
                 print(f"❌ The dry-run file '{args.dry_run}' is not a .csv file.")
                 sys.exit(1)
+        if args.replay and not os.path.isfile(args.replay):
+            print(f"❌ The replay archive '{args.replay}' does not exist or is not a file.")
+            sys.exit(1)
         if args.pdf_only:
             if not os.path.isfile(args.pdf_only):
                 print(f"❌ The pdf-only file '{args.pdf_only}' does not exist or is not a file.")
@@ -147,18 +354,55 @@ if __name__ == '__main__':
                 print(f"❌ The pdf-only file '{args.pdf_only}' is not a .csv file.")
                 sys.exit(1)
 
+        # Validate optional year range
+        years = None
+        if args.years:
+            year_range = re.match(r'^(\d{4})(?:-(\d{4}))?$', args.years.strip())
+            if not year_range or int(year_range.group(2) or year_range.group(1)) < int(year_range.group(1)):
+                print(f"❌ The year range '{args.years}' is not valid. Use a format like 2023-2025.")
+                sys.exit(1)
+            years = list(range(int(year_range.group(1)), int(year_range.group(2) or year_range.group(1)) + 1))
+
+        # Validate optional async engine
+        if args.use_async:
+            if importlib.util.find_spec('aiohttp') is None:
+                print("❌ The --async flag requires the aiohttp library: pip install aiohttp")
+                sys.exit(1)
+            if args.use_rpc:
+                print("❌ The --async flag can not be combined with the --rpc flag.")
+                sys.exit(1)
+
+        # Block scans of an execution node do not store checkpoints
+        if args.resume and args.use_rpc:
+            print("❌ The --resume flag can not be combined with the --rpc flag.")
+            sys.exit(1)
+
         # Only generate PDF from CSV
         if args.pdf_only:
+            from utility.profiling import profiler
+            if args.profile:
+                profiler.start(args.profile)
+
+            with profiler.phase('imports'):
+                from utility.pdf_generation import csv_to_pdf
             printHead()
             file_base = os.path.splitext(args.pdf_only)[0]
             pdf_file_name = file_base + ".pdf"
-            csv_to_pdf(args.pdf_only, pdf_file_name, miner_count=0, withdrawal_count=0)
+            with profiler.phase('pdf'):
+                csv_to_pdf(args.pdf_only, pdf_file_name, miner_count=0, withdrawal_count=0)
+            if profiler.enabled:
+                printLine()
+                profiler.print_summary()
+                printLine()
             printLine("🏁 PDF generated successfully.", True)
             printFoot()
             sys.exit(0)
 
         # Run main reporter script
-        generate_income_report(args.dry_run)
+        generate_income_report(args.dry_run, use_async=args.use_async, addresses=args.addresses, years=years,
+                               resume=args.resume, incremental=args.incremental, from_events=args.from_events,
+                               record_file=args.record, replay_file=args.replay, metrics_file=args.metrics,
+                               profile_folder=args.profile, use_rpc=args.use_rpc)
     # Script gets exited
     except KeyboardInterrupt:
         print("\n\nProgram interrupted by user. Exiting gracefully. \n")
@@ -1,6 +1,6 @@
-from utility.api_calls import get_coin_price
+from utility.api_calls import get_coin_prices
+from utility.price_store import price_store
 
-import csv
 from datetime import date, timedelta
 
 OUTPUT_CSV = "local_price_list.csv"
@@ -16,16 +16,8 @@ def daterange(start: date, end: date):
 
 
 if __name__ == "__main__":
-    with open(OUTPUT_CSV, "w", newline="", encoding="utf-8") as f:
-        writer = csv.writer(f)
+    # Fetch all days missing in the price store in date ranges
+    get_coin_prices(daterange(START_DATE, END_DATE))
 
-        writer.writerow(["Date", "Former LYX Price"])
-
-        for d in daterange(START_DATE, END_DATE):
-            price = get_coin_price(d)
-
-            if price is None:
-                continue
-
-            writer.writerow([d.isoformat(), f"{price:.10f}"])
-            f.flush()  # Save progress to file
+    # Write all stored prices of the timeframe
+    price_store.export_csv(OUTPUT_CSV, START_DATE.isoformat(), END_DATE.isoformat())
@@ -0,0 +1,54 @@
+from utility.price_store import price_store
+
+import argparse
+from datetime import date, datetime, timedelta
+
+from config import COINMARKETCAP_CRYPTO_ID, COINMARKETCAP_FIAT_ID
+
+# Import, export, and audit prices of the local price store
+
+def daterange(start: date, end: date):
+    cur = start
+    while cur <= end:
+        yield cur
+        cur += timedelta(days=1)
+
+def parse_date(value: str) -> date:
+    return datetime.strptime(value.strip(), "%Y-%m-%d").date()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the local price store")
+    parser.add_argument('--crypto-id', type=str, default=COINMARKETCAP_CRYPTO_ID, help='CoinMarketCap crypto ID of the prices')
+    parser.add_argument('--fiat-id', type=str, default=COINMARKETCAP_FIAT_ID, help='CoinMarketCap fiat ID of the prices')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='Import a local price list')
+    import_parser.add_argument('file', type=str, help='CSV file with Date and price columns')
+
+    export_parser = commands.add_parser('export', help='Export prices into a local price list')
+    export_parser.add_argument('file', type=str, help='CSV file to write')
+    export_parser.add_argument('--start', type=parse_date, required=True, help='First date, e.g. 2025-01-01')
+    export_parser.add_argument('--end', type=parse_date, required=True, help='Last date, e.g. 2025-12-31')
+
+    missing_parser = commands.add_parser('missing', help='Print dates without stored price')
+    missing_parser.add_argument('--start', type=parse_date, required=True, help='First date, e.g. 2023-06-06')
+    missing_parser.add_argument('--end', type=parse_date, required=True, help='Last date, e.g. 2025-12-31')
+
+    args = parser.parse_args()
+
+    if args.command == 'import':
+        count = price_store.import_csv(args.file, args.crypto_id, args.fiat_id)
+        print(f"Imported {count} prices from {args.file}")
+
+    elif args.command == 'export':
+        count = price_store.export_csv(args.file, args.start.isoformat(), args.end.isoformat(), args.crypto_id, args.fiat_id)
+        print(f"Exported {count} prices to {args.file}")
+
+    elif args.command == 'missing':
+        stored_prices = price_store.get_range(args.start.isoformat(), args.end.isoformat(), args.crypto_id, args.fiat_id)
+
+        # Print out missing dates
+        for d in daterange(args.start, args.end):
+            if d.isoformat() not in stored_prices:
+                print(f"\"{d.isoformat()}\",")
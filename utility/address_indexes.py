@@ -0,0 +1,76 @@
+# INDEXES BLOCK LISTINGS OF AN ADDRESS
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+
+class AddressIndex:
+    """
+    Block numbers of a block listing of an address within the report timeframe,
+    independent of how its pages are fetched from the Blockscout API.
+
+    - Items of a page are decoded by the given function into block numbers and dates
+    - Pages are added from the latest to the oldest item
+    - Items after the timeframe are paged through, but not indexed
+    - Paging stops before the timeframe or at the blocks of an earlier update
+    - Balance events are only classified by the index, once all pages were added
+    - Blocks after the newest block of the listing can be missing, as they were added after it was taken
+    """
+
+    def __init__(self, description, decode_items, timeframe_min_date, timeframe_max_date, stop_block=None):
+        self.description = description
+        self.decode_items = decode_items
+        self.timeframe_min_date = timeframe_min_date
+        self.timeframe_max_date = timeframe_max_date
+        self.stop_block = stop_block
+        self.newest_block = None
+        self.blocks = set()
+        self.item_count = 0
+        self.next_page_params = None
+        self.finished = False
+
+    def page_params(self):
+        """
+        Returns the iteration parameters of the next listing page
+        and shows the number of indexed items in the terminal report.
+
+        :return (dict): Query parameters for the next API call.
+        """
+        printLine(f"⚪️ Indexing {self.description}, Found: {self.item_count}")
+        return self.next_page_params or {}
+
+    def add_page(self, data):
+        """
+        Adds a page of up to 50 items of the address.
+
+        :param data (dict): The decoded listing page.
+        """
+        for block_number, item_date in self.decode_items(data['items']):
+
+            # Stop at the start of the timeframe or at the last update
+            if item_date < self.timeframe_min_date or (self.stop_block is not None and block_number <= self.stop_block):
+                self.finished = True
+                return
+
+            if item_date <= self.timeframe_max_date:
+                self.blocks.add(block_number)
+                self.item_count += 1
+
+        self.next_page_params = data.get('next_page_params')
+
+        # If there are no more items, the index is complete
+        if not self.next_page_params:
+            self.finished = True
+
+    def contains(self, block_number):
+        """
+        :param block_number (int): The block number of a balance event.
+        :return (bool): True if the block is listed for the address.
+        """
+        return block_number in self.blocks
+
+    def covers(self, block_number):
+        """
+        :param block_number (int): The block number of a balance event.
+        :return (bool): True if the block existed when the listing was taken, so the index is complete for it.
+        """
+        return self.newest_block is not None and block_number <= self.newest_block
@@ -1,19 +1,121 @@
 # FETCHES API DATA
 
 # External libraries
-import requests
-from datetime import datetime
-import time
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from datetime import datetime, timezone
 
 # Internal library imports
 from utility.terminal_outputs import printLine
+from utility.block_cache import block_cache
+from utility.block_index import block_index
+from utility.price_store import price_store
+from utility.http_client import fetch_json
+from utility.run_metrics import run_metrics
+from utility.history_scan import BalanceHistoryScan
+from utility.address_indexes import AddressIndex
+from utility.checkpoints import save_checkpoint, load_checkpoint, remove_checkpoint
+from utility.event_store import event_store
+from utility.decoders import parse_block_time, decode_withdrawal_items, decode_validated_block_items
 
 # Internal config data
-from config import BLOCKSCOUT_API_URL, BLOCKSCOUT_API_KEY, COINMARKETCAP_API_URL
-from config import COINMARKETCAP_CRYPTO_ID, COINMARKETCAP_FIAT_ID, COINMARKETCAP_HEADERS
-from config import ETH1_ADDRESS, YEAR, BLOCKSCOUT_CALL_WAIT_TIME, COINMARKETCAP_CALL_WAIT_TIME
+from config import BLOCKSCOUT_API_URL, COINMARKETCAP_API_URL
+from config import COINMARKETCAP_CRYPTO_ID, COINMARKETCAP_FIAT_ID, ETH1_ADDRESS, YEAR
+from utility.settings import COINMARKETCAP_RANGE_DAYS, BLOCKSCOUT_VERIFY_WORKERS, CHECKPOINT_INTERVAL
+from utility.settings import BLOCKSCOUT_ADDRESS_WITHDRAWALS, BLOCKSCOUT_VALIDATED_BLOCKS
 
-def get_coin_balance_history():
+# Blocks after the end of a year that are checked for a first withdrawal
+WITHDRAWAL_START_BLOCKS = 32
+
+# Days without income after which a new price range is started, as every day within a range is billed
+OHLCV_MAX_GAP_DAYS = 14
+
+# Endpoints, listing paths, and item decoders of the address indexes
+ADDRESS_LISTINGS = {
+    'withdrawals': ('blockscout_address_withdrawals', 'withdrawals', decode_withdrawal_items),
+    'validated blocks': ('blockscout_validated_blocks', 'blocks-validated', decode_validated_block_items),
+}
+
+def get_coin_balance_history(address=ETH1_ADDRESS):
+    """
+    Fetches the income metrics of the configured report year.
+
+    :param address (str, optional): The ETH1 address to scan. Defaults to the configured address.
+    :return (dict): A dictionary of dates and their coin deltas.
+    :return (int): Number of times the validator was listed as miner
+    :return (int): Number of times the validator was listed as withdrawal address
+    """
+    return scan_coin_balance_history(address).result()
+
+def get_coin_balance_history_by_year(first_year, last_year, address=ETH1_ADDRESS, resume=False, known_blocks=None):
+    """
+    Fetches the income metrics of multiple years within a single pass through the balance history.
+
+    :param first_year (int): The first report year.
+    :param last_year (int): The last report year.
+    :param address (str, optional): The ETH1 address to scan. Defaults to the configured address.
+    :param resume (bool, optional): Continue from the last checkpoint of the same scan.
+    :param known_blocks (dict, optional): Newest blocks per year of an earlier update, only newer blocks are scanned.
+    :return (dict): Years mapped to their daily deltas, miner count, withdrawal count, and newest block.
+    """
+    return scan_coin_balance_history(address, first_year, last_year, resume, known_blocks).result_by_year()
+
+def start_coin_balance_history_scan(address, first_year, last_year, resume=False, known_blocks=None):
+    """
+    Creates a balance history scan, either from its last checkpoint
+    or starting at the end of the last report year.
+
+    :param address (str): The ETH1 address to scan.
+    :param first_year (int): The first report year.
+    :param last_year (int): The last report year.
+    :param resume (bool, optional): Continue from the last checkpoint of the same scan.
+    :param known_blocks (dict, optional): Newest blocks per year of an earlier update.
+    :return (BalanceHistoryScan): The new scan.
+    :return (list): Unverified candidate blocks of the checkpoint.
+    """
+    checkpoint = load_checkpoint(address, first_year, last_year) if resume else None
+
+    # Checkpoints can only continue scans that started from the same update
+    expected_blocks = {str(report_year): block for report_year, block in (known_blocks or {}).items()}
+    if checkpoint is not None and checkpoint.get('known_blocks', {}) != expected_blocks:
+        printLine("🟠 Checkpoint belongs to another update, starting a new scan.", True)
+        checkpoint = None
+
+    if checkpoint is None:
+        return BalanceHistoryScan(address, first_year, seek_history_start(last_year), last_year, known_blocks), []
+
+    scan = BalanceHistoryScan(address, first_year, None, last_year, known_blocks)
+    return scan, scan.restore(checkpoint)
+
+def finish_coin_balance_history_scan(scan, candidates):
+    """
+    Removes the checkpoint of a complete scan and stores its balance events,
+    or stores the progress of an interrupted one.
+
+    - Past years are complete, if they were fully scanned or extend complete events
+    - Scans with blocks that could not be verified are interrupted, so their years are not marked complete
+    - The block cache is saved once per scan instead of with every checkpoint
+
+    :param scan (BalanceHistoryScan): The stopped scan.
+    :param candidates (list): Candidate blocks that were not yet verified, as tuples of block number, date, and delta.
+    """
+    block_cache.save()
+    if scan.complete:
+        stored_years = event_store.load_years(scan.address)
+        complete_years = [
+            report_year for report_year in scan.yearly_counts
+            if report_year < datetime.now(timezone.utc).year
+            and (report_year not in scan.known_blocks or report_year in stored_years)
+        ]
+        event_store.add(scan.address, scan.event_array(), complete_years)
+        remove_checkpoint(scan.address, scan.timeframe_min_date.year, scan.last_year)
+    else:
+        if scan.unverified_blocks:
+            printLine(f"❌ Report incomplete, {len(scan.unverified_blocks)} blocks could not be verified.", True)
+        save_checkpoint(scan, candidates)
+        printLine("💾 Progress saved. Continue with the --resume flag.", True)
+
+def scan_coin_balance_history(address=ETH1_ADDRESS, first_year=YEAR, last_year=None, resume=False, known_blocks=None):
     """
     Uses the Blockscout REST API to fetch the coin balance history
     based on the latest coin change events.
@@ -21,181 +123,203 @@ def get_coin_balance_history():
     - Iterates through all balance changes in batch of 50
     - Fetches data until it hit the end of timeframe or is out of balance events
     - When timeframe is valid, stores dates and calculates daily positive incomes
-
-    :return (dict): A dictionary of dates and their coin deltas.
-    :return (int): Number of times the validator was listed as miner
-    :return (int): Number of times the validator was listed as withdrawal address
+    - With multiple verify workers, blocks are verified while the next pages are fetched
+    - For past years, paging starts at the end of the year instead of the latest block
+    - Progress is checkpointed periodically and when the scan stops early
+    - Paging stops at the blocks of an earlier update, if they are given
+    - Candidate blocks are classified with the withdrawals and validated blocks of the address, if enabled
+
+    :param address (str, optional): The ETH1 address to scan. Defaults to the configured address.
+    :param first_year (int, optional): The first report year. Defaults to the configured year.
+    :param last_year (int, optional): The last report year. Defaults to the first year.
+    :param resume (bool, optional): Continue from the last checkpoint of the same scan.
+    :param known_blocks (dict, optional): Newest blocks per year of an earlier update.
+    :return (BalanceHistoryScan): The finished scan with its income metrics.
     """
+    last_year = last_year or first_year
 
     # REST API GET CALL
-    url = f'{BLOCKSCOUT_API_URL}/v2/addresses/{ETH1_ADDRESS}/coin-balance-history'
-
-    if BLOCKSCOUT_API_KEY is not None:
-        url += f'&apikey={BLOCKSCOUT_API_KEY}'
-
-    # Income delta objects
-    daily_deltas = {}
-    miner_count = 0
-    withdrawal_count = 0
-    eth_decimal_factor = 10**18
-
-    # Iteration parameters for API calls
-    next_page_params = None
-    timeframe_min_date = datetime(YEAR, 1, 1).date()
-    timeframe_max_date = datetime(YEAR, 12, 31).date()
-    start_collecting = False
-
-    # API failure tolerance
-    retries = 3 # tries
-    backoff_factor = 2 # tries
-    timeout = 10  # seconds
-
-    while True:
-        params = {}
-
-        # Check if last API call had attached iteration parameters
-        if next_page_params:
-            params = next_page_params
-
-        # Show status and depth of history events in terminal report
-        block_number = params.get('block_number', 'Latest')
-        items_count = params.get('items_count', '0')
-        printLine(f"⚪️ Fetching data, Block: {block_number}, Balance History Depth: {items_count}")
-
-        for attempt in range(retries):
-            try:
-                # Call Blockscout API with parameters
-                response = requests.get(url, params=params, timeout=timeout)
-
-                # Raise exception for HTTP errors
-                response.raise_for_status()  
-                data = response.json()
-
-                # Break the retry loop if the request was successful
-                break  
-            except (requests.ConnectionError, requests.Timeout) as e:
-                printLine(f"🟡 Network error. Retrying. {attempt + 1}/{retries}.", True)
-                time.sleep(backoff_factor ** attempt)
-            except requests.RequestException as e:
-                printLine(f"🔴 Error fetching Blockscout data.", True)
+    url = f'{BLOCKSCOUT_API_URL}/v2/addresses/{address}/coin-balance-history'
+    scan, checkpoint_candidates = start_coin_balance_history_scan(address, first_year, last_year, resume, known_blocks)
+    withdrawal_index = get_address_index(scan, 'withdrawals') if BLOCKSCOUT_ADDRESS_WITHDRAWALS else None
+    miner_index = get_address_index(scan, 'validated blocks') if BLOCKSCOUT_VALIDATED_BLOCKS else None
+
+    # Candidate blocks in history order, waiting to be verified and merged
+    pending = deque()
+    executor = None
+    if BLOCKSCOUT_VERIFY_WORKERS > 1:
+        executor = ThreadPoolExecutor(max_workers=BLOCKSCOUT_VERIFY_WORKERS)
+    max_pending = BLOCKSCOUT_VERIFY_WORKERS * 4
+
+    def merge_verified_blocks(wait_all=False):
+        """
+        Merges verified candidate blocks into the income metrics in history order,
+        so the results do not depend on which worker finished first.
+
+        :param wait_all (bool, optional): Wait for all candidates instead of only finished ones.
+        """
+        while pending:
+            candidate, verification = pending[0]
+
+            # Verification is still running in a worker
+            if executor is not None:
+                if not (wait_all or verification.done() or len(pending) > max_pending):
+                    break
+                verification = verification.result()
+
+            pending.popleft()
+            scan.add_classified_block(candidate, verification)
+
+    def queue_candidates(candidates):
+        # Verify if the address is listed in the withdrawals or the miner, using cached blocks first
+        for candidate in candidates:
+            if executor is None:
+                verification = classify_block(candidate[0], address, withdrawal_index, miner_index)
+            else:
+                verification = executor.submit(classify_block, candidate[0], address, withdrawal_index, miner_index)
+            pending.append((candidate, verification))
+
+    try:
+        queue_candidates(checkpoint_candidates)
+        page_count = 0
+
+        while not scan.finished:
+
+            # Call Blockscout API with parameters
+            data = fetch_json('blockscout_history', url, scan.page_params(), 'Blockscout data')
+            if data is None:
+                printLine("❌ Report incomplete. Please retry.", True)
 
                 # Return what has been collected so far
-                return daily_deltas, miner_count, withdrawal_count
-        else:
-            printLine(f"❌ Failed to fetch Blockscount data after {retries} attempts.", True)
-            printLine("❌ Report incomplete. Please retry.", True)
-
-            # Return what has been collected so far
-            return daily_deltas, miner_count, withdrawal_count
-
-        # Check if timeframe has been entered or not
-        searchStatus = False
-        collectStatus = False
-
-        # For every entry within the batch of 50 historical balance events
-        for item in data['items']:
-
-            # Extract data from each item
-            transaction_date = datetime.strptime(item['block_timestamp'], '%Y-%m-%dT%H:%M:%SZ').date()
-            delta = int(item['delta'])
-            item_block_number = item['block_number']
-
-            # Monitor and toggle data fetching status
-            if not start_collecting:
-
-                # Event is outside the defined report timeframe, continue searching
-                if not searchStatus:
-                    printLine(f"🟡 {transaction_date}, searching events in timeframe", True)
-                    searchStatus = True
-                
-                # Event is inside the defined report timeframe, start collecting
-                if transaction_date <= timeframe_max_date:
-                    printLine(f"🟢 {transaction_date}, found events within timeframe", True)
-                    start_collecting = True
-
-            # If data is within the report timeframe
-            if start_collecting:
-                
-                # Check if the events are outside the end date
-                if transaction_date < timeframe_min_date:
-                    printLine(f"🏁 {transaction_date}, stopping due to end of timeframe", True)
-                    return daily_deltas, miner_count, withdrawal_count
-
-                # Only consider positive deltas, if income was withdrawn from validator
-                if delta > 0:
-
-                    is_miner = False
-                    is_withdrawal = False
-
-                    # Fetch block withdrawals to verify if the address is listed in the withdrawals
-                    block_withdrawals = get_block_withdrawals(item_block_number)
-                    if block_withdrawals is not None:
-                        is_withdrawal = any(
-                            withdrawal['receiver']['hash'] == ETH1_ADDRESS
-                            for withdrawal in block_withdrawals.get('items', [])
-                        )
-
-                    # Log if the address is found in withdrawals
-                    if is_withdrawal:
-                        withdrawal_count += 1
-                        printLine(f"💵 Found validator withdrawal reward in block {item_block_number}. Total: {withdrawal_count}", True)
-                    else:
-                        # Fetch block details to verify if the address is the miner
-                        block_details = get_block_details(item_block_number)
-                        miner_count += 1
-                        is_miner = True
-                        if block_details and block_details.get('miner', {}).get('hash') == ETH1_ADDRESS:
-                            printLine(f"🧱 Found validator miner reward in block {item_block_number}. Total: {miner_count}", True)
-
-                    # Only count deltas if the address is the miner or listed in the withdrawals
-                    if is_miner or is_withdrawal:
-                        # If it is the first event, start collecting deltas from now on
-                        if not collectStatus:
-                            collectStatus = True
-                    
-                        """
-                        Add date and delta amount to the income metrics list
-                        If date already exists, add current delta to the existing one
-                        """
-                        delta_coin = delta / eth_decimal_factor
-                        daily_deltas[transaction_date] = daily_deltas.get(transaction_date, 0) + delta_coin
-
-        next_page_params = data.get('next_page_params')
-
-        # Wait to respect rate limits
-        time.sleep(BLOCKSCOUT_CALL_WAIT_TIME)
-
-        # If there are no more coin balance history events, break the loop
-        if not next_page_params or int(next_page_params.get('block_number', 1)) == 0:
-            printLine("🏁 No further balance history available, ending data fetch.", True)
-            break
+                break
 
-    # Return daily income metrics list
-    return daily_deltas, miner_count, withdrawal_count
+            run_metrics.add_page(len(data.get('items', [])))
+            queue_candidates(scan.add_page(data))
+
+            # Merge finished verifications while the next page is fetched
+            merge_verified_blocks()
+
+            # Periodically store the progress, including candidates still being verified
+            page_count += 1
+            if not scan.finished and page_count % CHECKPOINT_INTERVAL == 0:
+                save_checkpoint(scan, [candidate for candidate, verification in pending])
+
+        # Wait for all remaining verifications
+        merge_verified_blocks(wait_all=True)
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        finish_coin_balance_history_scan(scan, [candidate for candidate, verification in pending])
+
+    # Return scan with daily income metrics list
+    return scan
 
 def get_coin_price(date):
     """
     Uses the CoinMarketCap REST API to fetch the OHLCV coin price of a historical day.
     Calculates the median value from open and closing position
+    Prices are read from and written to the local price store.
 
     :param date (datetime or 'YYYY-MM-DD' string): The date for which to fetch the coin price.
     :return (float or None): The median coin price for the given date, None if an error occurs.
     """
+    date_obj = normalize_date(date)
+    date_string = date_obj.strftime('%Y-%m-%d')
+
+    # Use the stored price if it was fetched before
+    stored_prices = price_store.get_many([date_string])
+    if date_string in stored_prices:
+        return stored_prices[date_string]
+
+    # REST API GET CALL
+    url = COINMARKETCAP_API_URL + '/v2/cryptocurrency/ohlcv/historical'
+    params = get_ohlcv_params(date_obj)
+
+    # Call CoinMarketCap API with parameters
+    data = fetch_json('coinmarketcap_ohlcv', url, params, 'CoinMarketCap data')
+    if data is None:
+        return None
+
+    median_price = extract_median_price(data, date)
+    price_store.upsert({date_string: median_price})
+    return median_price
 
-    # Normalize `date` to a date object
+def get_coin_prices(dates):
+    """
+    Uses the CoinMarketCap REST API to fetch the OHLCV coin prices of many historical days.
+    Days are fetched in date ranges, so a full year only needs a single call.
+    Only days missing within the local price store are fetched.
+
+    :param dates (iterable): Dates as date objects or 'YYYY-MM-DD' strings.
+    :return (dict): Median prices by 'YYYY-MM-DD' date, None if unavailable.
+    """
+    url = COINMARKETCAP_API_URL + '/v2/cryptocurrency/ohlcv/historical'
+    date_objs, stored_prices, missing_date_objs = get_stored_prices(dates)
+    prices = {}
+
+    for start_date, end_date in get_ohlcv_ranges(missing_date_objs):
+        printLine(f"💱 Fetching prices from {start_date} to {end_date}", True)
+
+        # Call CoinMarketCap API with parameters
+        data = fetch_json('coinmarketcap_ohlcv', url, get_ohlcv_range_params(start_date, end_date), 'CoinMarketCap data')
+        if data is not None:
+            prices.update(extract_median_prices(data))
+
+    return store_range_prices(date_objs, stored_prices, missing_date_objs, prices)
+
+def get_stored_prices(dates):
+    """
+    Looks up the prices of many days within the local price store.
+
+    :param dates (iterable): Dates as date objects or 'YYYY-MM-DD' strings.
+    :return (list): All sorted date objects.
+    :return (dict): Stored prices by 'YYYY-MM-DD' date.
+    :return (list): Sorted date objects without stored price.
+    """
+    date_objs = sorted({normalize_date(date) for date in dates})
+    stored_prices = price_store.get_many(date_obj.strftime('%Y-%m-%d') for date_obj in date_objs)
+    missing_date_objs = [date_obj for date_obj in date_objs if date_obj.strftime('%Y-%m-%d') not in stored_prices]
+    return date_objs, stored_prices, missing_date_objs
+
+def store_range_prices(date_objs, stored_prices, missing_date_objs, prices):
+    """
+    Writes fetched prices into the local price store and merges them with the stored prices.
+
+    :param date_objs (list): All sorted date objects.
+    :param stored_prices (dict): Stored prices by 'YYYY-MM-DD' date.
+    :param missing_date_objs (list): Sorted date objects without stored price.
+    :param prices (dict): Fetched median prices by date object.
+    :return (dict): Median prices of all dates by 'YYYY-MM-DD' date, None if unavailable.
+    """
+    fetched_prices = {date_obj.strftime('%Y-%m-%d'): get_range_price(prices, date_obj) for date_obj in missing_date_objs}
+    price_store.upsert(fetched_prices)
+    all_prices = {**stored_prices, **fetched_prices}
+    return {date_obj.strftime('%Y-%m-%d'): all_prices[date_obj.strftime('%Y-%m-%d')] for date_obj in date_objs}
+
+def normalize_date(date):
+    """
+    Normalizes a date given as string, datetime, or date object.
+
+    :param date (datetime, date, or 'YYYY-MM-DD' string): The date to normalize.
+    :return (date): The date object.
+    """
     if isinstance(date, str):
         # expect 'YYYY-MM-DD'
-        date_obj = datetime.strptime(date.strip(), '%Y-%m-%d').date()
+        return datetime.strptime(date.strip(), '%Y-%m-%d').date()
     elif isinstance(date, datetime):
-        date_obj = date.date()
+        return date.date()
     else:
         # assume it's already a datetime.date
-        date_obj = date
+        return date
 
-    # REST API GET CALL
-    url = COINMARKETCAP_API_URL + '/v2/cryptocurrency/ohlcv/historical'
-    headers = COINMARKETCAP_HEADERS
-    params = {
+def get_ohlcv_params(date_obj):
+    """
+    Builds the CoinMarketCap OHLCV parameters for a single historical day.
+
+    :param date_obj (date): The day to fetch.
+    :return (dict): Query parameters of the API call.
+    """
+    return {
         'id': COINMARKETCAP_CRYPTO_ID,
         'convert_id': COINMARKETCAP_FIAT_ID,
         'time_period': 'daily',
@@ -203,30 +327,45 @@ def get_coin_price(date):
         'time_end': date_obj.strftime('%Y-%m-%d')
     }
 
-    # API failure tolerance
-    retries = 3 # tries
-    backoff_factor = 2 # tries
-    timeout = 10  # seconds
+def get_ohlcv_ranges(date_objs):
+    """
+    Groups sorted days into date ranges of at most COINMARKETCAP_RANGE_DAYS days.
+    Every range starts and ends at a requested day, and gaps of more than OHLCV_MAX_GAP_DAYS days
+    start a new range, so days within long gaps are not fetched.
 
-    for attempt in range(retries):
-        try:
-            # Call CoinMarketCap API with parameters
-            response = requests.get(url, headers=headers, params=params, timeout=timeout)
-            response.raise_for_status()
-            data = response.json()
-
-            # Break the retry loop if the request was successful
-            break  
-        except (requests.ConnectionError, requests.Timeout) as e:
-            printLine(f"🟡 Network error. Retrying. {attempt + 1}/{retries}.", True)
-            time.sleep(backoff_factor ** attempt)
-        except requests.RequestException as e:
-            printLine(f"🔴 Error fetching CoinMarketCap data.", True)
-            return None
-    else:
-        printLine(f"❌ Failed to fetch CoinMarketCap data after {retries} attempts.", True)
-        return None
+    :param date_objs (list): Sorted date objects.
+    :return (list): Tuples of the first and last date of every range.
+    """
+    ranges = []
+    for date_obj in date_objs:
+        if (ranges and (date_obj - ranges[-1][0]).days < COINMARKETCAP_RANGE_DAYS
+                and (date_obj - ranges[-1][1]).days <= OHLCV_MAX_GAP_DAYS):
+            ranges[-1][1] = date_obj
+        else:
+            ranges.append([date_obj, date_obj])
+    return [tuple(date_range) for date_range in ranges]
+
+def get_ohlcv_range_params(start_date, end_date):
+    """
+    Builds the CoinMarketCap OHLCV parameters for a range of historical days.
+
+    :param start_date (date): The first day to fetch.
+    :param end_date (date): The last day to fetch.
+    :return (dict): Query parameters of the API call.
+    """
+    params = get_ohlcv_params(start_date)
+    params['time_end'] = end_date.strftime('%Y-%m-%d')
+    params['count'] = (end_date - start_date).days + 1
+    return params
+
+def extract_median_price(data, date):
+    """
+    Calculates the median price of a day from an OHLCV response.
 
+    :param data (dict): The decoded CoinMarketCap OHLCV response.
+    :param date (date or str): The requested day, used for terminal outputs.
+    :return (float or None): The median coin price, None if no price data is available.
+    """
     try:
         # Extract open and closing price
         ohlcv = data['data']['quotes'][0]['quote'][COINMARKETCAP_FIAT_ID]
@@ -236,14 +375,77 @@ def get_coin_price(date):
         # Calculate daily median price
         median_price = (open_price + close_price) / 2
 
-        # Wait to respect rate limits
-        time.sleep(COINMARKETCAP_CALL_WAIT_TIME)
-
         return median_price
     except (KeyError, IndexError) as e:
         printLine(f"🟠 No available CoinMarketCap price data for {date}.", True)
         return None
 
+def extract_median_prices(data):
+    """
+    Calculates the median prices of all days within an OHLCV range response.
+
+    :param data (dict): The decoded CoinMarketCap OHLCV response.
+    :return (dict): Median prices by date object.
+    """
+    prices = {}
+    try:
+        quotes = data['data']['quotes']
+    except (KeyError, TypeError) as e:
+        return prices
+
+    for quote in quotes:
+        try:
+            # Extract open and closing price of the day
+            ohlcv = quote['quote'][COINMARKETCAP_FIAT_ID]
+            quote_date = datetime.strptime(quote['time_open'][:10], '%Y-%m-%d').date()
+            prices[quote_date] = (ohlcv['open'] + ohlcv['close']) / 2
+        except (KeyError, TypeError, ValueError) as e:
+            continue
+
+    return prices
+
+def get_range_price(prices, date_obj):
+    """
+    Returns the median price of a day from fetched date ranges.
+
+    :param prices (dict): Median prices by date object.
+    :param date_obj (date): The requested day.
+    :return (float or None): The median coin price, None if no price data is available.
+    """
+    if date_obj not in prices:
+        printLine(f"🟠 No available CoinMarketCap price data for {date_obj}.", True)
+        return None
+    return prices[date_obj]
+
+def run_calls(plan):
+    """
+    Runs a plan of API calls with the pooled HTTP client.
+    The async client runs the same plans, so both make the same decisions.
+
+    :param plan (generator): Yields the endpoint, URL, parameters, and description of every call, and receives its decoded response.
+    :return: The result of the plan.
+    """
+    try:
+        call = next(plan)
+        while True:
+            call = plan.send(fetch_json(*call))
+    except StopIteration as stop:
+        return stop.value
+
+def block_details_call(block_number):
+    """
+    :param block_number (int): The block number to fetch details for.
+    :return (tuple): Endpoint, URL, parameters, and description of the call.
+    """
+    return 'blockscout_block', f'{BLOCKSCOUT_API_URL}/v2/blocks/{block_number}', None, f'block details for block {block_number}'
+
+def block_withdrawals_call(block_number):
+    """
+    :param block_number (int): The block number to fetch withdrawal details for.
+    :return (tuple): Endpoint, URL, parameters, and description of the call.
+    """
+    return 'blockscout_withdrawals', f'{BLOCKSCOUT_API_URL}/v2/blocks/{block_number}/withdrawals', None, f'withdrawals for block {block_number}'
+
 def get_block_details(block_number):
     """
     Fetches block details using the Blockscout API.
@@ -251,71 +453,281 @@ def get_block_details(block_number):
     :param block_number (int): The block number to fetch details for.
     :return (dict or None): The block details if successful, None otherwise.
     """
-    url = f'{BLOCKSCOUT_API_URL}/v2/blocks/{block_number}'
-    
-    if BLOCKSCOUT_API_KEY is not None:
-        url += f'&apikey={BLOCKSCOUT_API_KEY}'
+    return fetch_json(*block_details_call(block_number))
+
+def extract_miner(block_details):
+    """
+    :param block_details (dict or None): The block details from the Blockscout API.
+    :return (str or None): The lowercase miner hash of the block, None if unknown.
+    """
+    miner = ((block_details or {}).get('miner') or {}).get('hash')
+    return miner.lower() if miner else None
 
-    # API failure tolerance
-    retries = 3  # tries
-    backoff_factor = 2  # tries
-    timeout = 10  # seconds
+def plan_withdrawal_page_start(block_number):
+    """
+    Plans the calls finding the first withdrawal at or after a block, so withdrawal
+    listings can be paged from that block instead of the latest withdrawal.
+
+    - Blocks without withdrawals are skipped, up to WITHDRAWAL_START_BLOCKS blocks
+    - Failed lookups fall back to the latest withdrawal
 
-    for attempt in range(retries):
+    :param block_number (int): The first block after the report timeframe.
+    :return (dict or None): Query parameters of the listing page before the block, None to start at the latest withdrawal.
+    """
+    for next_block in range(block_number, block_number + WITHDRAWAL_START_BLOCKS):
+        data = yield block_withdrawals_call(next_block)
         try:
+            indexes = [int(item['index']) for item in data['items']]
+        except (TypeError, KeyError, ValueError) as e:
+            break
+        if indexes:
+            return {'index': min(indexes), 'items_count': 0}
 
-            # Call the Blockscout API to retrieve block data
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
-
-            # Wait to respect rate limits
-            time.sleep(BLOCKSCOUT_CALL_WAIT_TIME)
-            
-            return response.json()
-        except (requests.ConnectionError, requests.Timeout) as e:
-            printLine(f"🟡 Network error. Retrying. {attempt + 1}/{retries}.", True)
-            time.sleep(backoff_factor ** attempt)
-        except requests.RequestException as e:
-            printLine(f"🔴 Error fetching block details for block {block_number}.", True)
-            return None
-    
-    printLine(f"❌ Failed to fetch block details after {retries} attempts.", True)
+    printLine(f"🟠 No withdrawal found after block {block_number}, listing withdrawals from the latest block.", True)
     return None
 
-def get_block_withdrawals(block_number):
+def plan_address_index(scan, listing):
     """
-    Fetches block withdrawal details using the Blockscout API.
+    Plans the calls paging a block listing of the scanned address for the whole timeframe,
+    so candidate blocks do not need their own lookups.
 
-    :param block_number (int): The block number to fetch withdrawal details for.
-    :return (dict or None): The block withdrawal details if successful, None otherwise.
+    - Every call returns up to 50 withdrawals or validated blocks of the address
+    - Listings start at the same block as the balance history, so past years cost no more calls than recent ones
+    - Listings of the current year remember the latest block before their first page, as newer blocks can be missing
+    - Failed or unsupported listings fall back to lookups per block
+
+    :param scan (BalanceHistoryScan): The new or restored scan.
+    :param listing (str): 'withdrawals' or 'validated blocks'.
+    :return (AddressIndex or None): The complete index, None if the listing is unavailable.
     """
-    url = f'{BLOCKSCOUT_API_URL}/v2/blocks/{block_number}/withdrawals'
+    endpoint, path, decode_items = ADDRESS_LISTINGS[listing]
+    url = f'{BLOCKSCOUT_API_URL}/v2/addresses/{scan.address}/{path}'
+    index = AddressIndex(listing, decode_items, scan.timeframe_min_date, scan.timeframe_max_date, scan.stop_block)
+
+    # Start below the first block after the timeframe, or at the latest block
+    if scan.start_block is not None and listing == 'withdrawals':
+        index.newest_block = scan.start_block - 1
+        index.next_page_params = yield from plan_withdrawal_page_start(scan.start_block)
+    elif scan.start_block is not None:
+        index.newest_block = scan.start_block - 1
+        index.next_page_params = {'block_number': scan.start_block, 'items_count': 0}
+    else:
+        index.newest_block, latest_timestamp = decode_latest_block((yield latest_block_call()))
+        if index.newest_block is None:
+            printLine(f"🟠 Latest block unknown, verifying every block instead of listing {index.description}.", True)
+            return None
 
-    if BLOCKSCOUT_API_KEY is not None:
-        url += f'&apikey={BLOCKSCOUT_API_KEY}'
-    
-    # API failure tolerance
-    retries = 3  # tries
-    backoff_factor = 2  # tries
-    timeout = 10  # seconds
+    while not index.finished:
+        data = yield endpoint, url, index.page_params(), f'{index.description} list'
+        if data is None:
+            printLine(f"🟠 List of {index.description} unavailable, verifying every block instead.", True)
+            return None
+        index.add_page(data)
 
-    for attempt in range(retries):
-        try:
+    printLine(f"📒 Indexed {index.item_count} {index.description} within {len(index.blocks)} blocks", True)
+    return index
 
-            # Call the Blockscout API to retrieve withdrawal data
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
+def get_address_index(scan, listing):
+    """
+    Pages a block listing of the scanned address, see plan_address_index.
 
-            # Wait to respect rate limits
-            time.sleep(BLOCKSCOUT_CALL_WAIT_TIME)
+    :param scan (BalanceHistoryScan): The new or restored scan.
+    :param listing (str): 'withdrawals' or 'validated blocks'.
+    :return (AddressIndex or None): The complete index, None if the listing is unavailable.
+    """
+    return run_calls(plan_address_index(scan, listing))
+
+def plan_block_classification(block_number, address=ETH1_ADDRESS, withdrawal_index=None, miner_index=None):
+    """
+    Plans the calls checking if an address received a validator payment within a block.
+
+    - Uses the persistent block cache before calling the Blockscout API
+    - Fetches block withdrawals first, as they are the most common payment
+    - Only fetches block details if the address is not listed in the withdrawals
+    - Failed lookups are not cached and leave the block unknown, so it is verified again on resume
+    - Cached blocks list all withdrawal receivers, so one lookup serves every address
+    - Indexes of the address replace the withdrawal and miner lookups of uncached blocks
+    - Blocks after the newest block of an index are looked up, as the index can miss them
+
+    :param block_number (int): The block number to classify.
+    :param address (str, optional): The ETH1 address to look for. Defaults to the configured address.
+    :param withdrawal_index (AddressIndex, optional): The complete withdrawals of the address.
+    :param miner_index (AddressIndex, optional): The complete validated blocks of the address.
+    :return (tuple or None): If the address is listed in the block withdrawals and the lowercase miner hash of the block,
+        None if a lookup failed.
+    """
+    address = address.lower()
+    entry = block_cache.get(block_number)
+
+    # Blocks that were added after the listing was taken can be missing from the index
+    if withdrawal_index is not None and not withdrawal_index.covers(block_number):
+        withdrawal_index = None
+    if miner_index is not None and not miner_index.covers(block_number):
+        miner_index = None
+
+    # Classify uncached blocks with the withdrawals of the address
+    if entry is None and withdrawal_index is not None:
+        if withdrawal_index.contains(block_number):
+            return True, None
+    else:
+        # Fetch and cache withdrawal receivers of unknown blocks
+        if entry is None:
+            block_withdrawals = yield block_withdrawals_call(block_number)
+            if block_withdrawals is None:
+                return None
+            entry = block_cache.store_withdrawals(block_number, block_withdrawals)
+
+        if address in entry['withdrawals']:
+            return True, entry.get('miner')
+        if 'miner' in entry:
+            return False, entry['miner']
+
+    # Classify the miner with the validated blocks of the address
+    if miner_index is not None:
+        return False, address if miner_index.contains(block_number) else None
+
+    # Fetch the block miner, and cache it if the block withdrawals are known
+    block_details = yield block_details_call(block_number)
+    if block_details is None:
+        return None
+    if entry is None:
+        return False, extract_miner(block_details)
+    entry = block_cache.store_miner(block_number, entry, block_details)
 
-            return response.json()
-        except (requests.ConnectionError, requests.Timeout) as e:
-            printLine(f"🟡 Network error. Retrying. {attempt + 1}/{retries}.", True)
-            time.sleep(backoff_factor ** attempt)
-        except requests.RequestException as e:
-            printLine(f"🔴 Error fetching withdrawals for block {block_number}.", True)
+    return False, entry['miner']
+
+def classify_block(block_number, address=ETH1_ADDRESS, withdrawal_index=None, miner_index=None):
+    """
+    Checks if an address received a validator payment within a block, see plan_block_classification.
+
+    :param block_number (int): The block number to classify.
+    :param address (str, optional): The ETH1 address to look for. Defaults to the configured address.
+    :param withdrawal_index (AddressIndex, optional): The complete withdrawals of the address.
+    :param miner_index (AddressIndex, optional): The complete validated blocks of the address.
+    :return (tuple or None): If the address is listed in the block withdrawals and the lowercase miner hash of the block,
+        None if a lookup failed.
+    """
+    return run_calls(plan_block_classification(block_number, address, withdrawal_index, miner_index))
+
+def latest_block_call():
+    """
+    :return (tuple): Endpoint, URL, parameters, and description of the call.
+    """
+    return 'blockscout_blocks', f'{BLOCKSCOUT_API_URL}/v2/blocks', {'type': 'block'}, 'latest block'
+
+def decode_latest_block(data):
+    """
+    :param data (dict or None): The latest blocks from the Blockscout API.
+    :return (int or None): The height of the latest block, None if an error occurs.
+    :return (int or None): The unix timestamp of the latest block, None if an error occurs.
+    """
+    try:
+        latest_block = data['items'][0]
+        return int(latest_block['height']), parse_block_timestamp(latest_block['timestamp'])
+    except (TypeError, KeyError, IndexError, ValueError) as e:
+        return None, None
+
+def get_latest_block():
+    """
+    Fetches the latest block using the Blockscout API.
+
+    :return (int or None): The height of the latest block, None if an error occurs.
+    :return (int or None): The unix timestamp of the latest block, None if an error occurs.
+    """
+    return decode_latest_block(fetch_json(*latest_block_call()))
+
+def get_block_timestamp(block_number):
+    """
+    Fetches the timestamp of a block and stores it within the block index.
+
+    :param block_number (int): The block number to fetch the timestamp for.
+    :return (int or None): The unix timestamp of the block, None if an error occurs.
+    """
+    block_details = get_block_details(block_number)
+
+    try:
+        timestamp = parse_block_timestamp(block_details['timestamp'])
+    except (TypeError, KeyError, ValueError) as e:
+        return None
+
+    block_index.add(block_number, timestamp)
+    return timestamp
+
+def parse_block_timestamp(value):
+    """
+    Converts an ISO 8601 block timestamp of the Blockscout API into a unix timestamp.
+
+    :param value (str): The block timestamp, e.g. '2024-01-01T00:00:05.000000Z'.
+    :return (int): The unix timestamp.
+    """
+    return parse_block_time(value)[1]
+
+def find_first_block_at(timestamp, latest_block=get_latest_block, block_timestamp=get_block_timestamp, index=block_index):
+    """
+    Binary searches the first block with a timestamp at or after the given time.
+
+    - Starts from the closest blocks known by the persistent block index
+    - Estimates heights from the block time, alternating with plain bisection
+    - Every fetched block timestamp is added to the block index by the block timestamp function
+
+    :param timestamp (int): The unix timestamp to search for.
+    :param latest_block (function, optional): Fetches the latest block height and timestamp. Defaults to Blockscout.
+    :param block_timestamp (function, optional): Fetches the timestamp of a block. Defaults to Blockscout.
+    :param index (BlockIndex, optional): The block index of the same source. Defaults to the Blockscout index.
+    :return (int or None): The block height, None if no such block exists yet or an error occurs.
+    """
+    latest_height, latest_timestamp = latest_block()
+    if latest_height is None or latest_timestamp < timestamp:
+        return None
+    index.add(latest_height, latest_timestamp)
+
+    # Narrow the search range with already known blocks
+    before, after = index.bounds(timestamp)
+    low, low_timestamp = before if before else (0, None)
+    high, high_timestamp = after
+
+    step = 0
+    while high - low > 1:
+
+        # Estimate the height from the average block time or bisect the range
+        if low_timestamp is not None and step % 2 == 0:
+            estimate = low + (timestamp - low_timestamp) * (high - low) // max(high_timestamp - low_timestamp, 1)
+            middle = min(max(estimate, low + 1), high - 1)
+        else:
+            middle = (low + high) // 2
+        step += 1
+
+        middle_timestamp = block_timestamp(middle)
+        if middle_timestamp is None:
             return None
-    
-    printLine(f"❌ Failed to fetch withdrawals after {retries} attempts.", True)
-    return None
\ No newline at end of file
+
+        if middle_timestamp < timestamp:
+            low, low_timestamp = middle, middle_timestamp
+        else:
+            high, high_timestamp = middle, middle_timestamp
+
+    return high
+
+def seek_history_start(year):
+    """
+    Finds the first block after the report year, so the balance history
+    can be paged from the end of the year instead of the latest block.
+
+    :param year (int): The report year.
+    :return (int or None): The first block of the following year, None to start at the latest block.
+    """
+
+    # Reports of the current year start at the latest block anyway
+    if year >= datetime.now(timezone.utc).year:
+        return None
+
+    printLine(f"🔎 Seeking the end of {year} within the block history", True)
+    next_year_start = int(datetime(year + 1, 1, 1, tzinfo=timezone.utc).timestamp())
+    start_block = find_first_block_at(next_year_start)
+
+    if start_block is None:
+        printLine("🟠 End of year not found, starting at the latest block.", True)
+        return None
+
+    printLine(f"🟢 Found first block of {year + 1}: {start_block}", True)
+    return start_block
@@ -0,0 +1,277 @@
+# FETCHES API DATA ON AN EVENT LOOP
+
+# System libraries
+from collections import deque
+import time
+
+# External libraries
+import asyncio
+import aiohttp
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+from utility.http_client import CallRetries, decode_content, PROVIDER_PARAMS, PROVIDER_HEADERS
+from utility.http_archive import http_archive
+from utility.run_metrics import run_metrics
+from utility.api_calls import get_ohlcv_ranges, get_ohlcv_range_params, extract_median_prices
+from utility.api_calls import get_stored_prices, store_range_prices
+from utility.api_calls import start_coin_balance_history_scan, finish_coin_balance_history_scan
+from utility.api_calls import plan_address_index, plan_block_classification
+from utility.checkpoints import save_checkpoint
+
+# Internal config data
+from config import BLOCKSCOUT_API_URL, COINMARKETCAP_API_URL
+from config import ETH1_ADDRESS, YEAR
+from utility.settings import ASYNC_MAX_IN_FLIGHT, CHECKPOINT_INTERVAL
+from utility.settings import BLOCKSCOUT_ADDRESS_WITHDRAWALS, BLOCKSCOUT_VALIDATED_BLOCKS
+
+class AsyncFetcher:
+    """
+    Sends API calls from a single event loop, using the same endpoint
+    policies and rate limiters as the pooled HTTP client.
+
+    - A semaphore bounds the number of requests in flight
+    - Rate limits are charged when a request leaves the semaphore
+    - Calls are planned by the same functions as the synchronous client, only the I/O differs
+    """
+
+    def __init__(self, session, max_in_flight=ASYNC_MAX_IN_FLIGHT):
+        self.session = session
+        self.semaphore = asyncio.Semaphore(max_in_flight)
+
+    async def fetch_json(self, endpoint, url, params=None, description='API data'):
+        """
+        Fetches JSON data, recording or replaying the response if an archive is active.
+
+        :param endpoint (str): The name of the endpoint.
+        :param url (str): The URL to call.
+        :param params (dict, optional): Query parameters of the call.
+        :param description (str, optional): Describes the data within terminal outputs.
+        :return (dict or None): The decoded response, None if an error occurs.
+        """
+        if http_archive.replaying:
+            content = http_archive.replay(endpoint, url, params)
+        else:
+            content = await self.fetch_content(endpoint, url, params, description)
+            http_archive.record(endpoint, url, params, content)
+        return decode_content(content, description)
+
+    async def fetch_content(self, endpoint, url, params=None, description='API data'):
+        """
+        Fetches a response body, with the same retry decisions as the pooled HTTP client.
+
+        :param endpoint (str): The name of the endpoint.
+        :param url (str): The URL to call.
+        :param params (dict, optional): Query parameters of the call.
+        :param description (str, optional): Describes the data within terminal outputs.
+        :return (bytes or None): The response body, None if an error occurs.
+        """
+        retries = CallRetries(endpoint, description)
+        start = time.perf_counter()
+
+        # Query values must be strings for aiohttp
+        query = {
+            key: str(value)
+            for key, value in {**PROVIDER_PARAMS[retries.provider], **(params or {})}.items()
+            if value is not None
+        }
+        timeout = aiohttp.ClientTimeout(total=retries.policy['timeout'])
+
+        while retries.remaining():
+            try:
+                async with self.semaphore:
+
+                    # Charge the rate limit when the call starts
+                    wait = retries.limiter.reserve()
+                    run_metrics.add_sleep(retries.provider, 'rate_limit', wait)
+                    await asyncio.sleep(wait)
+
+                    start = time.perf_counter()
+                    async with self.session.get(url, params=query, headers=PROVIDER_HEADERS[retries.provider], timeout=timeout) as response:
+                        content = await response.read()
+                        run_metrics.add_request(endpoint, response.status, time.perf_counter() - start)
+
+                        # Slow down and retry if the server rate limit was hit
+                        if retries.rate_limited(response.status, response.headers.get('Retry-After')):
+                            continue
+
+                        # Raise exception for HTTP errors
+                        response.raise_for_status()
+
+                retries.succeeded()
+                return content
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                run_metrics.add_request(endpoint, 'error', time.perf_counter() - start)
+                await asyncio.sleep(retries.network_error())
+            except aiohttp.ClientError as e:
+                return retries.failed()
+
+        return retries.exhausted()
+
+    async def run_calls(self, plan):
+        """
+        Runs a plan of API calls on the event loop, like the run_calls of the synchronous client.
+
+        :param plan (generator): Yields the endpoint, URL, parameters, and description of every call, and receives its decoded response.
+        :return: The result of the plan.
+        """
+        try:
+            call = next(plan)
+            while True:
+                call = plan.send(await self.fetch_json(*call))
+        except StopIteration as stop:
+            return stop.value
+
+    async def classify_block(self, block_number, address=ETH1_ADDRESS, withdrawal_index=None, miner_index=None):
+        """
+        Checks if an address received a validator payment within a block, once the indexes of the address are complete.
+
+        :param block_number (int): The block number to classify.
+        :param address (str, optional): The ETH1 address to look for. Defaults to the configured address.
+        :param withdrawal_index (Task, optional): The task fetching the withdrawal index of the address.
+        :param miner_index (Task, optional): The task fetching the miner index of the address.
+        :return (tuple or None): If the address is listed in the block withdrawals and the lowercase miner hash of the block,
+            None if a lookup failed.
+        """
+        withdrawal_index = await withdrawal_index if withdrawal_index is not None else None
+        miner_index = await miner_index if miner_index is not None else None
+        return await self.run_calls(plan_block_classification(block_number, address, withdrawal_index, miner_index))
+
+    async def scan_coin_balance_history(self, scan, checkpoint_candidates):
+        """
+        Pages through the coin balance history, while candidate blocks
+        are verified concurrently as tasks on the event loop.
+        Progress is checkpointed periodically and when the scan stops early.
+        The withdrawals and validated blocks of the address are indexed concurrently, if enabled.
+
+        :param scan (BalanceHistoryScan): The new or restored scan.
+        :param checkpoint_candidates (list): Unverified candidate blocks of a restored checkpoint.
+        :return (BalanceHistoryScan): The finished scan with its income metrics.
+        """
+        url = f'{BLOCKSCOUT_API_URL}/v2/addresses/{scan.address}/coin-balance-history'
+
+        # Candidate blocks in history order, waiting to be verified and merged
+        pending = deque()
+        max_pending = ASYNC_MAX_IN_FLIGHT * 4
+        withdrawal_index = miner_index = None
+        if BLOCKSCOUT_ADDRESS_WITHDRAWALS:
+            withdrawal_index = asyncio.create_task(self.run_calls(plan_address_index(scan, 'withdrawals')))
+        if BLOCKSCOUT_VALIDATED_BLOCKS:
+            miner_index = asyncio.create_task(self.run_calls(plan_address_index(scan, 'validated blocks')))
+
+        async def merge_oldest_block():
+            # Merges the oldest candidate in history order, once it is verified
+            candidate, task = pending[0]
+            verification = await task
+            pending.popleft()
+            scan.add_classified_block(candidate, verification)
+
+        async def queue_candidates(candidates):
+            # Bounds the verify tasks, merging the oldest candidates before new tasks are started
+            for candidate in candidates:
+                while len(pending) >= max_pending:
+                    await merge_oldest_block()
+                pending.append((candidate, asyncio.create_task(self.classify_block(candidate[0], scan.address, withdrawal_index, miner_index))))
+
+        try:
+            await queue_candidates(checkpoint_candidates)
+            page_count = 0
+
+            while not scan.finished:
+
+                # Call Blockscout API with parameters
+                data = await self.fetch_json('blockscout_history', url, scan.page_params(), 'Blockscout data')
+                if data is None:
+                    printLine("❌ Report incomplete. Please retry.", True)
+
+                    # Return what has been collected so far
+                    break
+
+                run_metrics.add_page(len(data.get('items', [])))
+                await queue_candidates(scan.add_page(data))
+
+                # Periodically store the progress, including candidates still being verified
+                page_count += 1
+                if not scan.finished and page_count % CHECKPOINT_INTERVAL == 0:
+                    save_checkpoint(scan, [candidate for candidate, task in pending])
+
+            # Merge the remaining verified blocks in history order
+            while pending:
+                await merge_oldest_block()
+        finally:
+            for candidate, task in pending:
+                task.cancel()
+            for index in (withdrawal_index, miner_index):
+                if index is not None:
+                    index.cancel()
+            finish_coin_balance_history_scan(scan, [candidate for candidate, task in pending])
+
+        return scan
+
+    async def fetch_coin_prices(self, dates):
+        """
+        Fetches the median coin prices of all dates, with all date ranges fetched concurrently.
+        Only days missing within the local price store are fetched.
+
+        :param dates (iterable): Dates as date objects or 'YYYY-MM-DD' strings.
+        :return (dict): Median prices by 'YYYY-MM-DD' date, None if unavailable.
+        """
+        url = COINMARKETCAP_API_URL + '/v2/cryptocurrency/ohlcv/historical'
+        date_objs, stored_prices, missing_date_objs = get_stored_prices(dates)
+
+        async def fetch_prices(start_date, end_date):
+            printLine(f"💱 Fetching prices from {start_date} to {end_date}", True)
+            data = await self.fetch_json('coinmarketcap_ohlcv', url, get_ohlcv_range_params(start_date, end_date), 'CoinMarketCap data')
+            if data is None:
+                return {}
+            return extract_median_prices(data)
+
+        prices = {}
+        for range_prices in await asyncio.gather(*(fetch_prices(*date_range) for date_range in get_ohlcv_ranges(missing_date_objs))):
+            prices.update(range_prices)
+        return store_range_prices(date_objs, stored_prices, missing_date_objs, prices)
+
+async def run_with_fetcher(action):
+    # Opens a pooled client session for a single run of the event loop
+    connector = aiohttp.TCPConnector(limit=ASYNC_MAX_IN_FLIGHT)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        return await action(AsyncFetcher(session))
+
+def get_coin_balance_history_async(address=ETH1_ADDRESS):
+    """
+    Uses the Blockscout REST API on an event loop to fetch the coin balance history.
+    Returns the same data as get_coin_balance_history.
+
+    :param address (str, optional): The ETH1 address to scan. Defaults to the configured address.
+    :return (dict): A dictionary of dates and their coin deltas.
+    :return (int): Number of times the validator was listed as miner
+    :return (int): Number of times the validator was listed as withdrawal address
+    """
+    scan, checkpoint_candidates = start_coin_balance_history_scan(address, YEAR, YEAR)
+    scan = asyncio.run(run_with_fetcher(lambda fetcher: fetcher.scan_coin_balance_history(scan, checkpoint_candidates)))
+    return scan.result()
+
+def get_coin_balance_history_by_year_async(first_year, last_year, address=ETH1_ADDRESS, resume=False, known_blocks=None):
+    """
+    Uses the Blockscout REST API on an event loop to fetch the income metrics
+    of multiple years within a single pass through the balance history.
+
+    :param first_year (int): The first report year.
+    :param last_year (int): The last report year.
+    :param address (str, optional): The ETH1 address to scan. Defaults to the configured address.
+    :param resume (bool, optional): Continue from the last checkpoint of the same scan.
+    :param known_blocks (dict, optional): Newest blocks per year of an earlier update, only newer blocks are scanned.
+    :return (dict): Years mapped to their daily deltas, miner count, withdrawal count, and newest block.
+    """
+    scan, checkpoint_candidates = start_coin_balance_history_scan(address, first_year, last_year, resume, known_blocks)
+    scan = asyncio.run(run_with_fetcher(lambda fetcher: fetcher.scan_coin_balance_history(scan, checkpoint_candidates)))
+    return scan.result_by_year()
+
+def get_coin_prices_async(dates):
+    """
+    Uses the CoinMarketCap REST API on an event loop to fetch the prices of many days.
+
+    :param dates (iterable): Dates as date objects or 'YYYY-MM-DD' strings.
+    :return (dict): Median prices by 'YYYY-MM-DD' date, None if unavailable.
+    """
+    return asyncio.run(run_with_fetcher(lambda fetcher: fetcher.fetch_coin_prices(dates)))
@@ -0,0 +1,103 @@
+# CACHES BLOCK CLASSIFICATIONS
+
+# System libraries
+from collections import OrderedDict
+
+# Internal library imports
+from utility.json_files import JsonFileCache
+
+# Internal config data
+from config import BLOCKSCOUT_API_URL
+from utility.settings import BLOCK_CACHE_FILE, BLOCK_CACHE_MAX_ENTRIES
+
+class BlockCache(JsonFileCache):
+    """
+    Persistent least-recently-used cache of block classifications.
+
+    Finalized blocks never change, so the withdrawal receivers and the miner
+    of a block only have to be fetched once. Entries are stored per block number:
+
+    - withdrawals: receiver hashes (lowercase), as amounts are taken from the balance history
+    - miner: miner hash (lowercase), missing if the block details were never fetched
+
+    The cache is bound to the explorer it was filled from and evicts the least
+    recently used blocks once it grows beyond its maximum number of entries.
+    """
+
+    def __init__(self, path, max_entries, source):
+        super().__init__(path)
+        self.max_entries = max_entries
+        self.source = source
+        self.entries = OrderedDict()
+
+    def from_json(self, stored):
+        # Keeps the cache empty if the file is from another explorer
+        if not isinstance(stored, dict) or stored.get('source') != self.source:
+            return
+        for block_number, entry in stored.get('blocks', {}).items():
+            self.entries[int(block_number)] = entry
+
+    def to_json(self):
+        return {
+            'source': self.source,
+            'blocks': {str(number): entry for number, entry in self.entries.items()},
+        }
+
+    def get(self, block_number):
+        """
+        Returns the cached entry of a block and marks it as recently used.
+
+        :param block_number (int): The block number to look up.
+        :return (dict or None): The cached block entry, None if unknown.
+        """
+        with self.lock:
+            self.load()
+            entry = self.entries.get(int(block_number))
+            if entry is not None:
+                self.entries.move_to_end(int(block_number))
+            return entry
+
+    def put(self, block_number, entry):
+        """
+        Stores the entry of a block and evicts the least recently used blocks.
+
+        :param block_number (int): The block number of the entry.
+        :param entry (dict): The withdrawal receivers and optional miner of the block.
+        """
+        with self.lock:
+            self.load()
+            self.entries[int(block_number)] = entry
+            self.entries.move_to_end(int(block_number))
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.changed = True
+
+    def store_withdrawals(self, block_number, block_withdrawals):
+        """
+        Stores the withdrawal receivers of a block, listing receivers of multiple withdrawals once.
+
+        :param block_number (int): The block number of the withdrawals.
+        :param block_withdrawals (dict): The block withdrawals from the Blockscout API.
+        :return (dict): The new block entry.
+        """
+        receivers = {withdrawal['receiver']['hash'].lower() for withdrawal in block_withdrawals.get('items', [])}
+        entry = {'withdrawals': sorted(receivers)}
+        self.put(block_number, entry)
+        return entry
+
+    def store_miner(self, block_number, entry, block_details):
+        """
+        Adds the miner from the block details to an existing block entry.
+
+        :param block_number (int): The block number of the details.
+        :param entry (dict): The existing block entry.
+        :param block_details (dict): The block details from the Blockscout API.
+        :return (dict): The updated block entry.
+        """
+        miner = (block_details.get('miner') or {}).get('hash')
+        entry = dict(entry, miner=miner.lower() if miner else None)
+        self.put(block_number, entry)
+        return entry
+
+# Shared cache instance for all block lookups, persisted when the program exits
+block_cache = BlockCache(BLOCK_CACHE_FILE, BLOCK_CACHE_MAX_ENTRIES, BLOCKSCOUT_API_URL)
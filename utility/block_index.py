@@ -0,0 +1,77 @@
+# INDEXES BLOCK TIMESTAMPS
+
+# System libraries
+from bisect import bisect_left
+import os
+
+# Internal library imports
+from utility.json_files import JsonFileCache
+
+# Internal config data
+from config import BLOCKSCOUT_API_URL
+from utility.settings import BLOCK_INDEX_FILE, RPC_URL
+
+class BlockIndex(JsonFileCache):
+    """
+    Persistent index of block heights and their timestamps.
+
+    Every block timestamp looked up while seeking a date is kept, so later
+    seeks for the same or nearby dates start from a narrow range of heights.
+    The index is bound to the explorer or node it was filled from.
+    """
+
+    def __init__(self, path, source):
+        super().__init__(path)
+        self.source = source
+        self.heights = []
+        self.timestamps = []
+
+    def from_json(self, stored):
+        # Keeps the index empty if the file is from another explorer or node
+        if not isinstance(stored, dict) or stored.get('source') != self.source:
+            return
+        for height, timestamp in sorted((int(height), int(timestamp)) for height, timestamp in stored.get('blocks', {}).items()):
+            self.heights.append(height)
+            self.timestamps.append(timestamp)
+
+    def to_json(self):
+        return {
+            'source': self.source,
+            'blocks': {str(height): timestamp for height, timestamp in zip(self.heights, self.timestamps)},
+        }
+
+    def add(self, height, timestamp):
+        """
+        Stores the timestamp of a block height.
+
+        :param height (int): The block height.
+        :param timestamp (int): The unix timestamp of the block.
+        """
+        with self.lock:
+            self.load()
+            position = bisect_left(self.heights, height)
+            if position < len(self.heights) and self.heights[position] == height:
+                return
+            self.heights.insert(position, height)
+            self.timestamps.insert(position, timestamp)
+            self.changed = True
+
+    def bounds(self, timestamp):
+        """
+        Returns the closest known blocks around a timestamp.
+        Block timestamps increase with their height, so the index stays sorted by both.
+
+        :param timestamp (int): The unix timestamp to look for.
+        :return (tuple or None): Height and timestamp of the last known block before the timestamp.
+        :return (tuple or None): Height and timestamp of the first known block at or after the timestamp.
+        """
+        with self.lock:
+            self.load()
+            position = bisect_left(self.timestamps, timestamp)
+            before = (self.heights[position - 1], self.timestamps[position - 1]) if position > 0 else None
+            after = (self.heights[position], self.timestamps[position]) if position < len(self.heights) else None
+            return before, after
+
+# Shared index instances for all date seeks on the explorer and on the execution node, persisted when the program exits
+block_index = BlockIndex(BLOCK_INDEX_FILE, BLOCKSCOUT_API_URL)
+rpc_block_index = BlockIndex('_rpc'.join(os.path.splitext(BLOCK_INDEX_FILE)) if BLOCK_INDEX_FILE else None, RPC_URL)
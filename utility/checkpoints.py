@@ -0,0 +1,79 @@
+# STORES SCAN CHECKPOINTS
+
+# System libraries
+import os
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+from utility.json_files import load_json, write_json_atomic
+
+# Internal config data
+from utility.settings import CHECKPOINT_FOLDER
+
+def get_checkpoint_path(address, first_year, last_year):
+    """
+    Returns the checkpoint file of a balance history scan.
+
+    :param address (str): The scanned ETH1 address.
+    :param first_year (int): The first report year of the scan.
+    :param last_year (int): The last report year of the scan.
+    :return (str or None): The path of the checkpoint file, None if checkpoints are disabled.
+    """
+    if not CHECKPOINT_FOLDER:
+        return None
+    return os.path.join(CHECKPOINT_FOLDER, f"scan_{first_year}_{last_year}_{address.lower()}.json")
+
+def save_checkpoint(scan, candidates):
+    """
+    Atomically writes the progress of a balance history scan to disk.
+
+    - Stores the scan state, including the parameters of the next history page
+    - Stores candidate blocks that were fetched but not yet verified, or whose verification failed
+    - Verified blocks are already part of the scan state, so the block cache is only saved at the end of the scan
+
+    :param scan (BalanceHistoryScan): The running scan.
+    :param candidates (list): Candidate blocks that were not yet verified, as tuples of block number, date, and delta.
+    """
+    path = get_checkpoint_path(scan.address, scan.timeframe_min_date.year, scan.last_year)
+    if path is None:
+        return
+
+    state = scan.to_checkpoint()
+    state['candidates'] = [
+        [block_number, transaction_date.isoformat(), str(delta)]
+        for block_number, transaction_date, delta in scan.unverified_blocks + list(candidates)
+    ]
+
+    write_json_atomic(path, state)
+
+def load_checkpoint(address, first_year, last_year):
+    """
+    Loads the last checkpoint of a balance history scan.
+
+    :param address (str): The scanned ETH1 address.
+    :param first_year (int): The first report year of the scan.
+    :param last_year (int): The last report year of the scan.
+    :return (dict or None): The stored scan state, None if there is no valid checkpoint.
+    """
+    path = get_checkpoint_path(address, first_year, last_year)
+    if path is None or not os.path.isfile(path):
+        printLine("🟠 No checkpoint found, starting a new scan.", True)
+        return None
+
+    state = load_json(path)
+    if not isinstance(state, dict):
+        printLine("🟠 Checkpoint is broken, starting a new scan.", True)
+        return None
+    return state
+
+def remove_checkpoint(address, first_year, last_year):
+    """
+    Removes the checkpoint of a finished balance history scan.
+
+    :param address (str): The scanned ETH1 address.
+    :param first_year (int): The first report year of the scan.
+    :param last_year (int): The last report year of the scan.
+    """
+    path = get_checkpoint_path(address, first_year, last_year)
+    if path is not None and os.path.isfile(path):
+        os.remove(path)
@@ -0,0 +1,104 @@
+# DECODES API RESPONSES
+
+# System libraries
+from datetime import datetime, date, timezone
+import json
+
+# Use the faster orjson parser if it is installed
+try:
+    import orjson
+    decode_json = orjson.loads
+    JSON_DECODER = 'orjson'
+except ImportError:
+    decode_json = json.loads
+    JSON_DECODER = 'json'
+
+# Dates and their unix timestamps at midnight, by 'YYYY-MM-DD' prefix
+day_cache = {}
+
+def parse_block_time(value):
+    """
+    Converts a block timestamp of the coin balance history into its date and unix timestamp.
+
+    - Uses the fixed positions of the 'YYYY-MM-DDTHH:MM:SSZ' format instead of strptime,
+      ignoring fractional seconds like '.000000' before the 'Z'
+    - Caches every day, as many events share the same date
+    - Falls back to the ISO 8601 parser for any other format
+
+    :param value (str): The block timestamp, e.g. '2024-01-01T00:00:05Z'.
+    :return (date): The UTC date of the block.
+    :return (int): The unix timestamp of the block.
+    """
+    if len(value) >= 20 and value[10] == 'T' and value[-1] == 'Z' and value[19] in 'Z.':
+        day = day_cache.get(value[:10])
+        if day is None:
+            day_date = date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+            day_start = int(datetime(day_date.year, day_date.month, day_date.day, tzinfo=timezone.utc).timestamp())
+            day = day_cache[value[:10]] = (day_date, day_start)
+        return day[0], day[1] + int(value[11:13]) * 3600 + int(value[14:16]) * 60 + int(value[17:19])
+
+    block_time = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if block_time.tzinfo is None:
+        block_time = block_time.replace(tzinfo=timezone.utc)
+    block_time = block_time.astimezone(timezone.utc)
+    return block_time.date(), int(block_time.timestamp())
+
+def decode_history_items(items):
+    """
+    Extracts only the fields of coin balance history events that the scan needs.
+
+    :param items (list): The decoded events of a coin balance history page.
+    :return (list): Tuples of block number, date, unix timestamp, and delta in wei.
+    """
+    return [
+        (item['block_number'], *parse_block_time(item['block_timestamp']), int(item['delta']))
+        for item in items
+    ]
+
+def decode_withdrawal_items(items):
+    """
+    Extracts only the fields of address withdrawals that the withdrawal index needs.
+
+    :param items (list): The decoded withdrawals of an address withdrawal page.
+    :return (list): Tuples of block number and date.
+    """
+    return [
+        (int(item['block_number']), parse_block_time(item['timestamp'])[0])
+        for item in items
+    ]
+
+def decode_validated_block_items(items):
+    """
+    Extracts only the fields of validated blocks that the miner index needs.
+
+    :param items (list): The decoded blocks of a validated blocks page.
+    :return (list): Tuples of block number and date.
+    """
+    return [
+        (int(item['height']), parse_block_time(item['timestamp'])[0])
+        for item in items
+    ]
+
+def decode_rpc_block(block, address):
+    """
+    Extracts the payments of an address from a block of the JSON-RPC API.
+
+    - Withdrawal amounts are given in Gwei and summed per block
+    - Blocks before Shanghai have no withdrawals, blocks before London no base fee
+
+    :param block (dict): The block from eth_getBlockByNumber.
+    :param address (str): The lowercase ETH1 address.
+    :return (tuple): Block number, unix timestamp, withdrawn wei, if the address is the fee recipient, and base fee in wei.
+    """
+    withdrawn = sum(
+        int(withdrawal['amount'], 16)
+        for withdrawal in block.get('withdrawals') or ()
+        if withdrawal['address'].lower() == address
+    )
+    return (
+        int(block['number'], 16),
+        int(block['timestamp'], 16),
+        withdrawn * 10**9,
+        block['miner'].lower() == address,
+        int(block.get('baseFeePerGas') or '0x0', 16),
+    )
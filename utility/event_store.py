@@ -0,0 +1,183 @@
+# STORES BALANCE EVENTS
+
+# System libraries
+import threading
+import os
+
+# External libraries
+import numpy as np
+
+# Internal library imports
+from utility.json_files import load_json, atomic_write, write_json_atomic
+
+# Internal config data
+from utility.settings import EVENT_STORE_FOLDER
+
+# Classification of balance events
+EVENT_OTHER = 0
+EVENT_WITHDRAWAL = 1
+EVENT_MINER = 2
+EVENT_TRANSFER = 3
+
+# Positive deltas that are neither withdrawals nor miner rewards are transfers, which are no income
+INCOME_KINDS = (EVENT_WITHDRAWAL, EVENT_MINER)
+MINER_KINDS = (EVENT_MINER,)
+
+# Wei deltas are split into a signed high and an unsigned low word, so they stay exact
+EVENT_DTYPE = np.dtype([
+    ('block_number', '<i8'),
+    ('timestamp', '<i8'),
+    ('delta_hi', '<i8'),
+    ('delta_lo', '<u8'),
+    ('kind', '<i1'),
+])
+WORD = 2**64
+ETH_DECIMAL_FACTOR = 10**18
+
+class EventStore:
+    """
+    Columnar store of all balance events of an address.
+
+    - Events are kept as a sorted structured array within a .npy file per address
+    - Files are opened memory-mapped, so large histories are not loaded into Python objects
+    - Events of later scans replace earlier events of the same block
+    - Years that were scanned completely are listed next to the events
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.lock = threading.Lock()
+
+    def get_path(self, address):
+        # Returns the event file of an address, None if the store is disabled
+        if not self.folder:
+            return None
+        return os.path.join(self.folder, f"events_{address.lower()}.npy")
+
+    def load(self, address):
+        """
+        Opens the stored events of an address.
+
+        :param address (str): The ETH1 address.
+        :return (ndarray): Memory-mapped events sorted by block number, empty if none are stored.
+        """
+        path = self.get_path(address)
+        if path is None or not os.path.isfile(path):
+            return np.empty(0, dtype=EVENT_DTYPE)
+        try:
+            return np.load(path, mmap_mode='r')
+        except (OSError, ValueError):
+            return np.empty(0, dtype=EVENT_DTYPE)
+
+    def load_years(self, address):
+        """
+        :param address (str): The ETH1 address.
+        :return (set): Years of which all events are stored.
+        """
+        path = self.get_path(address)
+        stored = load_json(f"{path}.json") if path is not None else None
+        if not isinstance(stored, dict):
+            return set()
+        return set(stored.get('complete_years', []))
+
+    def add(self, address, events, complete_years=()):
+        """
+        Merges new events into the stored events of an address and writes them atomically.
+
+        :param address (str): The ETH1 address.
+        :param events (ndarray): New events with the event dtype.
+        :param complete_years (iterable, optional): Years of which all events are stored after the merge.
+        """
+        path = self.get_path(address)
+        if path is None:
+            return
+
+        with self.lock:
+            stored = np.array(self.load(address))
+
+            # Keep the newest event of every block, sorted by block number
+            merged = np.concatenate([events, stored])
+            block_numbers, first_index = np.unique(merged['block_number'], return_index=True)
+            merged = merged[first_index]
+
+            with atomic_write(path, binary=True) as f:
+                np.save(f, merged)
+
+            years = sorted(self.load_years(address) | set(complete_years))
+            write_json_atomic(f"{path}.json", {'complete_years': years})
+
+def to_event_array(events):
+    """
+    Converts events into the columnar event format.
+
+    :param events (iterable): Tuples of block number, unix timestamp, delta in wei, and kind.
+    :return (ndarray): The events with the event dtype.
+    """
+    events = list(events)
+    array = np.empty(len(events), dtype=EVENT_DTYPE)
+    for index, (block_number, timestamp, delta, kind) in enumerate(events):
+        delta_hi, delta_lo = divmod(delta, WORD)
+        array[index] = (block_number, timestamp, delta_hi, delta_lo, kind)
+    return array
+
+def sum_wei(events):
+    """
+    Sums the exact wei deltas of events.
+
+    :param events (ndarray): Events with the event dtype.
+    :return (int): The total delta in wei.
+    """
+    # Low words are summed in 32 bit halves, so the int64 sums cannot overflow
+    delta_lo = events['delta_lo']
+    return (int(events['delta_hi'].sum()) * WORD
+            + int((delta_lo >> np.uint64(32)).astype(np.int64).sum()) * 2**32
+            + int((delta_lo & np.uint64(0xFFFFFFFF)).astype(np.int64).sum()))
+
+def aggregate_events(events, period='D', kinds=INCOME_KINDS):
+    """
+    Sums the wei deltas and counts the events of every day or month.
+
+    :param events (ndarray): Events with the event dtype, sorted by block number.
+    :param period (str, optional): 'D' for days or 'M' for months. Defaults to days.
+    :param kinds (tuple, optional): Event kinds to include. Defaults to all income.
+    :return (dict): Period start dates mapped to their wei delta and event count.
+    """
+    events = events[np.isin(events['kind'], kinds)]
+    if len(events) == 0:
+        return {}
+
+    # Timestamps of sorted blocks increase, so every period is a continuous slice
+    periods = events['timestamp'].astype('datetime64[s]').astype(f'datetime64[{period}]')
+    starts = np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
+    ends = np.r_[starts[1:], len(events)]
+
+    totals = {}
+    for start, end in zip(starts, ends):
+        period_date = periods[start].astype('datetime64[D]').item()
+        totals[period_date] = (sum_wei(events[start:end]), int(end - start))
+    return totals
+
+def get_history_by_year(events, years):
+    """
+    Builds the income metrics of report years from stored events.
+
+    :param events (ndarray): Events with the event dtype, sorted by block number.
+    :param years (iterable): The report years.
+    :return (dict): Years mapped to their daily deltas, miner count, withdrawal count, and newest block.
+    """
+    results = {}
+    event_years = events['timestamp'].astype('datetime64[s]').astype('datetime64[Y]').astype(int) + 1970
+    for year in years:
+        year_events = events[event_years == year]
+        daily_deltas = {
+            date: delta / ETH_DECIMAL_FACTOR
+            for date, (delta, count) in aggregate_events(year_events).items()
+        }
+        miner_count = int(np.isin(year_events['kind'], MINER_KINDS).sum())
+        withdrawal_count = int((year_events['kind'] == EVENT_WITHDRAWAL).sum())
+        newest_block = int(year_events['block_number'].max()) if len(year_events) else 0
+        results[year] = (daily_deltas, miner_count, withdrawal_count, newest_block)
+    return results
+
+# Shared store for all scans
+event_store = EventStore(EVENT_STORE_FOLDER)
@@ -0,0 +1,291 @@
+# TRACKS BALANCE HISTORY SCANS
+
+# External libraries
+from datetime import datetime
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+from utility.event_store import to_event_array
+from utility.decoders import decode_history_items
+from utility.event_store import EVENT_OTHER, EVENT_WITHDRAWAL, EVENT_MINER, EVENT_TRANSFER
+
+# Internal config data
+from config import ETH1_ADDRESS, YEAR
+
+class BalanceHistoryScan:
+    """
+    State of a coin balance history scan, independent of how
+    history pages and blocks are fetched from the Blockscout API.
+
+    - Pages are added from the latest to the oldest balance event
+    - Paging can start below a given block instead of the latest block
+    - The timeframe can span multiple years, which are tracked separately
+    - Positive deltas within the timeframe are returned as candidate blocks
+    - Verified candidate blocks are added to the income metrics in history order
+    - Candidate blocks that could not be verified keep the scan incomplete, even once all pages were added
+    - Blocks of earlier updates are skipped, and paging stops once all years reach them
+    - All new balance events within the timeframe are kept with their classification
+    """
+
+    def __init__(self, address=ETH1_ADDRESS, year=YEAR, start_block=None, last_year=None, known_blocks=None):
+        self.address = address
+        self.last_year = last_year or year
+
+        # Income delta objects
+        self.daily_deltas = {}
+        self.events = {}
+        self.miner_count = 0
+        self.withdrawal_count = 0
+        self.eth_decimal_factor = 10**18
+
+        # Validator payments per year as miner and withdrawal counts
+        self.yearly_counts = {report_year: [0, 0] for report_year in range(year, self.last_year + 1)}
+
+        # Iteration parameters for API calls
+        self.start_block = start_block
+        self.next_page_params = None
+        if start_block is not None:
+            self.next_page_params = {'block_number': start_block, 'items_count': 0}
+        self.timeframe_min_date = datetime(year, 1, 1).date()
+        self.timeframe_max_date = datetime(self.last_year, 12, 31).date()
+        self.start_collecting = False
+        self.finished = False
+        self.unverified_blocks = []
+
+        # Newest blocks processed per year, by earlier updates and by this scan
+        self.known_blocks = dict(known_blocks or {})
+        self.newest_blocks = {}
+        self.stop_block = None
+        if all(report_year in self.known_blocks for report_year in self.yearly_counts):
+            self.stop_block = min(self.known_blocks[report_year] for report_year in self.yearly_counts)
+
+    def page_params(self):
+        """
+        Returns the iteration parameters of the next history page
+        and shows the depth of history events in the terminal report.
+
+        :return (dict): Query parameters for the next API call.
+        """
+        params = {}
+
+        # Check if last API call had attached iteration parameters
+        if self.next_page_params:
+            params = self.next_page_params
+
+        block_number = params.get('block_number', 'Latest')
+        items_count = params.get('items_count', '0')
+        printLine(f"⚪️ Fetching data, Block: {block_number}, Balance History Depth: {items_count}")
+        return params
+
+    def add_page(self, data):
+        """
+        Adds a page of up to 50 historical balance events.
+
+        :param data (dict): The decoded coin balance history page.
+        :return (list): Candidate blocks as tuples of block number, date, and delta in wei.
+        """
+        candidates = []
+
+        # Check if timeframe has been entered or not
+        searchStatus = False
+
+        # For every entry within the batch of 50 historical balance events, only extracting the needed data
+        for item_block_number, transaction_date, timestamp, delta in decode_history_items(data['items']):
+
+            # Monitor and toggle data fetching status
+            if not self.start_collecting:
+
+                # Event is outside the defined report timeframe, continue searching
+                if not searchStatus:
+                    printLine(f"🟡 {transaction_date}, searching events in timeframe", True)
+                    searchStatus = True
+
+                # Event is inside the defined report timeframe, start collecting
+                if transaction_date <= self.timeframe_max_date:
+                    printLine(f"🟢 {transaction_date}, found events within timeframe", True)
+                    self.start_collecting = True
+
+            # If data is within the report timeframe
+            if self.start_collecting:
+
+                # Check if the events are outside the end date
+                if transaction_date < self.timeframe_min_date:
+                    printLine(f"🏁 {transaction_date}, stopping due to end of timeframe", True)
+                    self.finished = True
+                    return candidates
+
+                # Check if the events were already processed by an earlier update
+                if self.stop_block is not None and item_block_number <= self.stop_block:
+                    printLine(f"🏁 Block {item_block_number}, stopping at the last update", True)
+                    self.finished = True
+                    return candidates
+
+                # Remember the newest block of every year
+                report_year = transaction_date.year
+                if item_block_number > self.newest_blocks.get(report_year, 0):
+                    self.newest_blocks[report_year] = item_block_number
+
+                # Skip events that were processed by an earlier update
+                if item_block_number <= self.known_blocks.get(report_year, 0):
+                    continue
+                self.events[item_block_number] = [timestamp, delta, EVENT_OTHER]
+
+                # Only consider positive deltas, if income was withdrawn from validator
+                if delta > 0:
+                    candidates.append((item_block_number, transaction_date, delta))
+
+        self.next_page_params = data.get('next_page_params')
+
+        # If there are no more coin balance history events, stop the scan
+        if not self.next_page_params or int(self.next_page_params.get('block_number', 1)) == 0:
+            printLine("🏁 No further balance history available, ending data fetch.", True)
+            self.finished = True
+
+        return candidates
+
+    @property
+    def complete(self):
+        # All pages were added and every candidate block was verified
+        return self.finished and not self.unverified_blocks
+
+    def add_classified_block(self, candidate, classification):
+        """
+        Adds a candidate block to the income metrics, or keeps it for a later verification if its lookup failed.
+
+        :param candidate (tuple): Block number, date, and delta in wei of the balance event.
+        :param classification (tuple or None): If the address is listed in the block withdrawals and the block miner, None if unknown.
+        """
+        if classification is None:
+            printLine(f"🟠 Block {candidate[0]} could not be verified, it is kept for a resumed scan.", True)
+            self.unverified_blocks.append(candidate)
+            return
+        self.add_verified_block(*candidate, *classification)
+
+    def add_verified_block(self, item_block_number, transaction_date, delta, is_withdrawal, block_miner):
+        """
+        Adds a verified candidate block to the income metrics.
+
+        :param item_block_number (int): The block number of the balance event.
+        :param transaction_date (date): The date of the balance event.
+        :param delta (int): The balance delta in wei.
+        :param is_withdrawal (bool): If the address is listed in the block withdrawals.
+        :param block_miner (str or None): The lowercase miner hash of the block, None if unknown.
+        """
+        is_miner = block_miner == self.address.lower()
+        event = self.events.get(item_block_number)
+
+        # Log if the address is found in withdrawals
+        if is_withdrawal:
+            self.withdrawal_count += 1
+            self.yearly_counts[transaction_date.year][1] += 1
+            if event is not None:
+                event[2] = EVENT_WITHDRAWAL
+            printLine(f"💵 Found validator withdrawal reward in block {item_block_number}. Total: {self.withdrawal_count}", True)
+        elif is_miner:
+            # Only count blocks where the address is the miner
+            self.miner_count += 1
+            self.yearly_counts[transaction_date.year][0] += 1
+            if event is not None:
+                event[2] = EVENT_MINER
+            printLine(f"🧱 Found validator miner reward in block {item_block_number}. Total: {self.miner_count}", True)
+        elif event is not None:
+            # Other incoming payments are kept as transfers, but are no income
+            event[2] = EVENT_TRANSFER
+
+        # Only count deltas if the address is the miner or listed in the withdrawals
+        if is_miner or is_withdrawal:
+            """
+            Add date and delta amount to the income metrics list
+            If date already exists, add current delta to the existing one
+            """
+            delta_coin = delta / self.eth_decimal_factor
+            self.daily_deltas[transaction_date] = self.daily_deltas.get(transaction_date, 0) + delta_coin
+
+    def to_checkpoint(self):
+        """
+        Serializes the scan state for a checkpoint file.
+
+        :return (dict): The JSON compatible scan state.
+        """
+        return {
+            'start_block': self.start_block,
+            'next_page_params': self.next_page_params,
+            'start_collecting': self.start_collecting,
+            'finished': self.finished,
+            'daily_deltas': {date.isoformat(): delta for date, delta in self.daily_deltas.items()},
+            'events': [[block_number, timestamp, str(delta), kind] for block_number, (timestamp, delta, kind) in self.events.items()],
+            'miner_count': self.miner_count,
+            'withdrawal_count': self.withdrawal_count,
+            'yearly_counts': {str(report_year): counts for report_year, counts in self.yearly_counts.items()},
+            'known_blocks': {str(report_year): block for report_year, block in self.known_blocks.items()},
+            'newest_blocks': {str(report_year): block for report_year, block in self.newest_blocks.items()},
+        }
+
+    def restore(self, state):
+        """
+        Continues the scan from the state of a checkpoint file.
+
+        :param state (dict): The scan state stored by a checkpoint.
+        :return (list): Unverified candidate blocks as tuples of block number, date, and delta in wei.
+        """
+        self.start_block = state.get('start_block')
+        self.next_page_params = state['next_page_params']
+        self.start_collecting = state['start_collecting']
+        self.finished = state.get('finished', False)
+        self.daily_deltas = {
+            datetime.strptime(date, '%Y-%m-%d').date(): delta
+            for date, delta in state['daily_deltas'].items()
+        }
+        self.events = {
+            block_number: [timestamp, int(delta), kind]
+            for block_number, timestamp, delta, kind in state.get('events', [])
+        }
+        self.miner_count = state['miner_count']
+        self.withdrawal_count = state['withdrawal_count']
+        for report_year, counts in state['yearly_counts'].items():
+            self.yearly_counts[int(report_year)] = counts
+        self.newest_blocks = {int(report_year): block for report_year, block in state.get('newest_blocks', {}).items()}
+
+        block_number = (self.next_page_params or {}).get('block_number', 'Latest')
+        if self.finished:
+            printLine(f"⏪ Resuming scan to verify {len(state.get('candidates', []))} blocks with {len(self.daily_deltas)} days of income", True)
+        else:
+            printLine(f"⏪ Resuming scan at block {block_number} with {len(self.daily_deltas)} days of income", True)
+
+        return [
+            (block_number, datetime.strptime(date, '%Y-%m-%d').date(), int(delta))
+            for block_number, date, delta in state.get('candidates', [])
+        ]
+
+    def event_array(self):
+        """
+        :return (ndarray): All new balance events of the scan in the columnar event format.
+        """
+        return to_event_array(
+            (block_number, timestamp, delta, kind)
+            for block_number, (timestamp, delta, kind) in self.events.items()
+        )
+
+    def result(self):
+        """
+        :return (dict): A dictionary of dates and their coin deltas.
+        :return (int): Number of times the validator was listed as miner
+        :return (int): Number of times the validator was listed as withdrawal address
+        """
+        return self.daily_deltas, self.miner_count, self.withdrawal_count
+
+    def result_by_year(self):
+        """
+        Splits the income metrics into the years of the timeframe.
+        The newest block of a year is only known once the scan is complete.
+
+        :return (dict): Years mapped to their daily deltas, miner count, withdrawal count, and newest block.
+        """
+        results = {}
+        for report_year, (miner_count, withdrawal_count) in self.yearly_counts.items():
+            daily_deltas = {date: delta for date, delta in self.daily_deltas.items() if date.year == report_year}
+            newest_block = None
+            if self.complete:
+                newest_block = max(self.newest_blocks.get(report_year, 0), self.known_blocks.get(report_year, 0))
+            results[report_year] = (daily_deltas, miner_count, withdrawal_count, newest_block)
+        return results
@@ -0,0 +1,136 @@
+# RECORDS AND REPLAYS API RESPONSES
+
+# System libraries
+import threading
+import zipfile
+import atexit
+import json
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+
+INDEX_NAME = 'index.json'
+
+class HttpArchive:
+    """
+    Compressed archive of API responses for offline reruns and audits.
+
+    - Recording stores the body of every fetched response as its own zip member
+    - Failed fetches are recorded as well, so replays fail the same way
+    - An index maps the endpoint, URL, query parameters, and JSON body of every call to its member
+    - Replays read single members from the index, without any network call or rate limit
+    - API keys are added by the HTTP clients later on, so they are never recorded
+    """
+
+    def __init__(self):
+        self.path = None
+        self.mode = None
+        self.archive = None
+        self.index = {}
+        self.missing = 0
+        self.lock = threading.Lock()
+
+    @property
+    def recording(self):
+        return self.mode == 'record'
+
+    @property
+    def replaying(self):
+        return self.mode == 'replay'
+
+    def get_key(self, endpoint, url, params, payload=None):
+        # Calls with equal endpoint, URL, query parameters, and JSON body share their response
+        key = [endpoint, url, sorted((str(key), str(value)) for key, value in (params or {}).items())]
+        if payload is not None:
+            key.append(payload)
+        return json.dumps(key, sort_keys=True)
+
+    def start_recording(self, path):
+        """
+        Starts writing every fetched response into a new archive.
+
+        :param path (str): The archive file, replaced if it exists.
+        """
+        self.close()
+        self.path = path
+        self.mode = 'record'
+        self.archive = zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED)
+        self.index = {}
+
+    def start_replay(self, path):
+        """
+        Serves all API calls from a recorded archive.
+
+        :param path (str): The archive file.
+        :return (bool): True if the archive could be opened, False otherwise.
+        """
+        self.close()
+        try:
+            archive = zipfile.ZipFile(path, 'r')
+            index = json.loads(archive.read(INDEX_NAME))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+        self.path = path
+        self.mode = 'replay'
+        self.archive = archive
+        self.index = index
+        self.missing = 0
+        return True
+
+    def record(self, endpoint, url, params, content, payload=None):
+        """
+        Adds a response to the archive, keeping the first response of repeated calls.
+
+        :param endpoint (str): The name of the endpoint.
+        :param url (str): The called URL.
+        :param params (dict or None): Query parameters of the call, without API keys.
+        :param content (bytes or None): The response body, None if the fetch failed.
+        :param payload (dict or list, optional): The JSON body of a POST request.
+        """
+        if not self.recording:
+            return
+        key = self.get_key(endpoint, url, params, payload)
+        with self.lock:
+            if key in self.index:
+                return
+            member = None
+            if content is not None:
+                member = f"responses/{len(self.index)}.json"
+                self.archive.writestr(member, content)
+            self.index[key] = member
+
+    def replay(self, endpoint, url, params, payload=None):
+        """
+        Reads a recorded response.
+
+        :param endpoint (str): The name of the endpoint.
+        :param url (str): The called URL.
+        :param params (dict or None): Query parameters of the call, without API keys.
+        :param payload (dict or list, optional): The JSON body of a POST request.
+        :return (bytes or None): The recorded response body, None if the fetch failed or was not recorded.
+        """
+        key = self.get_key(endpoint, url, params, payload)
+        with self.lock:
+            if key not in self.index:
+                self.missing += 1
+                printLine(f"🟠 Call of {endpoint} was not recorded within the archive.", True)
+                return None
+            member = self.index[key]
+            return self.archive.read(member) if member is not None else None
+
+    def close(self):
+        # Writes the index of recorded archives and closes the file
+        with self.lock:
+            if self.archive is None:
+                return
+            if self.recording:
+                self.archive.writestr(INDEX_NAME, json.dumps(self.index))
+            self.archive.close()
+            self.archive = None
+            self.mode = None
+
+# Shared archive of both HTTP clients, inactive unless started
+http_archive = HttpArchive()
+
+# Write the index even if a run stops early
+atexit.register(http_archive.close)
@@ -0,0 +1,266 @@
+# MANAGES API CONNECTIONS
+
+# External libraries
+import requests
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+import threading
+import time
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+from utility.rate_limiter import limiters, parse_retry_after
+from utility.decoders import decode_json
+from utility.http_archive import http_archive
+from utility.run_metrics import run_metrics
+
+# Internal config data
+from config import BLOCKSCOUT_API_KEY, COINMARKETCAP_HEADERS
+from utility.settings import BLOCKSCOUT_VERIFY_WORKERS, RPC_WORKERS
+
+"""
+Shared request policy of all API calls.
+
+- RETRIES: attempts before a network error is given up
+- BACKOFF_FACTOR: exponential wait between attempts, in seconds
+- TIMEOUT: maximum wait for a server response, in seconds
+- RATE_LIMIT_RETRIES: attempts after the server answered with HTTP 429
+- POOL_SIZE: kept-alive connections per host, at least one per verify worker
+- PROBE_TIMEOUT: maximum wait for the response of an API probe, in seconds
+"""
+DEFAULT_POLICY = {
+    'retries': 3, # tries
+    'backoff_factor': 2, # tries
+    'timeout': 10, # seconds
+    'rate_limit_retries': 5, # tries
+}
+POOL_SIZE = max(10, BLOCKSCOUT_VERIFY_WORKERS + 1, RPC_WORKERS + 1) # connections
+PROBE_TIMEOUT = 3 # seconds
+
+"""
+Endpoint configurations, overriding the shared request policy.
+
+- provider: adds the API key parameters or headers and the rate limit of the provider
+- probes only try once with a short timeout, as they only verify if an API is reachable
+- RPC endpoints send JSON-RPC batches as POST requests
+"""
+ENDPOINTS = {
+    'blockscout_history': {'provider': 'blockscout'},
+    'blockscout_block': {'provider': 'blockscout'},
+    'blockscout_withdrawals': {'provider': 'blockscout'},
+    'blockscout_address_withdrawals': {'provider': 'blockscout'},
+    'blockscout_validated_blocks': {'provider': 'blockscout'},
+    'blockscout_blocks': {'provider': 'blockscout'},
+    'blockscout_probe': {'provider': 'blockscout', 'retries': 1, 'timeout': PROBE_TIMEOUT},
+    'coinmarketcap_ohlcv': {'provider': 'coinmarketcap'},
+    'coinmarketcap_probe': {'provider': 'coinmarketcap', 'retries': 1, 'timeout': PROBE_TIMEOUT},
+    'rpc_blocks': {'provider': 'rpc'},
+    'rpc_receipts': {'provider': 'rpc'},
+    'rpc_probe': {'provider': 'rpc', 'retries': 1, 'timeout': PROBE_TIMEOUT},
+}
+
+# Authentication of every provider
+PROVIDER_PARAMS = {
+    'blockscout': {'apikey': BLOCKSCOUT_API_KEY} if BLOCKSCOUT_API_KEY is not None else {},
+    'coinmarketcap': {},
+    'rpc': {},
+}
+PROVIDER_HEADERS = {
+    'blockscout': {},
+    'coinmarketcap': COINMARKETCAP_HEADERS,
+    'rpc': {},
+}
+
+# Connection pools, one session per host
+sessions = {}
+sessions_lock = threading.Lock()
+
+def get_session(url):
+    """
+    Returns the pooled session of a host, creating it on first use.
+    Sessions keep connections alive, so only the first call to a host
+    pays for the TCP and TLS handshake.
+
+    :param url (str): Any URL of the host.
+    :return (requests.Session): The shared session of the host.
+    """
+    parts = urlsplit(url)
+    host = f"{parts.scheme}://{parts.netloc}"
+
+    with sessions_lock:
+        if host not in sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=POOL_SIZE)
+            session.mount(f"{host}/", adapter)
+            sessions[host] = session
+        return sessions[host]
+
+def get_policy(endpoint):
+    """
+    Merges the endpoint configuration into the shared request policy.
+
+    :param endpoint (str): The name of the endpoint.
+    :return (dict): The request policy of the endpoint.
+    """
+    return {**DEFAULT_POLICY, **ENDPOINTS[endpoint]}
+
+def send_request(endpoint, url, params=None, headers=None, timeout=None, payload=None):
+    """
+    Sends a single GET request through the pooled session of the host,
+    or a POST request if a JSON payload is given,
+    after waiting for the rate limiter of the provider.
+
+    :param endpoint (str): The name of the endpoint.
+    :param url (str): The URL to call.
+    :param params (dict, optional): Query parameters of the call.
+    :param headers (dict, optional): Overrides the headers of the provider.
+    :param timeout (float, optional): Overrides the timeout of the endpoint.
+    :param payload (dict or list, optional): The JSON body of a POST request.
+    :return (requests.Response): The server response.
+    """
+    policy = get_policy(endpoint)
+    provider = policy['provider']
+
+    # Charge the rate limit when the call starts
+    run_metrics.add_sleep(provider, 'rate_limit', limiters[provider].acquire())
+
+    start = time.perf_counter()
+    try:
+        response = get_session(url).request(
+            'GET' if payload is None else 'POST',
+            url,
+            params={**PROVIDER_PARAMS[provider], **(params or {})},
+            headers=headers or PROVIDER_HEADERS[provider],
+            timeout=timeout or policy['timeout'],
+            json=payload,
+        )
+    except requests.RequestException:
+        run_metrics.add_request(endpoint, 'error', time.perf_counter() - start)
+        raise
+    run_metrics.add_request(endpoint, response.status_code, time.perf_counter() - start)
+    return response
+
+def fetch_json(endpoint, url, params=None, description='API data', payload=None):
+    """
+    Fetches JSON data, recording or replaying the response if an archive is active.
+
+    :param endpoint (str): The name of the endpoint.
+    :param url (str): The URL to call.
+    :param params (dict, optional): Query parameters of the call.
+    :param description (str, optional): Describes the data within terminal outputs.
+    :param payload (dict or list, optional): The JSON body of a POST request.
+    :return (dict or list or None): The decoded response, None if an error occurs.
+    """
+    if http_archive.replaying:
+        content = http_archive.replay(endpoint, url, params, payload)
+    else:
+        content = fetch_content(endpoint, url, params, description, payload)
+        http_archive.record(endpoint, url, params, content, payload)
+    return decode_content(content, description)
+
+def decode_content(content, description='API data'):
+    """
+    Decodes a JSON response body of either HTTP client.
+
+    :param content (bytes or None): The response body, None if the call failed.
+    :param description (str, optional): Describes the data within terminal outputs.
+    :return (dict or list or None): The decoded response, None if the call failed or the body is invalid.
+    """
+    if content is None:
+        return None
+    try:
+        return decode_json(content)
+    except ValueError as e:
+        printLine(f"🔴 Error fetching {description}.", True)
+        return None
+
+def fetch_content(endpoint, url, params=None, description='API data', payload=None):
+    """
+    Fetches a response body, retrying on network errors with exponential backoff.
+    Rate-limited calls slow down the provider and are retried after Retry-After.
+
+    :param endpoint (str): The name of the endpoint.
+    :param url (str): The URL to call.
+    :param params (dict, optional): Query parameters of the call.
+    :param description (str, optional): Describes the data within terminal outputs.
+    :param payload (dict or list, optional): The JSON body of a POST request.
+    :return (bytes or None): The response body, None if an error occurs.
+    """
+    retries = CallRetries(endpoint, description)
+
+    while retries.remaining():
+        try:
+            response = send_request(endpoint, url, params, payload=payload)
+
+            # Slow down and retry if the server rate limit was hit
+            if retries.rate_limited(response.status_code, response.headers.get('Retry-After')):
+                continue
+
+            # Raise exception for HTTP errors
+            response.raise_for_status()
+            retries.succeeded()
+            return response.content
+        except (requests.ConnectionError, requests.Timeout) as e:
+            time.sleep(retries.network_error())
+        except requests.RequestException as e:
+            return retries.failed()
+
+    return retries.exhausted()
+
+class CallRetries:
+    """
+    Retry decisions of a single API call, shared by the pooled and the async HTTP client.
+
+    - Network errors are retried with exponential backoff, up to the retries of the endpoint
+    - Rate-limited calls slow down the provider and are retried after Retry-After
+    - Retries and backoff sleeps are added to the run metrics
+    """
+
+    def __init__(self, endpoint, description='API data'):
+        self.endpoint = endpoint
+        self.description = description
+        self.policy = get_policy(endpoint)
+        self.provider = self.policy['provider']
+        self.limiter = limiters[self.provider]
+        self.attempt = 0
+        self.throttled = 0
+
+    def remaining(self):
+        # True while the call has attempts left
+        return self.attempt < self.policy['retries']
+
+    def rate_limited(self, status, retry_after=None):
+        """
+        :param status (int): The HTTP status code of the response.
+        :param retry_after (str, optional): The Retry-After header of the response.
+        :return (bool): True if the call was rate limited and is repeated.
+        """
+        if status != 429 or self.throttled >= self.policy['rate_limit_retries']:
+            return False
+        self.throttled += 1
+        self.limiter.throttle(parse_retry_after(retry_after))
+        run_metrics.add_retry(self.endpoint)
+        printLine(f"🟡 Rate limit reached. Slowing down. {self.throttled}/{self.policy['rate_limit_retries']}.", True)
+        return True
+
+    def network_error(self):
+        """
+        :return (float): Seconds to wait before the next attempt.
+        """
+        backoff = self.policy['backoff_factor'] ** self.attempt
+        printLine(f"🟡 Network error. Retrying. {self.attempt + 1}/{self.policy['retries']}.", True)
+        run_metrics.add_retry(self.endpoint)
+        run_metrics.add_sleep(self.provider, 'backoff', backoff)
+        self.attempt += 1
+        return backoff
+
+    def succeeded(self):
+        self.limiter.recover()
+
+    def failed(self):
+        printLine(f"🔴 Error fetching {self.description}.", True)
+        return None
+
+    def exhausted(self):
+        printLine(f"❌ Failed to fetch {self.description} after {self.policy['retries']} attempts.", True)
+        return None
@@ -8,75 +8,83 @@ import requests
 
 # Internal library imports
 from utility.terminal_outputs import printLine
-from config import BLOCKSCOUT_API_KEY
+from utility.http_client import send_request
 
-def check_blockscout_api(api_url):
+def probe_blockscout_api(api_url):
     """
-    Check if the Blockscout API is accessible.
+    Check if the Blockscout API is accessible, with a call of the latest block number.
 
     :param api_url (str): The URL of the Blockscout API.
     :return (bool): True if the API is reachable, False otherwise.
+    :return (str): The result message.
     """
-    url = f'{api_url}'
-    
-    if BLOCKSCOUT_API_KEY is not None:
-        url += f'&apikey={BLOCKSCOUT_API_KEY}'
-
     try:
-        # Sample request parameters
+        # Smallest available response of the API
         params = {
-            'module': 'stats',
-            'action': 'ethprice'
+            'module': 'block',
+            'action': 'eth_block_number'
         }
 
-        response = requests.get(url, params=params)
+        response = send_request('blockscout_probe', api_url, params)
 
         # If there was a valid return
         if response.status_code == 200:
-            printLine("🟢 Blockscout API is reachable.", True)
-            return True
+            return True, "🟢 Blockscout API is reachable."
         else:
-            printLine("🟡 Blockscout API is not reachable.", True)
-            return False
-        
+            return False, "🟡 Blockscout API is not reachable."
+
     # If the API is offline
     except requests.RequestException as e:
-        printLine(f"🔴 Error connecting to Blockscout API.", True)
-        return False
-    
-def check_coinmarketcap_api(api_url, headers):
+        return False, "🔴 Error connecting to Blockscout API."
+
+def probe_coinmarketcap_api(api_url, headers):
     """
-    Check if the CoinMarketCap API is accessible.
+    Check if the CoinMarketCap API is accessible with the API key.
+    The key info endpoint does not use any credits.
 
     :param api_url (str): The URL of the CoinMarketCap API.
     :param headers (dict): Headers required for the CoinMarketCap API request.
     :return (bool): True if the API is reachable, False otherwise.
+    :return (str): The result message.
     """
-
-    # Sample request parameters
-    sample_params = {
-    'start': '1',
-    'limit': '5000',
-    'convert': 'EUR',  
-    }
-
     try:
         # Call API
-        sample_call = api_url + '/v1/cryptocurrency/listings/latest'
-        response = requests.get(sample_call, headers=headers, params=sample_params)
+        sample_call = api_url + '/v1/key/info'
+        response = send_request('coinmarketcap_probe', sample_call, headers=headers)
 
         # If there was a valid return
         if response.status_code == 200:
-            printLine("🟢 CoinMarketCap API is reachable.", True)
-            return True
+            return True, "🟢 CoinMarketCap API is reachable."
         else:
-            printLine("🟡 CoinMarketCap API is not reachable.", True)
-            return False
-    
+            return False, "🟡 CoinMarketCap API is not reachable."
+
     # If the API is offline
     except requests.RequestException as e:
-        printLine(f"🔴 Error connecting to CoinMarketCap API.", True)
-        return False
+        return False, "🔴 Error connecting to CoinMarketCap API."
+
+def probe_rpc_node(rpc_url):
+    """
+    Check if the JSON-RPC API of the execution node is accessible.
+
+    :param rpc_url (str): The URL of the JSON-RPC API.
+    :return (bool): True if the node is reachable, False otherwise.
+    :return (str): The result message.
+    """
+    try:
+        # Sample request for the chain ID
+        payload = {'jsonrpc': '2.0', 'id': 1, 'method': 'eth_chainId', 'params': []}
+
+        response = send_request('rpc_probe', rpc_url, payload=payload)
+
+        # If there was a valid return
+        if response.status_code == 200:
+            return True, "🟢 Execution node is reachable."
+        else:
+            return False, "🟡 Execution node is not reachable."
+
+    # If the node is offline
+    except requests.RequestException as e:
+        return False, "🔴 Error connecting to execution node."
 
 def is_valid_eth_address(address):
     """
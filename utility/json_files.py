@@ -0,0 +1,85 @@
+# READS AND WRITES LOCAL CACHE FILES
+
+# System libraries
+from contextlib import contextmanager
+import threading
+import atexit
+import json
+import os
+
+def load_json(path):
+    """
+    Reads a JSON file of the local caches.
+
+    :param path (str or None): The file to read, None if the cache is disabled.
+    :return (any or None): The decoded content, None if the file is disabled, missing, or broken.
+    """
+    if not path or not os.path.isfile(path):
+        return None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+@contextmanager
+def atomic_write(path, binary=False):
+    """
+    Opens a temporary file that replaces the given file once it was written completely,
+    so a crash never leaves a partial file behind.
+
+    :param path (str): The file to write, missing folders are created.
+    :param binary (bool, optional): Open the file in binary instead of text mode.
+    :return (file): The opened temporary file.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'wb') if binary else open(temp_path, 'w', encoding='utf-8') as f:
+        yield f
+    os.replace(temp_path, path)
+
+def write_json_atomic(path, data):
+    """
+    Atomically writes a JSON file of the local caches.
+
+    :param path (str): The file to write, missing folders are created.
+    :param data (any): The JSON compatible content.
+    """
+    with atomic_write(path) as f:
+        json.dump(data, f)
+
+class JsonFileCache:
+    """
+    Base of the caches that are kept within a single JSON file.
+
+    - The file is loaded once on first use, and subclasses restore its content with their from_json method
+    - Missing or broken files start an empty cache
+    - Changes are written atomically from the to_json method of subclasses, when the program exits or save is called
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.loaded = False
+        self.changed = False
+        self.lock = threading.RLock()
+        atexit.register(self.save)
+
+    def load(self):
+        # Loads the cache file once
+        with self.lock:
+            if self.loaded:
+                return
+            self.loaded = True
+            stored = load_json(self.path)
+            if stored is not None:
+                self.from_json(stored)
+
+    def save(self):
+        # Atomically writes the cache file if entries changed since the last save
+        with self.lock:
+            if not self.changed or not self.path:
+                return
+            write_json_atomic(self.path, self.to_json())
+            self.changed = False
@@ -1,63 +1,65 @@
 # GENERATES PDF REPORT
 
 # External libraries
-import pandas as pd
 from fpdf import FPDF
 from calendar import month_name
 import os
 
 # Internal library imports
+from utility.report_model import IncomeReport
 from utility.terminal_outputs import printLine
 
 # Internal config data
 from config import YEAR, ETH1_ADDRESS
 from config import COIN_NAME, FIAT_CURRENCY, REPORT_TITLE, EXPLORER_LINK
 
-def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count):
+def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count, address=ETH1_ADDRESS, year=YEAR):
     """
-    Generates a PDF report from a CSV file.
+    Generates a PDF report from an exported CSV file.
+
+    :param csv_file (str): The path to the input CSV file containing daily income data.
+    :param pdf_file (str): The path where the generated PDF report will be saved.
+    :param address (str, optional): The address or portfolio name shown on the cover page.
+    :param year (int, optional): The report year. Defaults to the configured year.
+    """
+    report = IncomeReport.from_csv(csv_file, miner_count, withdrawal_count, address, year)
+    report_to_pdf(report, pdf_file)
+
+def report_to_pdf(report, pdf_file):
+    """
+    Generates a PDF report from an income report.
 
     - Builds a cover page with global report metadata
     - Creates a table with monthly and yearly incomes
     - Adds detailed monthly income pages from daily data
 
-    :param csv_file (str): The path to the input CSV file containing daily income data.
+    :param report (IncomeReport): The daily income data and metadata of the report.
     :param pdf_file (str): The path where the generated PDF report will be saved.
     """
-    
-    # Read CSV file
-    df = pd.read_csv(csv_file)
-    
-    # Convert 'Date' column to datetime
-    df['Date'] = pd.to_datetime(df['Date'])
+    address = report.address_label
+    year = report.year
+    miner_count = report.miner_count
+    withdrawal_count = report.withdrawal_count
 
     # Create instance of FPDF class
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
 
+    # Yearly totals add the monthly totals in month order
     total_income = 0.0
     total_coins = 0.0
-    monthly_incomes = {}
-    monthly_coins = {}
-
-    # Calculate yearly and monthly incomes
-    for month, month_df in df.groupby(df['Date'].dt.month):
-        monthly_total_income = 0.0
-        monthly_total_coins = 0.0
-        for row in month_df.itertuples():
-            monthly_total_income += float(row[4]) if row[4] != 'None' else 0.0
-            monthly_total_coins += float(row[2])
-        monthly_incomes[month] = monthly_total_income
-        monthly_coins[month] = monthly_total_coins
-        total_income += monthly_total_income
-        total_coins += monthly_total_coins
+    for month_income in report.months:
+        total_income += month_income.income
+        total_coins += month_income.coins
+    monthly_incomes = {month_income.month: month_income.income for month_income in report.months}
+    monthly_coins = {month_income.month: month_income.coins for month_income in report.months}
 
     ### COVER PAGE
 
     # New page with title
     pdf.add_page()
     pdf.set_font("Arial", size=14)
-    pdf.cell(200, 10, f"Validator Income Report {YEAR}", ln=True, align="C")
+    pdf.cell(200, 10, f"Validator Income Report {year}", ln=True, align="C")
     pdf.ln(20)
 
     # Draw info box for global report metadata
@@ -85,7 +87,7 @@ def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count):
     # Only show validator stats if any records exist
     if total_validations > 0:
         pdf.set_x(inset)
-        pdf.cell(0, 10, f"{ETH1_ADDRESS}", ln=True, align="L")
+        pdf.cell(0, 10, f"{address}", ln=True, align="L")
         pdf.set_x(inset)
         pdf.cell(0, 10, f"received a total of {total_validations} validator payments from", ln=True, align="L")
         pdf.set_x(inset)
@@ -96,7 +98,7 @@ def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count):
         pdf.set_x(inset)
         pdf.cell(0, 10, f"Report generated for address", ln=True, align="L")
         pdf.set_x(inset)
-        pdf.cell(0, 10, f"{ETH1_ADDRESS}", ln=True, align="L")
+        pdf.cell(0, 10, f"{address}", ln=True, align="L")
         pdf.set_x(inset)
         pdf.cell(0, 10, f"using daily price data from a local CSV file.", ln=True, align="L")
         pdf.ln(10)
@@ -110,7 +112,7 @@ def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count):
     # Prepare styling and title
     pdf.ln(10)
     pdf.set_font("Arial", size=14)
-    pdf.cell(200, 10, f"Monthly Incomes of {YEAR}", ln=True, align="C")
+    pdf.cell(200, 10, f"Monthly Incomes of {year}", ln=True, align="C")
     pdf.ln(10)
     pdf.set_font("Arial", size=12)
 
@@ -159,13 +161,14 @@ def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count):
     ### MONTHLY INCOME PAGES
 
     # Iterate through each month and add data pages
-    for month, month_df in df.groupby(df['Date'].dt.month):
+    for month_income in report.months:
+        month = month_income.month
         month_name_str = month_name[month]
 
         # Add new page for each month
         pdf.add_page()
         pdf.set_font("Arial", size=14)
-        pdf.cell(200, 10, f"Month: {month_name_str} {YEAR}", ln=True, align="C")
+        pdf.cell(200, 10, f"Month: {month_name_str} {year}", ln=True, align="C")
         pdf.ln(10)
 
         # Prepare styling and table headers
@@ -175,7 +178,7 @@ def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count):
         spacing = 1.2
 
         # Create row for each day of the month
-        for col in month_df.columns:
+        for col in report.headers:
             pdf.cell(col_width, row_height * spacing, col, border=1, align="R")
 
         # Prepare styling for table fields
@@ -183,30 +186,29 @@ def csv_to_pdf(csv_file, pdf_file, miner_count, withdrawal_count):
         pdf.ln(row_height * spacing)
 
         # Fill table with monthly income data
-        for row in month_df.itertuples():
+        for index in range(month_income.start, month_income.end):
 
             # Date, formatted as YYYY-MM-DD
-            formatted_date = row[1].strftime('%Y-%m-%d')
-            pdf.cell(col_width, row_height * spacing, formatted_date, border=1, align="R")
+            pdf.cell(col_width, row_height * spacing, report.dates[index], border=1, align="R")
 
             # Received coins, formatted to 8 decimals
-            received_coins = f"{float(row[2]):.8f}" if row[2] is not None else "0.00000000"
+            received_coins = f"{report.coins[index]:.8f}"
             pdf.cell(col_width, row_height * spacing, received_coins, border=1, align="R")
 
             # Former coin price, formatted to 8 decimals
-            former_coin_price = f"{float(row[3]):.8f}" if row[3] is not None else "0.00000000"
+            former_coin_price = f"{report.prices[index]:.8f}" if report.prices[index] is not None else "0.00000000"
             pdf.cell(col_width, row_height * spacing, former_coin_price, border=1, align="R")
 
             # Income in FIAT currency, formatted to 2 decimals
-            income = f"{float(row[4]):.2f}" if row[4] is not None else "0.00"
+            income = f"{report.incomes[index]:.2f}" if report.incomes[index] is not None else "0.00"
             pdf.cell(col_width, row_height * spacing, income, border=1, align="R")
             pdf.ln(row_height * spacing)
 
         # Add monthly total income
         pdf.ln(5)
         pdf.set_font("Arial", size=12, style='B')
-        pdf.cell(0, 10, f"Monthly received crypto currency: {monthly_coins[month]:.8f} {COIN_NAME}", ln=True, align="R")
-        pdf.cell(0, 10, f"Monthly price-adjusted income: {monthly_incomes[month]:.2f} {FIAT_CURRENCY}", ln=True, align="R")
+        pdf.cell(0, 10, f"Monthly received crypto currency: {month_income.coins:.8f} {COIN_NAME}", ln=True, align="R")
+        pdf.cell(0, 10, f"Monthly price-adjusted income: {month_income.income:.2f} {FIAT_CURRENCY}", ln=True, align="R")
         pdf.set_font("Arial", size=12)
 
     # Export the PDF
@@ -0,0 +1,111 @@
+# CHECKS API ACCESS BEFORE A RUN
+
+# System libraries
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import time
+import json
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+from utility.json_files import JsonFileCache
+from utility.http_client import PROVIDER_PARAMS, PROVIDER_HEADERS
+from utility.http_archive import http_archive
+
+# Internal config data
+from utility.settings import PREFLIGHT_CACHE_FILE, PREFLIGHT_TTL
+
+# Names of the probed APIs within terminal outputs
+PROVIDER_NAMES = {
+    'blockscout': 'Blockscout API',
+    'coinmarketcap': 'CoinMarketCap API',
+    'rpc': 'Execution node',
+}
+
+class PreflightCache(JsonFileCache):
+    """
+    Persistent cache of successful API probes.
+
+    - Probes are keyed by provider, URL, and a hash of their credentials,
+      so changed API keys are probed again and keys are never stored
+    - Results expire after PREFLIGHT_TTL seconds
+    - Failed probes are never cached
+    """
+
+    def __init__(self, path, ttl):
+        super().__init__(path)
+        self.ttl = ttl
+        self.probes = {}
+
+    def from_json(self, stored):
+        if isinstance(stored, dict):
+            self.probes = stored
+
+    def to_json(self):
+        return self.probes
+
+    def get_key(self, provider, url):
+        credentials = json.dumps([provider, url, PROVIDER_PARAMS[provider], PROVIDER_HEADERS[provider]], sort_keys=True)
+        return hashlib.sha256(credentials.encode()).hexdigest()
+
+    def get_age(self, provider, url):
+        """
+        :param provider (str): The API provider.
+        :param url (str): The probed URL.
+        :return (float or None): Seconds since the last successful probe, None if it is unknown or expired.
+        """
+        with self.lock:
+            self.load()
+            checked = self.probes.get(self.get_key(provider, url))
+            if checked is None or not 0 <= time.time() - checked < self.ttl:
+                return None
+            return time.time() - checked
+
+    def add(self, provider, url):
+        # Atomically stores a successful probe, dropping expired ones
+        with self.lock:
+            self.load()
+            now = time.time()
+            self.probes = {key: checked for key, checked in self.probes.items() if now - checked < self.ttl}
+            self.probes[self.get_key(provider, url)] = now
+            self.changed = True
+            self.save()
+
+def run_preflight(probes):
+    """
+    Runs all API probes concurrently and shows their results in the given order.
+
+    - Every probe is sent only once and waits for the timeout of its endpoint
+    - APIs that succeeded within the TTL are not probed again
+    - Replays do not call any API
+
+    :param probes (list): Tuples of provider, URL, and a probe function returning its success and message.
+    :return (bool): True if all APIs are reachable, False otherwise.
+    """
+    if http_archive.replaying:
+        for provider, url, probe in probes:
+            printLine(f"🟢 {PROVIDER_NAMES[provider]} is replayed from the archive.", True)
+        return True
+
+    ages = {(provider, url): preflight_cache.get_age(provider, url) for provider, url, probe in probes}
+    pending = [(provider, url, probe) for provider, url, probe in probes if ages[(provider, url)] is None]
+    results = {}
+    if pending:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {(provider, url): executor.submit(probe) for provider, url, probe in pending}
+            results = {key: future.result() for key, future in futures.items()}
+
+    reachable = True
+    for provider, url, probe in probes:
+        if (provider, url) not in results:
+            printLine(f"🟢 {PROVIDER_NAMES[provider]} was reachable {ages[(provider, url)]:.0f}s ago.", True)
+            continue
+        success, message = results[(provider, url)]
+        printLine(message, True)
+        if success:
+            preflight_cache.add(provider, url)
+        reachable = reachable and success
+    return reachable
+
+# Shared cache of all preflight checks
+preflight_cache = PreflightCache(PREFLIGHT_CACHE_FILE, PREFLIGHT_TTL)
@@ -1,34 +1,37 @@
 # CALCULATES DAILY INCOME DATA
 
+# External libraries
+import numpy as np
+
 # Internal library imports
-from utility.api_calls import get_coin_price
+from utility.api_calls import get_coin_prices
+from utility.price_store import price_store
+from utility.report_model import IncomeReport
 from utility.terminal_outputs import printLine
 
-def create_daily_data_with_prices(daily_deltas, price_lookup_file=None):
+# Internal config data
+from config import YEAR
+
+def create_income_report(daily_deltas, address_label, miner_count, withdrawal_count, year=YEAR, price_lookup_file=None, prices=None):
 
     """
-    Creates daily income data including prices.
+    Creates the income report of an address or portfolio including prices.
     
-    - Iterates over the daily deltas
-    - Fetches the coin price for each date
+    - Fetches the coin prices of all dates in date ranges
+    - Joins the daily deltas and prices in date order
     - Calculates and rounds the daily income
     
     :param daily_deltas (dict): A dictionary of dates and their coin deltas.
-    :return (list): A list containing date, income, coin deltas, and prices.
+    :param address_label (str): The address or portfolio name shown on the cover page.
+    :param miner_count (int): Number of times the validator was listed as miner
+    :param withdrawal_count (int): Number of times the validator was listed as withdrawal address
+    :param year (int, optional): The report year. Defaults to the configured year.
+    :param price_lookup_file (str, optional): A local CSV file with daily prices.
+    :param prices (dict, optional): Already fetched prices by 'YYYY-MM-DD' date.
+    :return (IncomeReport): The daily dates, coin deltas, prices, and income of the report.
     """
 
-    price_map = {}
-    if price_lookup_file:
-        import pandas as pd
-        df_prices = pd.read_csv(price_lookup_file)
-
-        # Normalize both column names and content
-        df_prices.columns = df_prices.columns.str.strip()  # Remove trailing spaces from header names
-        df_prices['Date'] = df_prices['Date'].astype(str).str.strip()  # Ensure all dates are strings with no whitespace
-
-        price_map = dict(zip(df_prices['Date'], df_prices['Former LYX Price']))
-
-    daily_data = []
+    price_map = dict(prices or {})
     printLine()
 
     # Normalize dates for string references
@@ -37,63 +40,77 @@ def create_daily_data_with_prices(daily_deltas, price_lookup_file=None):
     for date, value in daily_deltas.items()
     }
 
-    # Iterate through all dates with income
-    for date, delta_coin in sorted(daily_deltas.items()):
-        
-        # Retrieve the prices during this date
-        printLine(f"🧾 Calculating Income for {date}", True)
-        
-        # Get local price data
-        if price_lookup_file:
-            coin_price = price_map.get(date)
-        # Get API price data
-        else:
-            coin_price = get_coin_price(date)
-        
-        # If price could be fetched
-        if not coin_price is None:
-            income = delta_coin * coin_price
-            income = round(income, 2)
-            coin_price = round(coin_price, 10)
-        else:
-            income = None
-            coin_price = None
-
-        delta_coin = round(delta_coin, 10)
-
-        # Write new daily entry into the report list
-        daily_data.append([date, delta_coin, coin_price, income])
-
-    # Return report list
-    return daily_data
-
-def calculate_total_income(daily_data):
+    # Get local price data, imported into the price store on first use
+    if price_lookup_file:
+        price_map = price_store.get_file_prices(price_lookup_file, daily_deltas.keys())
+
+    # Get stored or API price data
+    elif prices is None:
+        price_map = get_coin_prices(daily_deltas.keys())
+        printLine()
+
+    printLine(f"🧾 Calculating Income for {len(daily_deltas)} days", True)
+    dates, coins, coin_prices, incomes = join_daily_prices(daily_deltas, price_map)
+    return IncomeReport(address_label, year, miner_count, withdrawal_count, dates, coins, coin_prices, incomes)
+
+def join_daily_prices(daily_deltas, price_map):
     """
-    Calculates the total income from the report list
-    and counts the days with missing income data.
-    
-    :param daily_data (list): A list containing daily income data.
-    :return (float, int): The total rounded FIAT income and days with missing income data.
+    Joins daily deltas and prices into sorted date columns
+    and calculates the daily income with array operations.
+
+    :param daily_deltas (dict): Coin deltas by 'YYYY-MM-DD' date.
+    :param price_map (dict): Coin prices by 'YYYY-MM-DD' date, None if unavailable.
+    :return (tuple): Columns of dates, coin deltas, prices, and income, sorted by date.
     """
-    total_income = 0.0
-    total_coins = 0.0
-    missing_data_count = 0
-
-    # Iterate through every day of the report
-    for row in daily_data:
-        coins = row[1]
-        income = row[3]
-
-        # Income calculation
-        if income is not None:
-            total_income += income
-        else:
-            missing_data_count += 1
-
-        total_coins += coins
-    
-    # Round the total income to 2 decimal places
-    total_income = round(total_income, 2)
+    if not daily_deltas:
+        return [], [], [], []
+
+    # Align the prices to the sorted dates with income, missing prices become NaN
+    dates = sorted(daily_deltas)
+    delta_coins = np.fromiter(map(daily_deltas.__getitem__, dates), dtype='float64', count=len(dates))
+    coin_prices = np.array(list(map(price_map.get, dates)), dtype='float64')
+
+    # Income is calculated from the unrounded delta and price
+    income = round_like_python(delta_coins * coin_prices, 2)
+    coin_prices = round_like_python(coin_prices, 10)
+    delta_coins = round_like_python(delta_coins, 10)
+
+    return dates, delta_coins.tolist(), nan_to_none(coin_prices), nan_to_none(income)
+
+def round_like_python(values, digits):
+    """
+    Rounds an array with the same results as the built-in round function.
 
-    # Return income and days with missing data
-    return total_income, total_coins, missing_data_count
\ No newline at end of file
+    - The array is scaled and rounded half to even with numpy
+    - Values whose scaled product lands next to a .5 tie may have been rounded
+      into the wrong direction, so only those are rounded by Python again
+
+    :param values (ndarray): The float values to round.
+    :param digits (int): Number of decimal places.
+    :return (ndarray): The rounded float values.
+    """
+    scale = 10.0 ** digits
+    scaled = values * scale
+    rounded = np.round(scaled) / scale
+
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) <= np.abs(scaled) * 1e-15
+    for index in np.flatnonzero(near_tie):
+        rounded[index] = round(float(values[index]), digits)
+    return rounded
+
+def nan_to_none(values):
+    # Converts an array into a list, replacing NaN values with None
+    objects = values.astype(object)
+    objects[np.isnan(values)] = None
+    return objects.tolist()
+
+def fetch_daily_prices(dates):
+    """
+    Fetches the coin price of every date once, so reports
+    of multiple addresses can share the same prices.
+
+    :param dates (iterable): Dates as date objects or 'YYYY-MM-DD' strings.
+    :return (dict): Median prices by 'YYYY-MM-DD' date, None if unavailable.
+    """
+    printLine()
+    return get_coin_prices(dates)
@@ -0,0 +1,215 @@
+# STORES DAILY PRICES
+
+# System libraries
+from datetime import datetime
+import threading
+import sqlite3
+import atexit
+import csv
+import os
+
+# Internal config data
+from config import COINMARKETCAP_CRYPTO_ID, COINMARKETCAP_FIAT_ID
+from utility.settings import PRICE_STORE_FILE
+
+# Price column of the local price lists
+PRICE_COLUMN = 'Former LYX Price'
+
+class PriceStore:
+    """
+    Embedded SQLite store of daily median prices.
+
+    Prices are indexed by crypto ID, fiat ID, and date, so every price is only
+    fetched once and lookups of single days or date ranges are index hits.
+    Local price lists are kept by file path, imported once and re-imported when the file changes.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = None
+        self.lock = threading.Lock()
+
+    def connect(self):
+        # Opens the database once, creating its tables if they are missing
+        if self.connection is not None:
+            return self.connection
+        if self.path != ':memory:':
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS prices (
+                crypto_id TEXT NOT NULL,
+                fiat_id TEXT NOT NULL,
+                date TEXT NOT NULL,
+                price REAL NOT NULL,
+                PRIMARY KEY (crypto_id, fiat_id, date)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS file_prices (
+                path TEXT NOT NULL,
+                date TEXT NOT NULL,
+                price REAL NOT NULL,
+                PRIMARY KEY (path, date)
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS price_files (
+                path TEXT PRIMARY KEY,
+                modified REAL NOT NULL
+            );
+        """)
+        return self.connection
+
+    def upsert(self, prices, crypto_id=COINMARKETCAP_CRYPTO_ID, fiat_id=COINMARKETCAP_FIAT_ID):
+        """
+        Inserts or replaces the prices of many days within a single transaction.
+
+        :param prices (dict): Prices by 'YYYY-MM-DD' date, days without price are skipped.
+        :param crypto_id (str, optional): The CoinMarketCap crypto ID. Defaults to the configured ID.
+        :param fiat_id (str, optional): The CoinMarketCap fiat ID. Defaults to the configured ID.
+        :return (int): Number of stored prices.
+        """
+        rows = [(str(crypto_id), str(fiat_id), date, price) for date, price in prices.items() if price is not None]
+        with self.lock:
+            connection = self.connect()
+            with connection:
+                connection.executemany("""
+                    INSERT INTO prices (crypto_id, fiat_id, date, price) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (crypto_id, fiat_id, date) DO UPDATE SET price = excluded.price
+                """, rows)
+        return len(rows)
+
+    def get_many(self, dates, crypto_id=COINMARKETCAP_CRYPTO_ID, fiat_id=COINMARKETCAP_FIAT_ID):
+        """
+        Looks up the prices of many days.
+
+        :param dates (iterable): Dates as 'YYYY-MM-DD' strings.
+        :param crypto_id (str, optional): The CoinMarketCap crypto ID. Defaults to the configured ID.
+        :param fiat_id (str, optional): The CoinMarketCap fiat ID. Defaults to the configured ID.
+        :return (dict): Prices by 'YYYY-MM-DD' date, only containing stored days.
+        """
+        dates = sorted(set(dates))
+        if not dates:
+            return {}
+        prices = self.get_range(dates[0], dates[-1], crypto_id, fiat_id)
+        return {date: prices[date] for date in dates if date in prices}
+
+    def get_range(self, start_date, end_date, crypto_id=COINMARKETCAP_CRYPTO_ID, fiat_id=COINMARKETCAP_FIAT_ID):
+        """
+        Returns all stored prices of a date range.
+
+        :param start_date (str): The first 'YYYY-MM-DD' date of the range.
+        :param end_date (str): The last 'YYYY-MM-DD' date of the range.
+        :param crypto_id (str, optional): The CoinMarketCap crypto ID. Defaults to the configured ID.
+        :param fiat_id (str, optional): The CoinMarketCap fiat ID. Defaults to the configured ID.
+        :return (dict): Prices by 'YYYY-MM-DD' date in date order.
+        """
+        with self.lock:
+            rows = self.connect().execute("""
+                SELECT date, price FROM prices
+                WHERE crypto_id = ? AND fiat_id = ? AND date BETWEEN ? AND ?
+                ORDER BY date
+            """, (str(crypto_id), str(fiat_id), start_date, end_date)).fetchall()
+        return dict(rows)
+
+    def import_csv(self, path, crypto_id=COINMARKETCAP_CRYPTO_ID, fiat_id=COINMARKETCAP_FIAT_ID):
+        """
+        Imports a local price list with Date and price columns.
+
+        :param path (str): The CSV file to import.
+        :param crypto_id (str, optional): The CoinMarketCap crypto ID. Defaults to the configured ID.
+        :param fiat_id (str, optional): The CoinMarketCap fiat ID. Defaults to the configured ID.
+        :return (int): Number of imported prices.
+        """
+        return self.upsert(read_price_csv(path), crypto_id, fiat_id)
+
+    def export_csv(self, path, start_date, end_date, crypto_id=COINMARKETCAP_CRYPTO_ID, fiat_id=COINMARKETCAP_FIAT_ID):
+        """
+        Exports the prices of a date range into a local price list.
+
+        :param path (str): The CSV file to write.
+        :param start_date (str): The first 'YYYY-MM-DD' date of the range.
+        :param end_date (str): The last 'YYYY-MM-DD' date of the range.
+        :param crypto_id (str, optional): The CoinMarketCap crypto ID. Defaults to the configured ID.
+        :param fiat_id (str, optional): The CoinMarketCap fiat ID. Defaults to the configured ID.
+        :return (int): Number of exported prices.
+        """
+        prices = self.get_range(start_date, end_date, crypto_id, fiat_id)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f, lineterminator='\n')
+            writer.writerow(['Date', PRICE_COLUMN])
+            for date, price in prices.items():
+                writer.writerow([date, f"{price:.10f}"])
+        return len(prices)
+
+    def get_file_prices(self, path, dates):
+        """
+        Looks up the prices of many days within a local price list.
+        The list is imported into its own table on first use and whenever the file changes,
+        as its prices belong to a file instead of a crypto and fiat ID.
+
+        :param path (str): The CSV file of the price list.
+        :param dates (iterable): Dates as 'YYYY-MM-DD' strings.
+        :return (dict): Prices by 'YYYY-MM-DD' date, only containing listed days.
+        """
+        path = os.path.abspath(path)
+        modified = os.path.getmtime(path)
+        with self.lock:
+            row = self.connect().execute("SELECT modified FROM price_files WHERE path = ?", (path,)).fetchone()
+
+        # Replace all prices of the file within a single transaction
+        if row is None or row[0] != modified:
+            rows = [(path, date, price) for date, price in read_price_csv(path).items()]
+            with self.lock:
+                connection = self.connect()
+                with connection:
+                    connection.execute("DELETE FROM file_prices WHERE path = ?", (path,))
+                    connection.executemany("INSERT INTO file_prices (path, date, price) VALUES (?, ?, ?)", rows)
+                    connection.execute("INSERT OR REPLACE INTO price_files (path, modified) VALUES (?, ?)", (path, modified))
+
+        dates = sorted(set(dates))
+        if not dates:
+            return {}
+        with self.lock:
+            rows = self.connect().execute("""
+                SELECT date, price FROM file_prices
+                WHERE path = ? AND date BETWEEN ? AND ?
+            """, (path, dates[0], dates[-1])).fetchall()
+        prices = dict(rows)
+        return {date: prices[date] for date in dates if date in prices}
+
+    def close(self):
+        # Closes the database when the program exits
+        with self.lock:
+            if self.connection is not None:
+                self.connection.close()
+                self.connection = None
+
+def read_price_csv(path):
+    """
+    Reads a local price list into a dictionary.
+
+    :param path (str): The CSV file with a Date column and a price column.
+    :return (dict): Prices by 'YYYY-MM-DD' date.
+    """
+    prices = {}
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        header = [name.strip() for name in next(reader, [])]
+        if 'Date' not in header:
+            raise ValueError(f"CSV must contain a 'Date' column. Found: {header}")
+
+        # Use the default price column or the first column after the date
+        date_index = header.index('Date')
+        price_index = header.index(PRICE_COLUMN) if PRICE_COLUMN in header else date_index + 1
+
+        for row in reader:
+            try:
+                date = datetime.strptime(row[date_index].strip(), '%Y-%m-%d').strftime('%Y-%m-%d')
+                prices[date] = float(row[price_index])
+            except (IndexError, ValueError):
+                continue
+    return prices
+
+# Shared store for all price lookups, kept in memory if no file is configured
+price_store = PriceStore(PRICE_STORE_FILE or ':memory:')
+atexit.register(price_store.close)
@@ -0,0 +1,134 @@
+# PROFILES REPORT PHASES
+
+# System libraries
+from contextlib import contextmanager
+from collections import Counter
+import threading
+import cProfile
+import time
+import sys
+import os
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+
+"""
+Sampling of the collapsed stacks.
+
+- SAMPLE_INTERVAL: seconds between two samples of all threads
+- COLLAPSED_FILE: name of the collapsed stack file, e.g. for flamegraph.pl or speedscope
+"""
+SAMPLE_INTERVAL = 0.005 # seconds
+COLLAPSED_FILE = 'stacks.collapsed'
+
+class PhaseProfiler:
+    """
+    Profiles the phases of a report run.
+
+    - Every phase has its own deterministic profile of the main thread, written as pstats file
+    - A sampling thread records the stacks of all threads, including verify workers
+      and sleeping calls, and writes them as collapsed stacks below their phase
+    - Wall and CPU time are measured for every phase, CPU time includes all threads
+    - Repeated phases, e.g. the pricing of several reports, add up
+    """
+
+    def __init__(self):
+        self.folder = None
+        self.profiles = {}
+        self.times = {}
+        self.stacks = Counter()
+        self.current_phase = None
+        self.sampler = None
+        self.stopped = threading.Event()
+
+    @property
+    def enabled(self):
+        return self.folder is not None
+
+    def start(self, folder):
+        """
+        Starts profiling all following phases.
+
+        :param folder (str): The folder for the profile files.
+        """
+        os.makedirs(folder, exist_ok=True)
+        self.folder = folder
+        self.stopped.clear()
+        self.sampler = threading.Thread(target=self.sample, name='profile-sampler', daemon=True)
+        self.sampler.start()
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Profiles the code within the context as a phase, does nothing if profiling is disabled.
+
+        :param name (str): The name of the phase.
+        """
+        if not self.enabled:
+            yield
+            return
+
+        profile = self.profiles.setdefault(name, cProfile.Profile())
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        self.current_phase = name
+        profile.enable()
+        try:
+            yield
+        finally:
+            profile.disable()
+            self.current_phase = None
+            wall_time, cpu_time = self.times.get(name, (0.0, 0.0))
+            self.times[name] = (wall_time + time.perf_counter() - wall_start, cpu_time + time.process_time() - cpu_start)
+
+    def sample(self):
+        # Records the stacks of all threads while a phase is running
+        own_thread = threading.get_ident()
+        while not self.stopped.wait(SAMPLE_INTERVAL):
+            phase = self.current_phase
+            if phase is None:
+                continue
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[';'.join([phase, names.get(thread_id, str(thread_id))] + stack[::-1])] += 1
+
+    def finish(self):
+        """
+        Stops profiling and writes a pstats file per phase and the collapsed stacks of all phases.
+        Does nothing if profiling was not started or is already finished.
+
+        :return (dict): Phases mapped to their wall and CPU time in seconds.
+        """
+        if not self.enabled or self.stopped.is_set():
+            return {}
+        self.stopped.set()
+        self.sampler.join()
+
+        for name, profile in self.profiles.items():
+            profile.dump_stats(os.path.join(self.folder, f"{name}.pstats"))
+        with open(os.path.join(self.folder, COLLAPSED_FILE), 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.stacks.items()):
+                f.write(f"{stack.replace(' ', '_')} {count}\n")
+        return dict(self.times)
+
+    def print_summary(self):
+        # Shows the wall and CPU time of every phase within the terminal box
+        times = self.finish()
+        printLine(f"⌛ Profiles have been written to {self.folder}", True)
+        printLine()
+        printLine(f"{'Phase':<20}{'Wall s':>10}{'CPU s':>10}{'CPU share':>12}")
+        for name, (wall_time, cpu_time) in times.items():
+            share = cpu_time / wall_time * 100 if wall_time > 0 else 0.0
+            printLine(f"{name:<20}{wall_time:>10.2f}{cpu_time:>10.2f}{share:>11.0f}%")
+        printLine()
+        printLine("Low CPU shares are spent waiting for the network or rate limits.")
+
+# Shared profiler of all phases, disabled unless started
+profiler = PhaseProfiler()
@@ -0,0 +1,121 @@
+# LIMITS API CALL RATES
+
+# System libraries
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import threading
+import time
+
+# Internal config data
+from utility.settings import BLOCKSCOUT_CALLS_PER_MINUTE, COINMARKETCAP_CALLS_PER_MINUTE, RPC_CALLS_PER_MINUTE
+
+"""
+Adaptive behavior of all rate limiters.
+
+- BURST_CALLS: calls that can be sent at once after an idle period
+- MIN_RATE_FACTOR: lowest share of the configured rate after repeated throttling
+- RECOVERY_STEP: share of the configured rate regained after every successful call
+- DEFAULT_RETRY_AFTER: pause after a throttled call without Retry-After header, in seconds
+"""
+BURST_CALLS = 1 # calls
+MIN_RATE_FACTOR = 0.1 # share
+RECOVERY_STEP = 0.05 # share
+DEFAULT_RETRY_AFTER = 5 # seconds
+
+class TokenBucket:
+    """
+    Token bucket limiting the call rate of one API provider.
+
+    - Every call is charged when it starts, so the duration of
+      the request itself already counts towards the waiting time
+    - Concurrent callers queue up behind each other by borrowing tokens
+    - Throttled calls halve the rate and pause all calls until Retry-After
+    - Successful calls ramp the rate back up to the configured maximum
+    """
+
+    def __init__(self, calls_per_minute, burst=BURST_CALLS):
+        self.max_rate = calls_per_minute / 60
+        self.rate = self.max_rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def refill(self, now):
+        # Adds the tokens earned since the last update, up to the bucket capacity
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self):
+        """
+        Charges one call and returns how long the caller has to wait before sending it.
+
+        :return (float): The waiting time in seconds.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            self.tokens -= 1
+
+            # Wait until the borrowed token has been earned and the server allows calls again
+            wait = max(-self.tokens / self.rate, self.blocked_until - now, 0.0)
+            self.waited += wait
+            return wait
+
+    def acquire(self):
+        # Blocks until the next call may be sent and returns the slept time
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def throttle(self, retry_after=None):
+        """
+        Slows down after the server rejected a call due to its rate limit.
+
+        :param retry_after (float, optional): Seconds the server asked to wait.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.refill(now)
+            self.rate = max(self.rate / 2, self.max_rate * MIN_RATE_FACTOR)
+            pause = retry_after if retry_after is not None else DEFAULT_RETRY_AFTER
+            self.blocked_until = max(self.blocked_until, now + pause)
+
+    def recover(self):
+        # Ramps the rate back up after a successful call
+        with self.lock:
+            if self.rate < self.max_rate:
+                now = time.monotonic()
+                self.refill(now)
+                self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+
+def parse_retry_after(value):
+    """
+    Parses a Retry-After header given in seconds or as HTTP date.
+
+    :param value (str or None): The header value.
+    :return (float or None): Seconds to wait, None if missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_date.tzinfo is None:
+        retry_date = retry_date.replace(tzinfo=timezone.utc)
+    return max((retry_date - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+# Shared rate limiters of every provider
+limiters = {
+    'blockscout': TokenBucket(BLOCKSCOUT_CALLS_PER_MINUTE),
+    'coinmarketcap': TokenBucket(COINMARKETCAP_CALLS_PER_MINUTE),
+    'rpc': TokenBucket(RPC_CALLS_PER_MINUTE),
+}
@@ -0,0 +1,144 @@
+# HOLDS REPORT DATA
+
+# System libraries
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import List, Optional
+import csv
+
+# Internal config data
+from config import YEAR, ETH1_ADDRESS, COIN_NAME, FIAT_CURRENCY
+
+def get_report_headers():
+    # Column names of the CSV report and the daily PDF tables
+    return ['Date', 'Received ' + COIN_NAME, 'Former ' + COIN_NAME + ' Price', 'Income in ' + FIAT_CURRENCY]
+
+@dataclass
+class MonthlyIncome:
+    """
+    Daily rows and sums of a month with income.
+    Missing prices count as zero income.
+    """
+    month: int
+    start: int
+    end: int
+    coins: float
+    income: float
+
+@dataclass
+class IncomeReport:
+    """
+    Daily income of an address or portfolio within a report year.
+
+    The pricing stage creates the report once. The CSV writer, the
+    terminal summary, and the PDF builder all read from the same columns.
+
+    - Dates are sorted 'YYYY-MM-DD' strings
+    - Prices and income are None on days without price data
+    """
+    address_label: str
+    year: int
+    miner_count: int
+    withdrawal_count: int
+    dates: List[str]
+    coins: List[float]
+    prices: List[Optional[float]]
+    incomes: List[Optional[float]]
+    headers: List[str] = field(default_factory=get_report_headers)
+
+    @classmethod
+    def from_csv(cls, csv_file, miner_count=0, withdrawal_count=0, address_label=ETH1_ADDRESS, year=YEAR):
+        """
+        Loads a report from an exported CSV file.
+
+        :param csv_file (str): The path to the CSV file containing daily income data.
+        :param miner_count (int, optional): Number of times the validator was listed as miner
+        :param withdrawal_count (int, optional): Number of times the validator was listed as withdrawal address
+        :param address_label (str, optional): The address or portfolio name shown on the cover page.
+        :param year (int, optional): The report year. Defaults to the configured year.
+        :return (IncomeReport): The loaded report.
+        """
+        def to_float(value):
+            # Empty fields and 'None' strings mark missing price data
+            value = value.strip()
+            return None if value in ('', 'None', 'nan') else float(value)
+
+        with open(csv_file, 'r', newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            headers = [name.strip() for name in next(reader)]
+            rows = sorted((row for row in reader if row), key=lambda row: row[0].strip())
+
+        return cls(
+            address_label=address_label,
+            year=year,
+            miner_count=miner_count,
+            withdrawal_count=withdrawal_count,
+            dates=[row[0].strip()[:10] for row in rows],
+            coins=[to_float(row[1]) or 0.0 for row in rows],
+            prices=[to_float(row[2]) for row in rows],
+            incomes=[to_float(row[3]) for row in rows],
+            headers=headers,
+        )
+
+    def rows(self):
+        """
+        :return (iterator): Rows of date, coin deltas, prices, and income.
+        """
+        return zip(self.dates, self.coins, self.prices, self.incomes)
+
+    @cached_property
+    def months(self):
+        """
+        Groups the daily rows into months, summing them in date order.
+
+        :return (list): The months with income as MonthlyIncome objects.
+        """
+        months = []
+        start = 0
+        while start < len(self.dates):
+            month = int(self.dates[start][5:7])
+            end = start
+            coins = 0.0
+            income = 0.0
+            while end < len(self.dates) and int(self.dates[end][5:7]) == month:
+                coins += self.coins[end]
+                income += self.incomes[end] if self.incomes[end] is not None else 0.0
+                end += 1
+            months.append(MonthlyIncome(month, start, end, coins, income))
+            start = end
+        return months
+
+    @cached_property
+    def summary(self):
+        """
+        :return (tuple): The total rounded FIAT income, total received coins, and days with missing income data.
+        """
+        return calculate_total_income(self.coins, self.incomes)
+
+def calculate_total_income(coins, incomes):
+    """
+    Calculates the total income from the report columns
+    and counts the days with missing income data.
+
+    :param coins (list): The daily coin deltas in date order.
+    :param incomes (list): The daily income in date order, None if unavailable.
+    :return (float, float, int): The total rounded FIAT income, total received coins, and days with missing income data.
+    """
+    if not coins:
+        return 0.0, 0.0, 0
+
+    # Only report runs need numpy, PDF exports of CSV files skip its import
+    import numpy as np
+
+    # Missing income becomes NaN
+    coins = np.array(coins, dtype='float64')
+    incomes = np.array(incomes, dtype='float64')
+    has_income = ~np.isnan(incomes)
+
+    # Cumulative sums add values in date order, matching a loop over the rows
+    total_income = round(float(np.cumsum(incomes[has_income])[-1]), 2) if has_income.any() else 0.0
+    total_coins = float(np.cumsum(coins)[-1])
+    missing_data_count = int(np.count_nonzero(~has_income))
+
+    # Return income and days with missing data
+    return total_income, total_coins, missing_data_count
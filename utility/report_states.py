@@ -0,0 +1,100 @@
+# STORES REPORT STATES FOR INCREMENTAL UPDATES
+
+# System libraries
+from datetime import datetime, timezone
+import os
+
+# Internal library imports
+from utility.json_files import load_json, write_json_atomic
+
+# Internal config data
+from utility.settings import REPORT_STATE_FOLDER
+
+def get_report_state_path(address, year):
+    """
+    Returns the state file of an address and report year.
+
+    :param address (str): The ETH1 address of the report.
+    :param year (int): The report year.
+    :return (str or None): The path of the state file, None if incremental updates are disabled.
+    """
+    if not REPORT_STATE_FOLDER:
+        return None
+    return os.path.join(REPORT_STATE_FOLDER, f"report_{year}_{address.lower()}.json")
+
+def load_report_state(address, year):
+    """
+    Loads the state of the last report update.
+
+    :param address (str): The ETH1 address of the report.
+    :param year (int): The report year.
+    :return (dict or None): The newest processed block, daily deltas, counts, prices, and if the year is final, None if unknown.
+    """
+    state = load_json(get_report_state_path(address, year))
+    if state is None:
+        return None
+
+    try:
+        state['daily_deltas'] = {
+            datetime.strptime(date, '%Y-%m-%d').date(): delta
+            for date, delta in state['daily_deltas'].items()
+        }
+        return state
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def save_report_state(address, year, history, prices=None):
+    """
+    Atomically writes the state of a report update to disk.
+
+    :param address (str): The ETH1 address of the report.
+    :param year (int): The report year.
+    :param history (tuple): Daily deltas, miner count, withdrawal count, and newest processed block.
+    :param prices (dict, optional): Known prices by 'YYYY-MM-DD' date, only days with income are kept.
+    """
+    path = get_report_state_path(address, year)
+    daily_deltas, miner_count, withdrawal_count, newest_block = history
+    if path is None or newest_block is None:
+        return
+
+    # Only keep prices that were found, so missing prices are fetched again
+    # Years that ended before the update can not get new blocks
+    date_strings = [date.strftime('%Y-%m-%d') for date in daily_deltas]
+    state = {
+        'newest_block': newest_block,
+        'daily_deltas': {date: delta for date, delta in zip(date_strings, daily_deltas.values())},
+        'miner_count': miner_count,
+        'withdrawal_count': withdrawal_count,
+        'prices': {date: prices[date] for date in date_strings if (prices or {}).get(date) is not None},
+        'final': year < datetime.now(timezone.utc).year,
+    }
+
+    write_json_atomic(path, state)
+
+def is_final_state(state):
+    """
+    :param state (dict or None): The state of the last update.
+    :return (bool): True if the year had ended before the last update, so it has no new blocks.
+    """
+    return state is not None and state.get('final', False)
+
+def merge_report_state(state, history):
+    """
+    Adds the income metrics of new blocks to the state of the last update.
+
+    :param state (dict or None): The state of the last update.
+    :param history (tuple): Daily deltas, miner count, withdrawal count, and newest block of the new blocks.
+    :return (tuple): Daily deltas, miner count, withdrawal count, and newest block of the whole year.
+    """
+    if state is None:
+        return history
+
+    daily_deltas, miner_count, withdrawal_count, newest_block = history
+    merged_deltas = dict(state['daily_deltas'])
+    for date, delta_coin in daily_deltas.items():
+        merged_deltas[date] = merged_deltas.get(date, 0) + delta_coin
+
+    return (merged_deltas,
+            state['miner_count'] + miner_count,
+            state['withdrawal_count'] + withdrawal_count,
+            newest_block)
@@ -0,0 +1,220 @@
+# FETCHES BLOCK DATA FROM AN EXECUTION NODE
+
+# External libraries
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+from utility.block_index import rpc_block_index
+from utility.http_client import fetch_json
+from utility.history_scan import BalanceHistoryScan
+from utility.api_calls import find_first_block_at
+from utility.decoders import decode_rpc_block
+
+# Internal config data
+from config import ETH1_ADDRESS, YEAR
+from utility.settings import RPC_URL, RPC_BATCH_SIZE, RPC_WORKERS
+
+def call_batch(endpoint, calls, description='RPC data'):
+    """
+    Sends multiple JSON-RPC calls within a single batch request.
+
+    :param endpoint (str): The name of the endpoint.
+    :param calls (list): Tuples of method name and parameters.
+    :param description (str, optional): Describes the data within terminal outputs.
+    :return (list or None): The results in the order of the calls, None if any call failed.
+    """
+    payload = [
+        {'jsonrpc': '2.0', 'id': call_id, 'method': method, 'params': params}
+        for call_id, (method, params) in enumerate(calls)
+    ]
+    data = fetch_json(endpoint, RPC_URL, description=description, payload=payload)
+    if data is None:
+        return None
+
+    # Batch responses can be in any order, and failed calls have an error instead of a result
+    try:
+        responses = {response['id']: response for response in data}
+        return [responses[call_id]['result'] for call_id in range(len(calls))]
+    except (TypeError, KeyError) as e:
+        printLine(f"🔴 Error fetching {description}.", True)
+        return None
+
+def get_latest_block():
+    """
+    Fetches the latest block from the execution node.
+
+    :return (int or None): The height of the latest block, None if an error occurs.
+    :return (int or None): The unix timestamp of the latest block, None if an error occurs.
+    """
+    results = call_batch('rpc_blocks', [('eth_getBlockByNumber', ['latest', False])], 'latest block')
+
+    try:
+        return int(results[0]['number'], 16), int(results[0]['timestamp'], 16)
+    except (TypeError, KeyError, ValueError) as e:
+        return None, None
+
+def get_block_timestamp(block_number):
+    """
+    Fetches the timestamp of a block from the execution node and stores it within the block index of the node.
+
+    :param block_number (int): The block number to fetch the timestamp for.
+    :return (int or None): The unix timestamp of the block, None if an error occurs.
+    """
+    results = call_batch('rpc_blocks', [('eth_getBlockByNumber', [hex(block_number), False])], f'block {block_number}')
+
+    try:
+        timestamp = int(results[0]['timestamp'], 16)
+    except (TypeError, KeyError, ValueError) as e:
+        return None
+
+    rpc_block_index.add(block_number, timestamp)
+    return timestamp
+
+def get_block_payments(first_block, last_block, address):
+    """
+    Fetches a range of blocks within a single batch and extracts the payments of an address.
+
+    :param first_block (int): The first block of the range.
+    :param last_block (int): The last block of the range.
+    :param address (str): The lowercase ETH1 address.
+    :return (list or None): Decoded blocks with a withdrawal or fee recipient of the address, None if an error occurs.
+    """
+    calls = [('eth_getBlockByNumber', [hex(block_number), False]) for block_number in range(first_block, last_block + 1)]
+    blocks = call_batch('rpc_blocks', calls, f'blocks {first_block} to {last_block}')
+    if blocks is None:
+        return None
+
+    try:
+        decoded_blocks = [decode_rpc_block(block, address) for block in blocks]
+    except (TypeError, KeyError, ValueError) as e:
+        printLine(f"🔴 Error decoding blocks {first_block} to {last_block}.", True)
+        return None
+    return [decoded_block for decoded_block in decoded_blocks if decoded_block[2] or decoded_block[3]]
+
+def get_priority_fees(blocks):
+    """
+    Fetches the receipts of blocks in batches and sums the priority fees paid to their fee recipient.
+
+    :param blocks (list): Tuples of block number and base fee in wei.
+    :return (dict or None): Block numbers mapped to their priority fees in wei, None if an error occurs.
+    """
+    fees = {}
+    for start in range(0, len(blocks), RPC_BATCH_SIZE):
+        batch = blocks[start:start + RPC_BATCH_SIZE]
+        calls = [('eth_getBlockReceipts', [hex(block_number)]) for block_number, base_fee in batch]
+        receipts = call_batch('rpc_receipts', calls, 'block receipts')
+        if receipts is None:
+            return None
+
+        for (block_number, base_fee), block_receipts in zip(batch, receipts):
+            fees[block_number] = sum(
+                int(receipt['gasUsed'], 16) * (int(receipt['effectiveGasPrice'], 16) - base_fee)
+                for receipt in block_receipts
+            )
+    return fees
+
+def find_year_start(year):
+    """
+    :param year (int): The year to search for.
+    :return (int or None): The first block of the year, None if the year has not started yet or an error occurs.
+    """
+    year_start = int(datetime(year, 1, 1, tzinfo=timezone.utc).timestamp())
+    return find_first_block_at(year_start, get_latest_block, get_block_timestamp, rpc_block_index)
+
+def scan_blocks(address=ETH1_ADDRESS, first_year=YEAR, last_year=None, known_blocks=None):
+    """
+    Uses JSON-RPC batch requests of an execution node to scan every block
+    of the report years for payments to an address.
+
+    - Blocks are fetched in batches of RPC_BATCH_SIZE, with RPC_WORKERS batches at once
+    - Withdrawals are read from the withdrawal list of every block
+    - Miner rewards are the priority fees of blocks with the address as fee recipient
+    - Payments are added from the newest to the oldest block, like within the balance history
+    - Blocks of an earlier update are skipped, if they are given
+    - Scans can not be resumed and do not add to the event store, as other balance events are not seen
+
+    :param address (str, optional): The ETH1 address to scan. Defaults to the configured address.
+    :param first_year (int, optional): The first report year. Defaults to the configured year.
+    :param last_year (int, optional): The last report year. Defaults to the first year.
+    :param known_blocks (dict, optional): Newest blocks per year of an earlier update.
+    :return (BalanceHistoryScan): The scan with its income metrics, finished if all blocks were fetched.
+    """
+    last_year = last_year or first_year
+    scan = BalanceHistoryScan(address, first_year, None, last_year, known_blocks)
+    address = address.lower()
+
+    # Find the last block of every report year
+    printLine(f"🔎 Seeking the blocks of {first_year} to {last_year} on the execution node", True)
+    first_block = find_year_start(first_year)
+    latest_block, latest_timestamp = get_latest_block()
+    if first_block is None or latest_block is None:
+        printLine("❌ Report incomplete. Please retry.", True)
+        return scan
+
+    # Only the current year ends at the latest block, a past year without end failed to be found
+    year_ends = {}
+    for report_year in range(first_year, last_year + 1):
+        next_year_start = find_year_start(report_year + 1)
+        if next_year_start is not None:
+            year_ends[report_year] = next_year_start - 1
+        elif report_year >= datetime.now(timezone.utc).year:
+            year_ends[report_year] = latest_block
+        else:
+            printLine(f"❌ End of {report_year} not found. Report incomplete. Please retry.", True)
+            return scan
+    last_block = year_ends[last_year]
+
+    # Skip the blocks of an earlier update
+    if scan.stop_block is not None:
+        first_block = max(first_block, scan.stop_block + 1)
+    printLine(f"🟢 Scanning blocks {first_block} to {last_block}", True)
+
+    # Fetch all block ranges in parallel, keeping their order
+    ranges = [(start, min(start + RPC_BATCH_SIZE - 1, last_block)) for start in range(first_block, last_block + 1, RPC_BATCH_SIZE)]
+    payments = []
+    completed = True
+    with ThreadPoolExecutor(max_workers=RPC_WORKERS) as executor:
+        batches = executor.map(lambda block_range: get_block_payments(*block_range, address), ranges)
+        for (start, end), block_payments in zip(ranges, batches):
+            if block_payments is None:
+                completed = False
+                executor.shutdown(wait=False, cancel_futures=True)
+                break
+            printLine(f"⚪️ Fetching blocks, Block: {end}, Remaining: {last_block - end}")
+            payments.extend(block_payments)
+
+    # Fetch the priority fees of all blocks with the address as fee recipient, once all blocks were fetched
+    fees = None
+    if completed:
+        fees = get_priority_fees([(block_number, base_fee) for block_number, timestamp, withdrawn, is_miner, base_fee in payments if is_miner])
+    if fees is None:
+        printLine("❌ Report incomplete. Please retry.", True)
+        return scan
+
+    for block_number, timestamp, withdrawn, is_miner, base_fee in sorted(payments, reverse=True):
+        transaction_date = datetime.fromtimestamp(timestamp, timezone.utc).date()
+        delta = withdrawn + fees.get(block_number, 0)
+
+        # Only positive deltas of new blocks are income, like within the balance history
+        if delta <= 0 or block_number <= scan.known_blocks.get(transaction_date.year, 0):
+            continue
+        scan.add_verified_block(block_number, transaction_date, delta, withdrawn > 0, address if is_miner else None)
+
+    scan.newest_blocks = year_ends
+    scan.finished = True
+    return scan
+
+def get_coin_balance_history_by_year_rpc(first_year, last_year, address=ETH1_ADDRESS, known_blocks=None):
+    """
+    Uses JSON-RPC batch requests of an execution node to fetch the income metrics of multiple years.
+    Returns the same data as get_coin_balance_history_by_year.
+
+    :param first_year (int): The first report year.
+    :param last_year (int): The last report year.
+    :param address (str, optional): The ETH1 address to scan. Defaults to the configured address.
+    :param known_blocks (dict, optional): Newest blocks per year of an earlier update, only newer blocks are scanned.
+    :return (dict): Years mapped to their daily deltas, miner count, withdrawal count, and newest block.
+    """
+    return scan_blocks(address, first_year, last_year, known_blocks).result_by_year()
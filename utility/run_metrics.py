@@ -0,0 +1,212 @@
+# MEASURES API CALLS OF A RUN
+
+# System libraries
+import threading
+import json
+import time
+
+# Internal library imports
+from utility.terminal_outputs import printLine
+from utility.json_files import atomic_write
+
+"""
+Upper bounds of the request latency histogram, in seconds.
+The last bucket counts all slower requests.
+"""
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10) # seconds
+METRIC_PREFIX = 'income_reporter'
+
+class EndpointMetrics:
+    # Request counts, status codes, retries, and latency histogram of an endpoint
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.statuses = {}
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'statuses': dict(sorted(self.statuses.items())),
+            'latency_sum': round(self.latency_sum, 6),
+            'latency_max': round(self.latency_max, 6),
+            'latency_buckets': dict(zip([str(bound) for bound in LATENCY_BUCKETS] + ['+Inf'], self.buckets)),
+        }
+
+class RunMetrics:
+    """
+    Collects the API metrics of a run from both HTTP clients.
+
+    - Every request is counted by endpoint and HTTP status, network errors as 'error'
+    - Latencies are sorted into histogram buckets
+    - Sleeps of the rate limiters and retry backoffs are summed by provider,
+      so concurrent calls can add up to more than the wall time
+    - History pages are counted with the number of their items
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        # Resets all metrics at the start of a run
+        with self.lock:
+            self.endpoints = {}
+            self.sleeps = {}
+            self.pages = 0
+            self.items = 0
+            self.started = time.perf_counter()
+            self.finished = None
+
+    def finish(self):
+        self.finished = time.perf_counter()
+
+    @property
+    def wall_time(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def add_request(self, endpoint, status, latency):
+        """
+        Counts a sent request.
+
+        :param endpoint (str): The name of the endpoint.
+        :param status (int or str): The HTTP status code, 'error' for network errors.
+        :param latency (float): Seconds until the response or error.
+        """
+        with self.lock:
+            metrics = self.endpoints.setdefault(endpoint, EndpointMetrics())
+            metrics.requests += 1
+            metrics.statuses[str(status)] = metrics.statuses.get(str(status), 0) + 1
+            metrics.latency_sum += latency
+            metrics.latency_max = max(metrics.latency_max, latency)
+            bucket = next((index for index, bound in enumerate(LATENCY_BUCKETS) if latency <= bound), len(LATENCY_BUCKETS))
+            metrics.buckets[bucket] += 1
+
+    def add_retry(self, endpoint):
+        # Counts a request that is repeated after a rate limit or network error
+        with self.lock:
+            self.endpoints.setdefault(endpoint, EndpointMetrics()).retries += 1
+
+    def add_sleep(self, provider, reason, seconds):
+        """
+        :param provider (str): The API provider.
+        :param reason (str): 'rate_limit' or 'backoff'.
+        :param seconds (float): The slept time.
+        """
+        if seconds <= 0:
+            return
+        with self.lock:
+            key = (provider, reason)
+            self.sleeps[key] = self.sleeps.get(key, 0.0) + seconds
+
+    def add_page(self, items):
+        # Counts a balance history page with its number of items
+        with self.lock:
+            self.pages += 1
+            self.items += items
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                'wall_time': round(self.wall_time, 6),
+                'request_time': round(sum(metrics.latency_sum for metrics in self.endpoints.values()), 6),
+                'endpoints': {endpoint: metrics.to_dict() for endpoint, metrics in sorted(self.endpoints.items())},
+                'sleeps': [
+                    {'provider': provider, 'reason': reason, 'seconds': round(seconds, 6)}
+                    for (provider, reason), seconds in sorted(self.sleeps.items())
+                ],
+                'history_pages': self.pages,
+                'history_items': self.items,
+            }
+
+    def to_prometheus(self):
+        """
+        :return (str): The metrics in the Prometheus text format, e.g. for the textfile collector.
+        """
+        data = self.to_dict()
+        lines = [
+            f"# HELP {METRIC_PREFIX}_requests_total API requests by endpoint and HTTP status.",
+            f"# TYPE {METRIC_PREFIX}_requests_total counter",
+        ]
+        for endpoint, metrics in data['endpoints'].items():
+            for status, count in metrics['statuses'].items():
+                lines.append(f'{METRIC_PREFIX}_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_retries_total Repeated API requests by endpoint.",
+            f"# TYPE {METRIC_PREFIX}_retries_total counter",
+        ]
+        for endpoint, metrics in data['endpoints'].items():
+            lines.append(f'{METRIC_PREFIX}_retries_total{{endpoint="{endpoint}"}} {metrics["retries"]}')
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_request_duration_seconds Latency of API requests by endpoint.",
+            f"# TYPE {METRIC_PREFIX}_request_duration_seconds histogram",
+        ]
+        for endpoint, metrics in data['endpoints'].items():
+            cumulative = 0
+            for bound, count in metrics['latency_buckets'].items():
+                cumulative += count
+                lines.append(f'{METRIC_PREFIX}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'{METRIC_PREFIX}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {metrics["latency_sum"]}')
+            lines.append(f'{METRIC_PREFIX}_request_duration_seconds_count{{endpoint="{endpoint}"}} {metrics["requests"]}')
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_sleep_seconds_total Time slept before API requests by provider and reason.",
+            f"# TYPE {METRIC_PREFIX}_sleep_seconds_total counter",
+        ]
+        for sleep in data['sleeps']:
+            lines.append(f'{METRIC_PREFIX}_sleep_seconds_total{{provider="{sleep["provider"]}",reason="{sleep["reason"]}"}} {sleep["seconds"]}')
+
+        lines += [
+            f"# HELP {METRIC_PREFIX}_run_duration_seconds Wall time of the run.",
+            f"# TYPE {METRIC_PREFIX}_run_duration_seconds gauge",
+            f"{METRIC_PREFIX}_run_duration_seconds {data['wall_time']}",
+            f"# HELP {METRIC_PREFIX}_history_pages_total Fetched balance history pages.",
+            f"# TYPE {METRIC_PREFIX}_history_pages_total counter",
+            f"{METRIC_PREFIX}_history_pages_total {data['history_pages']}",
+            f"# HELP {METRIC_PREFIX}_history_items_total Balance history items of all fetched pages.",
+            f"# TYPE {METRIC_PREFIX}_history_items_total counter",
+            f"{METRIC_PREFIX}_history_items_total {data['history_items']}",
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """
+        Writes the metrics atomically, as Prometheus textfile for .prom files and as JSON otherwise.
+
+        :param path (str): The metrics file.
+        """
+        content = self.to_prometheus() if path.endswith('.prom') else json.dumps(self.to_dict(), indent=2) + '\n'
+        with atomic_write(path) as f:
+            f.write(content)
+
+    def print_summary(self):
+        # Shows the calls, latencies, and sleeps of the run within the terminal box
+        data = self.to_dict()
+        printLine(f"📊 Run metrics after {data['wall_time']:.1f}s wall time", True)
+        printLine()
+        if not data['endpoints']:
+            printLine("No API requests were sent.")
+        else:
+            printLine(f"{'Endpoint':<24}{'Calls':>7}{'Retries':>8}{'Errors':>7}{'Avg ms':>8}{'Max ms':>8}")
+            for endpoint, metrics in data['endpoints'].items():
+                errors = sum(count for status, count in metrics['statuses'].items() if not status.startswith('2'))
+                average = metrics['latency_sum'] / metrics['requests'] * 1000
+                printLine(f"{endpoint:<24}{metrics['requests']:>7}{metrics['retries']:>8}{errors:>7}"
+                          f"{average:>8.0f}{metrics['latency_max'] * 1000:>8.0f}")
+            printLine()
+            printLine("Times are summed over concurrent calls:")
+            printLine(f"- Waiting for API responses: {data['request_time']:.1f}s")
+            for sleep in data['sleeps']:
+                printLine(f"- Sleeping for {sleep['reason'].replace('_', ' ')} of {sleep['provider']}: {sleep['seconds']:.1f}s")
+        if data['history_pages']:
+            printLine()
+            printLine(f"History pages: {data['history_pages']} with {data['history_items'] / data['history_pages']:.1f} items on average")
+
+# Shared metrics of both HTTP clients
+run_metrics = RunMetrics()
@@ -0,0 +1,33 @@
+# READS SETTINGS ADDED AFTER THE FIRST RELEASE
+
+# Internal config data
+import config
+
+"""
+Settings that config files of earlier versions do not define yet.
+
+- missing settings use the defaults of config-sample.py
+- call rates of earlier versions are derived from their wait times between calls
+- copy the settings from config-sample.py into config.py to change them
+"""
+BLOCKSCOUT_CALLS_PER_MINUTE = getattr(config, 'BLOCKSCOUT_CALLS_PER_MINUTE', 60 / getattr(config, 'BLOCKSCOUT_CALL_WAIT_TIME', 0.8))
+BLOCKSCOUT_VERIFY_WORKERS = getattr(config, 'BLOCKSCOUT_VERIFY_WORKERS', 4)
+BLOCKSCOUT_ADDRESS_WITHDRAWALS = getattr(config, 'BLOCKSCOUT_ADDRESS_WITHDRAWALS', True)
+BLOCKSCOUT_VALIDATED_BLOCKS = getattr(config, 'BLOCKSCOUT_VALIDATED_BLOCKS', True)
+ASYNC_MAX_IN_FLIGHT = getattr(config, 'ASYNC_MAX_IN_FLIGHT', 16)
+RPC_URL = getattr(config, 'RPC_URL', 'http://127.0.0.1:8545')
+RPC_BATCH_SIZE = getattr(config, 'RPC_BATCH_SIZE', 500)
+RPC_WORKERS = getattr(config, 'RPC_WORKERS', 4)
+RPC_CALLS_PER_MINUTE = getattr(config, 'RPC_CALLS_PER_MINUTE', 6000)
+BLOCK_CACHE_FILE = getattr(config, 'BLOCK_CACHE_FILE', 'cache/block_cache.json')
+BLOCK_CACHE_MAX_ENTRIES = getattr(config, 'BLOCK_CACHE_MAX_ENTRIES', 25000)
+BLOCK_INDEX_FILE = getattr(config, 'BLOCK_INDEX_FILE', 'cache/block_index.json')
+EVENT_STORE_FOLDER = getattr(config, 'EVENT_STORE_FOLDER', 'cache/events')
+CHECKPOINT_FOLDER = getattr(config, 'CHECKPOINT_FOLDER', 'cache/checkpoints')
+CHECKPOINT_INTERVAL = getattr(config, 'CHECKPOINT_INTERVAL', 10)
+REPORT_STATE_FOLDER = getattr(config, 'REPORT_STATE_FOLDER', 'cache/reports')
+PRICE_STORE_FILE = getattr(config, 'PRICE_STORE_FILE', 'cache/prices.sqlite3')
+PREFLIGHT_CACHE_FILE = getattr(config, 'PREFLIGHT_CACHE_FILE', 'cache/preflight.json')
+PREFLIGHT_TTL = getattr(config, 'PREFLIGHT_TTL', 300)
+COINMARKETCAP_CALLS_PER_MINUTE = getattr(config, 'COINMARKETCAP_CALLS_PER_MINUTE', 60 / getattr(config, 'COINMARKETCAP_CALL_WAIT_TIME', 2))
+COINMARKETCAP_RANGE_DAYS = getattr(config, 'COINMARKETCAP_RANGE_DAYS', 366)